@@ -0,0 +1,367 @@
+"""
+Local synthetic sites for offline benchmarks.
+
+    python -m benchmarks.fixtures              # serve every site and print their URLs
+    python -m benchmarks.fixtures --pages 1000
+
+Each site gets its own port (tools look for /robots.txt and /sitemap.xml at
+the origin). Alongside the sites, an "api" origin serves a PageSpeed Insights
+stand-in at /psi. Content is generated from a fixed seed, so every run sees
+the same pages.
+"""
+import argparse
+import hashlib
+import http.server
+import json
+import random
+import socket
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+WORDS = (
+    "boutique hotel lisbon travel guide rooftop bar breakfast suite booking spa harbour view family room "
+    "city centre tram museum tour wine tasting beach transfer airport shuttle cancellation policy review "
+    "garden terrace pool fitness concierge parking pet friendly honeymoon package weekend offer dinner"
+).split()
+
+
+def text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def page(title: str, body: str, links=(), images=(), head: str = "") -> bytes:
+    parts = [
+        f"<!doctype html><html lang='en'><head><title>{title}</title>",
+        f"<meta name='description' content='{title} - synthetic fixture page'>",
+        "<meta name='viewport' content='width=device-width, initial-scale=1'>",
+        f"<meta property='og:title' content='{title}'><meta name='twitter:card' content='summary'>",
+        "<style>@media (max-width: 600px) { main { padding: 0 } }</style>",
+        head,
+        "</head><body><nav><a href='/'>Home</a></nav><main>",
+        f"<h1>{title}</h1><p>{body}</p>",
+    ]
+    parts.extend(f"<a href='{href}'>{label}</a> " for href, label in links)
+    parts.extend(f"<img src='{src}'{f' alt={alt!r}' if alt else ''}>" for src, alt in images)
+    parts.append("</main></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def urlset(urls) -> bytes:
+    entries = "".join(f"<url><loc>{u}</loc><lastmod>2024-05-01</lastmod></url>" for u in urls)
+    return (f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>').encode()
+
+
+def sitemapindex(urls) -> bytes:
+    entries = "".join(f"<sitemap><loc>{u}</loc></sitemap>" for u in urls)
+    return (f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>').encode()
+
+
+HTML = "text/html; charset=utf-8"
+XML = "application/xml"
+TEXT = "text/plain"
+
+
+class Site:
+    """A generated site: route(path, origin) returns (status, headers, body) or None for a dropped connection."""
+    name = ""
+    delay = 0.0
+
+    def __init__(self, seed: int = 1):
+        self.seed = seed
+
+    def robots(self, origin: str) -> bytes:
+        return f"User-agent: *\nDisallow: /private/\nSitemap: {origin}/sitemap.xml\n".encode()
+
+    def route(self, path: str, origin: str):
+        if path == "/robots.txt":
+            return 200, {"Content-Type": TEXT}, self.robots(origin)
+        return self.get(path, origin)
+
+    def get(self, path: str, origin: str):
+        raise NotImplementedError
+
+
+class BrochureSite(Site):
+    """Eight-page marketing site with structured data: the common small-business case."""
+    name = "brochure"
+    PAGES = ("/", "/about", "/rooms", "/offers", "/gallery", "/contact", "/blog", "/faq")
+
+    def get(self, path, origin):
+        if path == "/sitemap.xml":
+            return 200, {"Content-Type": XML}, urlset(origin + p for p in self.PAGES)
+        if path not in self.PAGES:
+            return 404, {"Content-Type": HTML}, page("Not found", "")
+        rng = random.Random(f"{self.seed}{path}")
+        jsonld = '<script type="application/ld+json">{"@context": "https://schema.org", "@type": "Hotel"}</script>'
+        links = [(p, p.strip("/") or "home") for p in self.PAGES]
+        images = [(f"/img/{i}.jpg", "photo" if i % 3 else "") for i in range(6)]
+        return 200, {"Content-Type": HTML}, page(f"Boutique hotel {path}", text(rng, 400), links, images, jsonld)
+
+
+class LargeSite(Site):
+    """`pages`-page catalogue with a three-level sitemap index and a densely linked page graph."""
+    name = "large"
+
+    def __init__(self, seed: int = 1, pages: int = 10000, per_sitemap: int = 500, fanout: int = 4):
+        super().__init__(seed)
+        self.pages = pages
+        self.per_sitemap = per_sitemap
+        self.fanout = fanout
+
+    def get(self, path, origin):
+        files = -(-self.pages // self.per_sitemap)
+        groups = -(-files // self.fanout)
+        if path == "/sitemap.xml":
+            return 200, {"Content-Type": XML}, sitemapindex(f"{origin}/sitemaps/group-{g}.xml" for g in range(groups))
+        if path.startswith("/sitemaps/group-"):
+            g = int(path.rsplit("-", 1)[1].split(".")[0])
+            ids = range(g * self.fanout, min(files, (g + 1) * self.fanout))
+            return 200, {"Content-Type": XML}, sitemapindex(f"{origin}/sitemaps/urls-{i}.xml" for i in ids)
+        if path.startswith("/sitemaps/urls-"):
+            i = int(path.rsplit("-", 1)[1].split(".")[0])
+            start = i * self.per_sitemap
+            return 200, {"Content-Type": XML}, urlset(
+                f"{origin}/p/{n}" for n in range(start, min(self.pages, start + self.per_sitemap))
+            )
+        n = 0 if path == "/" else int(path[3:]) if path.startswith("/p/") and path[3:].isdigit() else -1
+        if not 0 <= n < self.pages:
+            return 404, {"Content-Type": HTML}, page("Not found", "")
+        rng = random.Random(self.seed * 1000003 + n)
+        links = [(f"/p/{(n * 7 + k * 131) % self.pages}", f"item {k}") for k in range(1, 21)]
+        return 200, {"Content-Type": HTML}, page(f"Catalogue item {n}", text(rng, 250), links)
+
+
+class LinkHeavySite(Site):
+    """Pages with thousands of internal and external links and images; some links are broken."""
+    name = "links"
+
+    def __init__(self, seed: int = 1, links: int = 3000, images: int = 2000, external=()):
+        super().__init__(seed)
+        self.links = links
+        self.images = images
+        self.external = list(external)
+
+    def get(self, path, origin):
+        if path == "/sitemap.xml":
+            return 200, {"Content-Type": XML}, urlset([origin + "/"])
+        if path.startswith("/l/"):
+            n = int(path[3:]) if path[3:].isdigit() else -1
+            if n < 0 or n % 50 == 0:
+                return 404, {"Content-Type": HTML}, page("Gone", "")
+            return 200, {"Content-Type": HTML}, page(f"Link target {n}", "target")
+        if path != "/":
+            return 404, {"Content-Type": HTML}, page("Not found", "")
+        rng = random.Random(self.seed)
+        links = [(f"/l/{i}", f"link {i}") for i in range(self.links)]
+        for i, host in enumerate(self.external):
+            links.extend((f"{host}/ext/{j}", f"external {j}") for j in range(i * 10, i * 10 + 100))
+        images = [(f"/img/{i}.png", "" if i % 4 == 0 else f"image {i}") for i in range(self.images)]
+        return 200, {"Content-Type": HTML}, page("Link directory", text(rng, 800), links, images)
+
+
+class SlowSite(BrochureSite):
+    """The brochure site behind a slow origin (every response delayed)."""
+    name = "slow"
+
+    def __init__(self, seed: int = 1, delay: float = 0.3):
+        super().__init__(seed)
+        self.delay = delay
+
+
+class FlakySite(BrochureSite):
+    """Server errors, throttling and dropped connections on a fixed share of paths."""
+    name = "flaky"
+
+    def get(self, path, origin):
+        bucket = int(hashlib.md5(path.encode()).hexdigest(), 16) % 10
+        if path in ("/", "/sitemap.xml"):
+            return super().get(path, origin)
+        if bucket < 2:
+            return 500, {"Content-Type": HTML}, page("Server error", "")
+        if bucket == 2:
+            return 503, {"Content-Type": HTML, "Retry-After": "1"}, page("Unavailable", "")
+        if bucket == 3:
+            return None
+        return super().get(path, origin)
+
+
+class RedirectSite(BrochureSite):
+    """Homepage behind a mixed 301/302 chain, plus a redirect loop and a long chain linked from it."""
+    name = "redirects"
+    CHAIN = 5
+
+    def get(self, path, origin):
+        if path == "/":
+            return 301, {"Location": f"{origin}/hop/1"}, b""
+        if path.startswith("/hop/"):
+            n = int(path[5:])
+            target = f"{origin}/hop/{n + 1}" if n < self.CHAIN else f"{origin}/home"
+            return (302 if n % 2 else 301), {"Location": target}, b""
+        if path == "/loop/a":
+            return 302, {"Location": f"{origin}/loop/b"}, b""
+        if path == "/loop/b":
+            return 302, {"Location": f"{origin}/loop/a"}, b""
+        if path == "/long":
+            return 301, {"Location": f"{origin}/hop/1"}, b""
+        if path == "/home":
+            status, headers, body = super().get("/", origin)
+            extra = b"<a href='/loop/a'>loop</a><a href='/long'>long</a></main>"
+            return status, headers, body.replace(b"</main>", extra)
+        return super().get(path, origin)
+
+
+def psi_response(url: str, strategy: str) -> dict:
+    """Deterministic PageSpeed Insights v5 shaped payload."""
+    h = int(hashlib.md5(f"{url}{strategy}".encode()).hexdigest(), 16)
+
+    def score(shift):
+        return round(0.5 + ((h >> shift) % 50) / 100, 2)
+
+    audits = {
+        "first-contentful-paint": 900 + h % 900, "largest-contentful-paint": 1500 + h % 2500,
+        "speed-index": 1200 + h % 1800, "interactive": 2000 + h % 3000, "total-blocking-time": h % 600,
+        "server-response-time": 80 + h % 300, "cumulative-layout-shift": (h % 30) / 100,
+    }
+    return {
+        "lighthouseResult": {
+            "lighthouseVersion": "12.0.0",
+            "categories": {c: {"score": score(i * 7)} for i, c in
+                           enumerate(("performance", "accessibility", "best-practices", "seo"))},
+            "audits": {k: {"numericValue": v} for k, v in audits.items()},
+        },
+        "loadingExperience": {"metrics": {
+            "LARGEST_CONTENTFUL_PAINT_MS": {"percentile": audits["largest-contentful-paint"], "category": "AVERAGE"},
+        }},
+    }
+
+
+class ApiSite(Site):
+    """Stand-ins for third-party APIs: PageSpeed Insights at /psi."""
+    name = "api"
+
+    def __init__(self, seed: int = 1, psi_delay: float = 0.0):
+        super().__init__(seed)
+        self.psi_delay = psi_delay
+
+    def get(self, path, origin):
+        parsed = urlparse(path)
+        if parsed.path == "/psi":
+            if self.psi_delay:
+                time.sleep(self.psi_delay)
+            q = parse_qs(parsed.query)
+            body = json.dumps(psi_response(q.get("url", [""])[0], q.get("strategy", ["mobile"])[0]))
+            return 200, {"Content-Type": "application/json"}, body.encode()
+        return 404, {"Content-Type": TEXT}, b"not found"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # headers and body go out as separate writes; without this, Nagle plus
+        # delayed ACKs add ~40 ms to every keep-alive response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _respond(self, head_only: bool):
+        site = self.server.site
+        if site.delay:
+            time.sleep(site.delay)
+        origin = f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]}"
+        path = self.path if isinstance(site, ApiSite) else urlparse(self.path).path
+        result = site.route(path, origin)
+        if result is None:
+            self.close_connection = True
+            return
+        status, headers, body = result
+        self.send_response(status)
+        etag = '"%s"' % hashlib.md5(body).hexdigest()[:16]
+        for k, v in headers.items():
+            self.send_header(k, v)
+        if status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "max-age=300")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(False)
+
+    def do_HEAD(self):
+        self._respond(True)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512  # link checks open many connections at once
+
+
+class FixtureServer:
+    """Serves every site on its own 127.0.0.1 port; use as a context manager."""
+
+    def __init__(self, pages: int = 10000, slow_delay: float = 0.3, psi_delay: float = 0.0, seed: int = 1):
+        flaky = FlakySite(seed)
+        self._servers = {}
+        self.sites = {}
+        for site in (BrochureSite(seed), LargeSite(seed, pages=pages), SlowSite(seed, slow_delay), flaky,
+                     RedirectSite(seed), ApiSite(seed, psi_delay)):
+            self._add(site)
+        # external links of the link-heavy site point at the flaky host and a closed port
+        self._add(LinkHeavySite(seed, external=[self.sites["flaky"], "http://127.0.0.1:9"]))
+
+    def _add(self, site: Site):
+        server = _Server(("127.0.0.1", 0), _Handler)
+        server.site = site
+        self._servers[site.name] = server
+        self.sites[site.name] = f"http://127.0.0.1:{server.server_port}"
+
+    @property
+    def psi_endpoint(self) -> str:
+        return self.sites["api"] + "/psi"
+
+    def audit_sites(self) -> dict:
+        return {name: url for name, url in self.sites.items() if name != "api"}
+
+    def start(self):
+        for server in self._servers.values():
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=10000, help="pages of the large site")
+    ap.add_argument("--slow-delay", type=float, default=0.3, help="seconds added to every slow-site response")
+    args = ap.parse_args()
+    with FixtureServer(pages=args.pages, slow_delay=args.slow_delay) as fixtures:
+        for name, url in fixtures.sites.items():
+            print(f"{name:<10} {url}")
+        print(f"PSI stub:  SEOSCAN_PSI_ENDPOINT={fixtures.psi_endpoint}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
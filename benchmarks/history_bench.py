@@ -0,0 +1,119 @@
+"""
+Audit history write throughput and query latency.
+
+    python -m benchmarks.history_bench                       # 500 domains, weekly audits for 26 weeks
+    python -m benchmarks.history_bench --domains 2000 --weeks 52 --keep history.sqlite
+
+Fills a fresh store with synthetic audit results (batched, and once more
+one transaction per run for comparison), then times the queries the store
+is indexed for.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from seoscan_agent.history import HistoryStore
+
+WEEK = 7 * 86400
+
+
+def fake_results(rng: random.Random, domain: str) -> dict:
+    """run_plan-shaped results for the tools whose records hold numbers, keywords and broken links."""
+    score = rng.random()
+    return {
+        "technical": {
+            "lighthouse_tool": {
+                "mobile": {"performance_score": round(score, 2), "seo_score": 0.9, "accessibility_score": 0.8,
+                           "best_practices_score": 0.95, "largest_contentful_paint_ms": 1500 + rng.randrange(3000),
+                           "cumulative_layout_shift": rng.random() / 4, "total_blocking_time_ms": rng.randrange(600)},
+                "desktop": {"performance_score": round(min(1.0, score + 0.2), 2)},
+            },
+            "broken_links_tool": {
+                "pages_crawled": 100, "links_checked": 900, "broken_links_count": 2, "broken_internal": 1,
+                "broken_external": 1,
+                "broken_links": [{"url": f"https://{domain}/old/{rng.randrange(50)}", "status": 404,
+                                  "found_on": f"https://{domain}/", "external": False}],
+            },
+            "sitemap_tool": {"files": 3, "num_urls": 1000 + rng.randrange(9000), "invalid_entries": 0,
+                             "lastmod_missing": rng.randrange(100), "errors": []},
+        },
+        "content": {
+            "keyword_extraction_tool": {"top_keywords": rng.sample(["hotel", "lisbon", "rooftop", "spa", "suite",
+                                                                   "breakfast", "river", "tram", "old", "town"], 8)},
+        },
+    }
+
+
+def fill(store: HistoryStore, domains: list, weeks: int, seed: int = 1) -> float:
+    rng = random.Random(seed)
+    start = time.time() - weeks * WEEK
+    t0 = time.perf_counter()
+    for week in range(weeks):
+        for i, domain in enumerate(domains):
+            ts = start + week * WEEK + i
+            store.record(domain, fake_results(rng, domain), started_at=ts, duration_s=30,
+                         competitors=[domains[(i + k) % len(domains)] for k in (1, 2, 3)] if week % 4 == 0 else None)
+    store.flush()
+    return time.perf_counter() - t0
+
+
+def timed(fn, repeat: int) -> tuple:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--domains", type=int, default=500)
+    ap.add_argument("--weeks", type=int, default=26)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--keep", metavar="FILE", help="write the filled store here instead of a temp file")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="seoscan-history-")
+    domains = [f"site{i:05d}.example" for i in range(args.domains)]
+    runs = args.domains * args.weeks
+
+    path = args.keep or os.path.join(workdir, "history.sqlite")
+    store = HistoryStore(path)
+    elapsed = fill(store, domains, args.weeks)
+    print(f"batched writes:   {runs} runs in {elapsed:.2f}s ({runs / elapsed:,.0f} runs/s, {store.batches} transactions)")
+
+    sample = domains[: max(1, args.domains // 10)]
+    single = HistoryStore(os.path.join(workdir, "single.sqlite"), batch_size=1)
+    one_by_one = fill(single, sample, args.weeks)
+    single.close()
+    n = len(sample) * args.weeks
+    print(f"one run per txn:  {n} runs in {one_by_one:.2f}s ({n / one_by_one:,.0f} runs/s)")
+    print(f"store size:       {os.path.getsize(path) / 2**20:.1f} MB\n")
+
+    queries = {
+        f"trend perf_mobile, {args.domains} domains, 6 months": lambda: store.trend(
+            "lighthouse_tool", "perf_mobile", domains, since="182d"),
+        f"trend perf_mobile, {args.domains} domains, weekly buckets": lambda: store.trend(
+            "lighthouse_tool", "perf_mobile", domains, since="182d", bucket="7d"),
+        "trend lcp_ms, 1 domain, all time": lambda: store.trend("lighthouse_tool", "lcp_ms", domains[:1]),
+        f"latest perf_mobile, {args.domains} domains": lambda: store.latest("lighthouse_tool", "perf_mobile", domains),
+        "runs of 1 domain, 30 days": lambda: store.runs(domains[0], since="30d"),
+        "broken links of 1 domain": lambda: store.broken_links(domains[0]),
+        "domains using a keyword, 90 days": lambda: store.keywords(keyword="rooftop", since="90d"),
+        "competitors of 1 domain": lambda: store.competitors(domains[0]),
+        "competitors shared by 3+ domains": lambda: store.shared_competitors(3),
+    }
+    print(f"{'query':<52}{'median ms':>10}{'rows':>8}")
+    for name, fn in queries.items():
+        ms, result = timed(fn, args.repeat)
+        rows = sum(len(v) for v in result.values()) if name.startswith("trend") else len(result)
+        print(f"{name:<52}{ms:>10.1f}{rows:>8}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
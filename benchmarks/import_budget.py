@@ -0,0 +1,68 @@
+"""
+Import-time budget for the modules worker processes and scripts import.
+
+    python -m benchmarks.import_budget            # check budgets, exit 1 on a violation
+    python -m benchmarks.import_budget --repeat 9
+
+Every import is timed in a fresh interpreter (median of --repeat runs), and
+the heavy LLM stacks must not be pulled in until an agent or client is used.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# module -> budget in milliseconds (fresh interpreter, warm disk cache)
+BUDGETS = {
+    "seoscan_agent.tools.technical": 300,
+    "seoscan_agent.tools.content": 300,
+    "seoscan_agent.tools.ux": 300,
+    "seoscan_agent.pipeline": 350,
+    "seoscan_agent.batch": 400,
+    "seoscan_agent.agents": 400,
+}
+# Only loaded when an LLM client or agent is first used
+DEFERRED = ("llama_index", "openai", "ollama")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted({{m.split(".")[0] for m in sys.modules}} & set({deferred!r}))
+print(json.dumps({{"ms": elapsed * 1000, "loaded": loaded}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    samples, loaded = [], []
+    code = PROBE.format(module=module, deferred=DEFERRED)
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        loaded = result["loaded"]
+    return {"ms": statistics.median(samples), "loaded": loaded}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    failures = 0
+    print(f"{'module':<34}{'median ms':>10}{'budget':>8}  deferred imports loaded")
+    for module, budget in BUDGETS.items():
+        result = measure(module, args.repeat)
+        ok = result["ms"] <= budget and not result["loaded"]
+        failures += not ok
+        print(f"{module:<34}{result['ms']:>10.1f}{budget:>8}  {', '.join(result['loaded']) or '-'}"
+              f"{'' if ok else '  <-- over budget'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Parse time per MB for each available HTML backend.
+
+    python -m benchmarks.parse_bench                 # synthetic pages
+    python -m benchmarks.parse_bench page1.html ...  # your own saved pages
+"""
+import argparse
+import time
+
+from seoscan_agent.page import PageSnapshot, available_backends
+
+
+def synthetic_page(n_items: int = 2000) -> str:
+    parts = [
+        "<html><head><title>Synthetic page</title>",
+        '<meta name="description" content="Benchmark page">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        '<meta property="og:title" content="Synthetic">',
+        '<script type="application/ld+json">{"@type": "Organization"}</script>',
+        "<style>@media (max-width: 600px) { body { margin: 0 } }</style>",
+        "</head><body><nav><a href='/'>Home</a></nav><main>",
+    ]
+    for i in range(n_items):
+        parts.append(
+            f"<div class='card'><h2>Item {i}</h2>"
+            f"<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit {i}.</p>"
+            f"<a href='/item/{i}'>Read more</a><img src='/img/{i}.png' alt='item {i}'></div>"
+        )
+    parts.append("</main></body></html>")
+    return "".join(parts)
+
+
+def bench(html: str, backend: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        PageSnapshot.parse(html, parser=backend)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("files", nargs="*", help="HTML files to parse (default: synthetic pages)")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.files:
+        docs = {}
+        for path in args.files:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                docs[path] = f.read()
+    else:
+        docs = {f"synthetic-{n}": synthetic_page(n) for n in (500, 5000)}
+
+    backends = available_backends()
+    if not backends:
+        print("No HTML parser backend installed (pip install beautifulsoup4 lxml selectolax).")
+        return
+
+    print(f"{'document':<28} {'size MB':>8} " + " ".join(f"{b:>14}" for b in backends))
+    for name, html in docs.items():
+        mb = len(html.encode("utf-8")) / (1024 * 1024)
+        row = [bench(html, b, args.repeat) / mb * 1000 for b in backends]
+        print(f"{name[:28]:<28} {mb:>8.2f} " + " ".join(f"{ms:>11.1f} ms" for ms in row))
+    print("\n(values are best-of-%d parse time per MB)" % args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Offline benchmark suite: every audit tool and full audits against local
+synthetic sites, with stub LLM, search and PageSpeed backends.
+
+    python -m benchmarks.suite                          # all tools on all sites, then full audits
+    python -m benchmarks.suite --suite tools --sites brochure,links --repeat 3
+    python -m benchmarks.suite --pages 1000 --save bench.json
+    python -m benchmarks.suite --compare bench.json     # exit 1 on a regression
+
+For each case it reports throughput, latency percentiles (over --repeat runs,
+--concurrency at a time) and peak Python heap (one extra run under
+tracemalloc). Nothing leaves the machine: the LLM is the offline stub, search
+uses the local backend, PSI points at the fixture server, and every cache
+that would make repeated runs free (completions, search, PSI, link statuses,
+robots rules, crawl delay) is off.
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import FixtureServer
+
+TOOL_MODULES = ("seoscan_agent.tools.technical", "seoscan_agent.tools.content", "seoscan_agent.tools.ux")
+
+
+def offline_env(fixtures: FixtureServer, workdir: str, llm_latency: float) -> dict:
+    """SEOSCAN_* settings for an offline, cache-free run; must be applied before seoscan_agent is imported."""
+    env = {
+        "SEOSCAN_LLM": "stub",
+        "SEOSCAN_LLM_STUB_LATENCY": str(llm_latency),
+        "SEOSCAN_LLM_CACHE_PATH": "",
+        "SEOSCAN_SERP_BACKEND": "local",
+        "SEOSCAN_SERP_CACHE_PATH": "",
+        "SEOSCAN_PSI_ENDPOINT": fixtures.psi_endpoint,
+        "SEOSCAN_PSI_CACHE_PATH": "",
+        "SEOSCAN_PSI_RATE_PER_MIN": "1000000",
+        "SEOSCAN_PSI_MAX_RETRIES": "0",
+        "SEOSCAN_FETCH_CACHE_DIR": "",
+        "SEOSCAN_CRAWL_DELAY": "0",
+        "SEOSCAN_LINK_CHECK_TTL": "0",
+        "SEOSCAN_ROBOTS_CACHE_TTL": "0",
+        "SEOSCAN_SNAPSHOT_PATH": os.path.join(workdir, "snapshots.sqlite"),
+        "SEOSCAN_HISTORY_PATH": os.path.join(workdir, "history.sqlite"),
+        "SEOSCAN_REPORT_STREAM": "",
+        "SEOSCAN_PROFILE_DIR": "",
+        "SEOSCAN_OTLP_ENDPOINT": "",
+        "SEOSCAN_AUDIT_MODE": "pipeline",
+    }
+    for role in ("KEYWORD", "QUERY", "SYNTHESIS", "AGENT"):
+        env[f"SEOSCAN_LLM_{role}"] = "stub"
+    return env
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+def measure(fn, repeat: int, concurrency: int, memory: bool = True) -> dict:
+    """Run fn() `repeat` times (after one warm-up), `concurrency` at a time."""
+    fn()  # warm-up: imports, connection pools, event loop
+
+    def timed(_):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, range(repeat)))
+    else:
+        latencies = [timed(i) for i in range(repeat)]
+    wall = time.perf_counter() - start
+    latencies.sort()
+    row = {
+        "runs": repeat,
+        "ops_per_s": round(repeat / wall, 3) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            row["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+    return row
+
+
+def discover_tools() -> dict:
+    """Every public *_tool defined in the technical, content and UX tool modules."""
+    import importlib
+
+    tools = {}
+    for name in TOOL_MODULES:
+        module = importlib.import_module(name)
+        for attr, fn in vars(module).items():
+            if attr.endswith("_tool") and callable(fn) and getattr(fn, "__module__", None) == name:
+                tools[attr] = fn
+    return tools
+
+
+def tool_call(tool, url: str):
+    """fn() running one tool call on `url` inside its own audit scope (so the page cache starts empty)."""
+    from seoscan_agent.fetch import audit_scope
+    from seoscan_agent.page import page_snapshot
+
+    params = list(inspect.signature(tool).parameters)
+    if params and params[0] == "content":
+        # llm_keywords_from_content_tool takes a site summary, not a domain
+        snap = page_snapshot(url, timeout=10)
+        arg = f"Title: {snap.title}\nDescription: {snap.meta_description}\nTerms: boutique hotel, lisbon, rooftop bar"
+    else:
+        arg = url
+
+    def run():
+        with audit_scope():
+            tool(arg)
+
+    return run
+
+
+def audit_call(url: str, report: bool, incremental: bool = False):
+    from seoscan_agent.batch import audit_domain
+
+    def run():
+        record = audit_domain(url, report=report, incremental=incremental)
+        if "error" in record and not record.get("results"):
+            raise RuntimeError(record["error"])
+        if report and "report" not in record:
+            # interpret() failed after the tools ran; don't time a plain audit as audit+report
+            raise RuntimeError(record.get("error") or "no report in the audit record")
+
+    return run
+
+
+def run_cases(cases, repeat: int, concurrency: int, memory: bool, out=sys.stdout) -> list:
+    header = f"{'case':<48}{'ops/s':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'peak MB':>9}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    rows = []
+    for name, fn in cases:
+        try:
+            row = {"case": name, **measure(fn, repeat, concurrency, memory)}
+        except Exception as e:
+            row = {"case": name, "error": f"{type(e).__name__}: {e}"[:200]}
+        rows.append(row)
+        if "error" in row:
+            print(f"{name:<48}  error: {row['error']}", file=out)
+        else:
+            print(f"{name:<48}{row['ops_per_s']:>8.2f}{row['p50_ms']:>10.1f}{row['p90_ms']:>10.1f}"
+                  f"{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}{row.get('peak_mb', 0):>9.2f}", file=out)
+        out.flush()
+    return rows
+
+
+def compare(rows: list, baseline: dict, tolerance: float, min_ms: float = 5.0, min_mb: float = 1.0) -> list:
+    """Cases whose p50 latency or peak memory grew by more than `tolerance` (and an absolute floor)."""
+    before = {r["case"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for row in rows:
+        old = before.get(row["case"])
+        if not old or "error" in old:
+            continue
+        if "error" in row:
+            regressions.append(f"{row['case']}: now fails ({row['error']})")
+            continue
+        if row["p50_ms"] > old["p50_ms"] * (1 + tolerance) and row["p50_ms"] - old["p50_ms"] > min_ms:
+            regressions.append(f"{row['case']}: p50 {old['p50_ms']:.1f} -> {row['p50_ms']:.1f} ms")
+        if "peak_mb" in row and "peak_mb" in old and \
+                row["peak_mb"] > old["peak_mb"] * (1 + tolerance) and row["peak_mb"] - old["peak_mb"] > min_mb:
+            regressions.append(f"{row['case']}: peak {old['peak_mb']:.2f} -> {row['peak_mb']:.2f} MB")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--suite", choices=("tools", "audits", "all"), default="all")
+    ap.add_argument("--sites", default="", help="comma-separated subset of brochure,large,links,slow,flaky,redirects")
+    ap.add_argument("--tools", default="", help="comma-separated subset of tool names")
+    ap.add_argument("--repeat", type=int, default=5, help="measured runs per case")
+    ap.add_argument("--concurrency", type=int, default=1, help="runs in flight at once (throughput under load)")
+    ap.add_argument("--pages", type=int, default=10000, help="pages of the large site")
+    ap.add_argument("--slow-delay", type=float, default=0.3, help="seconds added to every slow-site response")
+    ap.add_argument("--llm-latency", type=float, default=0.0, help="seconds the stub LLM takes per request")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-heap run")
+    ap.add_argument("--save", metavar="FILE", help="write results as JSON")
+    ap.add_argument("--compare", metavar="FILE", help="baseline JSON from --save; exit 1 on regressions")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown/growth vs baseline")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="seoscan-bench-")
+    with FixtureServer(pages=args.pages, slow_delay=args.slow_delay) as fixtures:
+        os.environ.update(offline_env(fixtures, workdir, args.llm_latency))
+
+        sites = fixtures.audit_sites()
+        if args.sites:
+            wanted = {s.strip() for s in args.sites.split(",") if s.strip()}
+            sites = {name: url for name, url in sites.items() if name in wanted}
+        cases = []
+        if args.suite in ("tools", "all"):
+            tools = discover_tools()
+            if args.tools:
+                wanted = {t.strip() for t in args.tools.split(",") if t.strip()}
+                tools = {name: fn for name, fn in tools.items() if name in wanted}
+            for tool_name, tool in tools.items():
+                for site, url in sites.items():
+                    cases.append((f"{tool_name} @ {site}", tool_call(tool, url)))
+        if args.suite in ("audits", "all"):
+            for site, url in sites.items():
+                cases.append((f"audit @ {site}", audit_call(url, report=False)))
+                cases.append((f"audit+report @ {site}", audit_call(url, report=True)))
+                cases.append((f"incremental re-audit @ {site}", audit_call(url, report=False, incremental=True)))
+
+        print(f"{len(cases)} cases, {args.repeat} runs each, concurrency {args.concurrency}; "
+              f"large site {args.pages} pages", file=sys.stderr)
+        started = time.perf_counter()
+        rows = run_cases(cases, args.repeat, args.concurrency, memory=not args.no_memory)
+        elapsed = time.perf_counter() - started
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    print(f"\nfinished in {elapsed:.1f}s, process peak RSS {rss:.0f} MB")
+    report = {
+        "created_at": time.time(), "python": platform.python_version(), "platform": platform.platform(),
+        "settings": {k: getattr(args, k) for k in ("repeat", "concurrency", "pages", "slow_delay", "llm_latency")},
+        "peak_rss_mb": round(rss, 1), "results": rows,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(rows, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print(f"\nno regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
-from llama_index.core.tools import FunctionTool
-from llama_index.core.agent.react import ReActAgent
-from llama_index.llms.openai import OpenAI
-
-from .env import SERPAPI_KEY, OPENAI_API_KEY
+import functools
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import tracing
+from .env import SERPAPI_KEY, AUDIT_MODE, AUDIT_WORKERS, AUDIT_TIMEOUT
+from .history import record_run
+from .pipeline import AUDIT_PLAN, aspect_runner, fast_audit, prompt_view
+from .llm_cache import complete_text
+from .page import page_snapshot
+from .results import DomainAudit
+from .synthesis import stream_sections, synthesize_report
 from .prompts import (
     SYSTEM_PROMPT, TECHNICAL_PROMPT, CONTENT_PROMPT, UX_PROMPT
 )
@@ -10,30 +20,95 @@ from .tools.technical import *
 from .tools.content import *
 from .tools.ux import *
 from .tools.competitor import *
+from .tools.llm import get_llm
+
+# llama_index, the OpenAI client, tool schemas and agents are all built on
+# first use (see __getattr__ at the bottom), so importing this module to call
+# a single tool or run a worker process stays cheap.
+
 
-llm = OpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY, temperature=0.3, request_timeout=990)
+def _response_text(resp):
+    if hasattr(resp, "response"):
+        return resp.response
+    if hasattr(resp, "text"):
+        return resp.text
+    return resp if isinstance(resp, (dict, list, str)) else str(resp)
 
 
+def run_domain_audits(domains, aspects: dict, workers: int = AUDIT_WORKERS, timeout: float = AUDIT_TIMEOUT) -> dict:
+    """
+    Run every aspect(domain) callable for every domain concurrently, at most
+    `workers` at a time. A task still running `timeout` seconds after it
+    started gets "timed out" and its slot goes to the next queued task (its
+    thread is left to finish on its own); everything that did finish is
+    kept. Returns {domain: {aspect: result}}.
+    """
+    results = {d: {} for d in domains}
+    queued = deque((d, name, fn) for d in domains for name, fn in aspects.items())
+    # threads are created on demand; the extra ones only replace tasks abandoned after a timeout
+    pool = ThreadPoolExecutor(max_workers=max(1, len(queued)))
+    task = tracing.bind(lambda d, fn: _response_text(fn(d)))
+    running = {}  # future -> (domain, aspect, started)
+
+    def fill():
+        while queued and len(running) < workers:
+            d, name, fn = queued.popleft()
+            running[pool.submit(task, d, fn)] = (d, name, time.monotonic())
 
-def smart_competitor_analysis(domain: str, serpapi_key: str):
-    """Full competitor SEO audit: discover real competitors, audit each, compare all, synthesize a detailed report in markdown."""
+    try:
+        fill()
+        while running:
+            done, _ = wait(running, timeout=1.0, return_when=FIRST_COMPLETED)
+            for fut in done:
+                d, name, _ = running.pop(fut)
+                try:
+                    results[d][name] = fut.result()
+                except Exception as e:
+                    results[d][name] = {"error": str(e)}
+            now = time.monotonic()
+            for fut, (d, name, started) in list(running.items()):
+                if now - started > timeout:
+                    del running[fut]
+                    results[d][name] = {"error": f"timed out after {timeout:g}s"}
+            fill()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    for d in domains:
+        print(f"[DEBUG] Audit for {d} complete ({len(results[d])}/{len(aspects)} aspects).")
+    return results
+
+
+def record_audits(raw: dict, kind: str = "audit"):
+    """Keep each domain's competitor-audit results in the history store."""
+    for domain, aspects in raw.items():
+        errors = [v["error"] for v in aspects.values() if isinstance(v, dict) and "error" in v]
+        record_run(domain, aspects, kind=kind, error=errors[0] if errors and len(errors) == len(aspects) else None)
+
+
+def smart_competitor_analysis(domain: str, serpapi_key: str, on_section=None, audit=None):
+    """
+    Full competitor SEO audit: discover real competitors, audit each, compare all, synthesize a detailed report in markdown.
+    Finished report sections go to `on_section(section, text)`, or to SEOSCAN_REPORT_STREAM when it is None.
+    `audit(domains, aspects)` replaces run_domain_audits (e.g. to reuse recent audits); it records its own runs.
+    """
     print(f"\n[INFO] [smart_competitor_analysis] Getting homepage details for {domain} ...")
-    html = requests.get(normalize_url(domain), timeout=10).text
-    soup = BeautifulSoup(html, "html.parser")
-    title = soup.title.string.strip() if soup.title else ""
-    meta = soup.find("meta", attrs={"name": "description"})
-    desc = meta["content"] if meta and meta.get("content") else ""
+    page = page_snapshot(domain, timeout=10)
+    title, desc = page.title, page.meta_description
     words = re.findall(r'\b\w{4,}\b', (title + " " + desc).lower())
     combined_keywords = list(dict.fromkeys(words))[:6]
     print(f"[DEBUG] Homepage title: {title}")
     print(f"[DEBUG] Homepage desc: {desc}")
     print(f"[DEBUG] Combined keywords: {combined_keywords}")
 
-    llm = Ollama(model="qwen3:4b", request_timeout=120)
-    search_query = extract_search_query(llm, title, desc, combined_keywords)
+    search_query = extract_search_query(get_llm("query"), title, desc, combined_keywords)
     print(f"[DEBUG] Final Search Query: {search_query}")
 
-    urls = serpapi_google_search(search_query, top_n=8, api_key=SERPAPI_KEY)
+    try:
+        urls = serpapi_google_search(search_query, top_n=8, api_key=SERPAPI_KEY)
+    except Exception as e:
+        # a bad key or exhausted quota still yields a report on the main domain alone
+        print(f"[WARN] Competitor search failed, auditing {domain} alone: {e}", file=sys.stderr)
+        urls = []
     main_domain = urlparse(normalize_url(domain)).netloc.replace("www.", "")
     EXCLUDED_DOMAINS = [
         "wikipedia", "github", "reddit", "stack", "quora", "news.ycombinator", "google", "pdf",
@@ -61,53 +136,35 @@ def smart_competitor_analysis(domain: str, serpapi_key: str):
 
     # Audit main + competitors using agents
     all_domains = [main_domain] + competitors
-    audits = {}
-    keyword_focuses = {}
-    for d in all_domains:
-        print(f"[INFO] Auditing {d} ...")
-        audits[d] = {
-            "technical": TechnicalAgent.chat(f"Audit technical SEO for {d}"),
-            "content": ContentAgent.chat(f"Audit content SEO for {d}"),
-            "ux": UXAgent.chat(f"Audit UX and mobile SEO for {d}"),
-        }
-        keyword_focuses[d] = ContentAgent.chat(
-            f"Run keyword_extraction_tool on {d} and summarize the top keywords with brief explanations."
+    print(f"[INFO] Auditing {', '.join(all_domains)} ...")
+    if AUDIT_MODE == "pipeline":
+        raw = (audit or run_domain_audits)(
+            all_domains, {a: aspect_runner(a, main_domain, competitors) for a in AUDIT_PLAN}
         )
-        print(f"[DEBUG] Audit for {d} complete.")
-
-    # Construct report prompt for LLM agent
-    import json
-    final_report_prompt = f"""
-You are SeoScan, a senior SEO consultant.
-Here are detailed audit results for the MAIN WEBSITE and its competitors.
-
-MAIN WEBSITE: {main_domain}
-COMPETITORS: {', '.join(competitors)}
-
-## Technical, Content, and UX Audits (JSON):
-{json.dumps(audits, indent=2)}
-
-## Keyword Focus Analyses (JSON):
-{json.dumps(keyword_focuses, indent=2)}
-
-Instructions:
-- Output MUST be long, thorough, with each tool fully explained and never skipped. Use markdown (sections, tables, bullets). Minimum 700 words. If findings are brief, expand with best practices.
-synthesize a big, comprehensive, sectioned answer after running all relevant tools, it will try to be efficient, not exhaustive.
-- Write a LONG, professional, markdown-formatted competitor audit report, at least 1500 words.
-- Start with an executive summary (at least 400 words) on how the main website compares to competitors.
-- For each SEO aspect (robots.txt, sitemap, performance, schema, accessibility, mobile, headers, redirects, keyword focus), explain what it is and why it matters for SEO.
-- In a comparison table, summarize each site's strengths and weaknesses for all SEO topics.
-- Write bullet-point lists of strengths/weaknesses for each site.
-- Add a full "Keyword Focus Analysis" section for each domain, showing and commenting on its main keywords.
-- End with an "Actionable Recommendations" section for the main website, referencing what competitors do better and a prioritized to-do list.
-- The report MUST be DETAILED, COMPREHENSIVE, LONG, and USE RICH MARKDOWN with headings, tables, and lists.
-- DO NOT output summaries or short answers. Expand with best practices and further observations if short.
-- NEVER output placeholder competitor names—use only real discovered domains.
-
----
-"""
-    print("[DEBUG] Submitting audits and keyword focus data to LLM for report synthesis...")
-    report = llm.complete(final_report_prompt).text
+    else:
+        background = f" with competitors={competitors}" if competitors else ""
+        raw = (audit or run_domain_audits)(all_domains, {
+            "technical": lambda d: make_technical_agent().chat(f"Audit technical SEO for {d}"),
+            "content": lambda d: make_content_agent().chat(f"Audit content SEO for {d}"),
+            "ux": lambda d: make_ux_agent().chat(f"Audit UX and mobile SEO for {d}"),
+            "keywords": lambda d: make_content_agent().chat(
+                f"Run keyword_extraction_tool on {d}{background if d == main_domain else ''}"
+                " and summarize the top keywords with brief explanations."
+            ),
+        })
+    audits = [DomainAudit.from_aspects(d, raw[d]) for d in all_domains]
+    if audit is None:
+        record_audits(raw, kind="audit" if AUDIT_MODE == "pipeline" else "agent")
+    del raw
+
+    print("[DEBUG] Synthesizing report sections from audit tables...")
+    started = time.time()
+    report = synthesize_report(
+        get_llm("synthesis"), audits, main_domain, competitors,
+        on_section=on_section if on_section is not None else stream_sections(),
+    )
+    record_run(main_domain, kind="report", started_at=started, duration_s=round(time.time() - started, 3),
+               report=report, competitors=competitors)
     print("[DEBUG] Report synthesis complete.\n")
     return report
 
@@ -116,16 +173,10 @@ def competitor_agent_tool(domain: str) -> str:
     Discover real competitors, audit all (main+competitors), synthesize a full-length markdown SEO report.
     Includes detailed debugging checkpoints for every critical step.
     """
-    import json
-
-
     # 1. Fetch homepage and extract info
     try:
-        html = requests.get(normalize_url(domain), timeout=10).text
-        soup = BeautifulSoup(html, "html.parser")
-        title = soup.title.string.strip() if soup.title else ""
-        meta = soup.find("meta", attrs={"name": "description"})
-        desc = meta["content"] if meta and meta.get("content") else ""
+        page = page_snapshot(domain, timeout=10)
+        title, desc = page.title, page.meta_description
         kw_result = keyword_extraction_tool(domain)
         keywords = kw_result.get("top_keywords", [])
     except Exception as e:
@@ -145,7 +196,7 @@ Write a short, natural Google search query (4-8 words) that a real user would ty
 - Do NOT use quotes, operators, or special symbols.
 - Output only the search query, with NO thinking, NO explanations, and NO extra text. Just the query.
 """
-        search_query = llm.complete(prompt).text.strip().splitlines()[-1]
+        search_query = complete_text(get_llm("query"), prompt).strip().splitlines()[-1]
     except Exception as e:
         return f"Error generating competitor discovery query: {e}"
 
@@ -177,118 +228,154 @@ Write a short, natural Google search query (4-8 words) that a real user would ty
             break
 
     # 5. Audit each domain
-    audits = {}
-    for d in [main_netloc] + competitors:
-        try:
-            audits[d] = {
-                "technical": technical_agent_tool(d),
-                "content": content_agent_tool(d),
-                "ux": ux_agent_tool(d),
-            }
-            # Prepare readable summary for debug and LLM prompt
-            summary = {}
-            for k, v in audits[d].items():
-                if hasattr(v, "response"):
-                    summary[k] = v.response
-                elif hasattr(v, "text"):
-                    summary[k] = v.text
-                else:
-                    summary[k] = str(v)
-            debug_str = json.dumps(summary, indent=2)[:1500]
-
-            # Save summary for LLM
-            audits[d] = summary
-        except Exception as e:
-            audits[d] = {"error": str(e)}
-    # 6. LLM synthesis prompt for full-length markdown report
-    synth_prompt = f"""
-You are SeoScan, a senior SEO consultant.
-
-MAIN WEBSITE: {main_netloc}
-COMPETITORS: {', '.join(competitors)}
-
-Here are technical, content, and UX audits for each (in JSON):
-
-{json.dumps(audits, indent=2)}
-
-Instructions:
-- Write a LONG, professional, markdown-formatted competitor audit report, at LEAST 1500 words.
-- Start with an executive summary (at LEAST 400 words) comparing the main site to its real competitors.
-- For each SEO aspect (robots.txt, sitemap, performance, schema, accessibility, mobile, headers, redirects, keyword focus), explain what it is, why it matters, and compare findings.
-- Add a comparison table, strengths/weaknesses, and keyword focus analysis for every site.
-- Finish with prioritized actionable recommendations for the main website, referencing what competitors do better.
-- Never use placeholder names. Always use the actual discovered competitor domains.
-- Expand with best practices and further observations if any section is brief.
-"""
-
-    print("[DEBUG] Sending all audits to LLM for synthesis of final report...")
+    if AUDIT_MODE == "pipeline":
+        aspects = {a: aspect_runner(a, main_netloc, competitors) for a in AUDIT_PLAN}
+    else:
+        aspects = {"technical": technical_agent_tool, "content": content_agent_tool, "ux": ux_agent_tool}
+    all_domains = [main_netloc] + competitors
+    raw = run_domain_audits(all_domains, aspects)
+    audits = [DomainAudit.from_aspects(d, raw[d]) for d in all_domains]
+    if AUDIT_MODE == "pipeline":
+        # the sub-agent tools used otherwise record their own answers
+        record_audits(raw)
+    del raw
+    # 6. Synthesize the report section by section, streaming each as it finishes
+    print("[DEBUG] Synthesizing report sections from audit tables...")
+    started = time.time()
     try:
-        result = llm.complete(synth_prompt)
-        final_report = result.text if hasattr(result, "text") else str(result)
+        final_report = synthesize_report(get_llm("synthesis"), audits, main_netloc, competitors, on_section=stream_sections())
     except Exception as e:
         return f"Error generating final competitor report: {e}"
+    record_run(main_netloc, kind="report", started_at=started, duration_s=round(time.time() - started, 3),
+               report=final_report, competitors=competitors)
 
     return final_report
 
-TECHNICAL_TOOLS = [
-    FunctionTool.from_defaults(fn=robots_txt_tool, name="robots_txt_tool", description=robots_txt_tool.__doc__),
-    FunctionTool.from_defaults(fn=sitemap_tool, name="sitemap_tool", description=sitemap_tool.__doc__),
-    FunctionTool.from_defaults(fn=broken_links_tool, name="broken_links_tool", description=broken_links_tool.__doc__),
-    FunctionTool.from_defaults(fn=http_headers_tool, name="http_headers_tool", description=http_headers_tool.__doc__),
-    FunctionTool.from_defaults(fn=redirect_check_tool, name="redirect_check_tool", description=redirect_check_tool.__doc__),
-    FunctionTool.from_defaults(fn=lighthouse_tool, name="lighthouse_tool", description=lighthouse_tool.__doc__),
-    FunctionTool.from_defaults(fn=crawlability_tool, name="crawlability_tool", description=crawlability_tool.__doc__),
-]
-
-CONTENT_TOOLS = [
-    FunctionTool.from_defaults(fn=schema_validation_tool, name="schema_validation_tool", description=schema_validation_tool.__doc__),
-    FunctionTool.from_defaults(fn=keyword_extraction_tool, name="keyword_extraction_tool", description=keyword_extraction_tool.__doc__),
-    FunctionTool.from_defaults(fn=llm_keywords_from_content_tool, name="llm_keywords_from_content_tool", description=llm_keywords_from_content_tool.__doc__),
-    FunctionTool.from_defaults(fn=gather_competitor_keywords_tool, name="gather_competitor_keywords_tool", description=gather_competitor_keywords_tool.__doc__),
-]
-
-UX_TOOLS = [
-    FunctionTool.from_defaults(fn=accessibility_tool, name="accessibility_tool", description=accessibility_tool.__doc__),
-    FunctionTool.from_defaults(fn=mobile_friendly_tool, name="mobile_friendly_tool", description=mobile_friendly_tool.__doc__),
-]
-
-COMPETITOR_TOOLS = [
-    FunctionTool.from_defaults(
-        fn=lambda domain, count=5: find_competitors_tool(domain, count, serpapi_key=SERPAPI_KEY),
-        name="find_competitors_tool",
-        description="Finds up to 5 real competitor websites for the domain using Google and SerpAPI"
-    ),
-     FunctionTool.from_defaults(
-         fn=lambda domain: smart_competitor_analysis(domain, serpapi_key=SERPAPI_KEY),
-         name="smart_competitor_analysis",
-         description="Performs full competitor audit using SerpAPI/Google competitor discovery"
-     ),
-]
+def _prompt_sized(fn):
+    """Tool whose output is trimmed with prompt_view before the agent reads it."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return prompt_view(fn(*args, **kwargs))
+    return wrapper
 
 
-TechnicalAgent = ReActAgent.from_tools(TECHNICAL_TOOLS, max_iterations=40, llm=llm, system_prompt=TECHNICAL_PROMPT)
-ContentAgent = ReActAgent.from_tools(CONTENT_TOOLS, max_iterations=40, llm=llm, system_prompt=CONTENT_PROMPT)
-UXAgent = ReActAgent.from_tools(UX_TOOLS, llm=llm, max_iterations=40, system_prompt=UX_PROMPT)
+def _function_tools(fns, descriptions: dict = None) -> list:
+    from llama_index.core.tools import FunctionTool
 
+    descriptions = descriptions or {}
+    return [
+        FunctionTool.from_defaults(
+            fn=_prompt_sized(tracing.traced_tool(fn)), name=fn.__name__,
+            description=descriptions.get(fn.__name__, fn.__doc__),
+        )
+        for fn in fns
+    ]
 
-def technical_agent_tool(domain: str) -> str:
-    return TechnicalAgent.chat(f"Run each technical SEO tool ONCE on {domain}. Do not call other agents or tools recursively.")
 
-def content_agent_tool(domain: str) -> str:
-    return ContentAgent.chat(f"SEO audit for {domain}")
+def _competitor_tools() -> list:
+    from llama_index.core.tools import FunctionTool
+
+    return [
+        FunctionTool.from_defaults(
+            fn=tracing.traced_tool(
+                lambda domain, count=5: find_competitors_tool(domain, count, serpapi_key=SERPAPI_KEY),
+                "find_competitors_tool",
+            ),
+            name="find_competitors_tool",
+            description="Finds up to 5 real competitor websites for the domain using Google and SerpAPI"
+        ),
+        FunctionTool.from_defaults(
+            fn=tracing.traced_tool(
+                lambda domain: smart_competitor_analysis(domain, serpapi_key=SERPAPI_KEY), "smart_competitor_analysis"
+            ),
+            name="smart_competitor_analysis",
+            description="Performs full competitor audit using SerpAPI/Google competitor discovery"
+        ),
+    ]
 
-def ux_agent_tool(domain: str) -> str:
-    return UXAgent.chat(f"SEO audit for {domain}")
 
-SUBAGENT_TOOLS = [
-    FunctionTool.from_defaults(fn=technical_agent_tool, name="technical_agent_tool", description="Calls the TechnicalAgent subagent."),
-    FunctionTool.from_defaults(fn=content_agent_tool, name="content_agent_tool", description="Calls the ContentAgent subagent."),
-    FunctionTool.from_defaults(fn=ux_agent_tool, name="ux_agent_tool", description="Calls the UXAgent subagent."),
-    FunctionTool.from_defaults(fn=competitor_agent_tool, name="competitor_agent_tool", description="Calls the CompetitorAgent for competitor analysis subagent."),
-]
+def _react_agent(tools, prompt, max_iterations=40):
+    from llama_index.core.agent.react import ReActAgent
 
-ALL_TOOLS = TECHNICAL_TOOLS + CONTENT_TOOLS + UX_TOOLS + SUBAGENT_TOOLS
+    return ReActAgent.from_tools(tools, max_iterations=max_iterations, llm=get_llm("agent"), system_prompt=prompt)
 
-SeoOrchestrator = ReActAgent.from_tools(
-    ALL_TOOLS, llm=llm, max_iterations=120, system_prompt=SYSTEM_PROMPT,
-)
+
+def make_technical_agent():
+    return _react_agent(_lazy("TECHNICAL_TOOLS"), TECHNICAL_PROMPT)
+
+def make_content_agent():
+    return _react_agent(_lazy("CONTENT_TOOLS"), CONTENT_PROMPT)
+
+def make_ux_agent():
+    return _react_agent(_lazy("UX_TOOLS"), UX_PROMPT)
+
+
+def _agent_audit(domain: str, aspect: str, make_agent, message: str):
+    """ReAct sub-agent answer, kept in the audit history as prose for its aspect."""
+    started = time.time()
+    resp = make_agent().chat(message)
+    record_run(domain, {aspect: _response_text(resp)}, kind="agent", started_at=started,
+               duration_s=round(time.time() - started, 3))
+    return resp
+
+
+# Sub-agent tools build a fresh agent per call so concurrent audits never share chat memory.
+# In pipeline mode they skip the ReAct loop: run the fixed tool plan, then one LLM call.
+def technical_agent_tool(domain: str) -> str:
+    """Calls the TechnicalAgent subagent."""
+    if AUDIT_MODE == "pipeline":
+        return fast_audit(domain, ["technical"])
+    return _agent_audit(domain, "technical", make_technical_agent, f"Run each technical SEO tool ONCE on {domain}. Do not call other agents or tools recursively.")
+
+def content_agent_tool(domain: str) -> str:
+    """Calls the ContentAgent subagent."""
+    if AUDIT_MODE == "pipeline":
+        return fast_audit(domain, ["content"])
+    return _agent_audit(domain, "content", make_content_agent, f"SEO audit for {domain}")
+
+def ux_agent_tool(domain: str) -> str:
+    """Calls the UXAgent subagent."""
+    if AUDIT_MODE == "pipeline":
+        return fast_audit(domain, ["ux"])
+    return _agent_audit(domain, "ux", make_ux_agent, f"SEO audit for {domain}")
+
+
+# Module attributes built on first access: name -> factory
+_LAZY = {
+    "llm": lambda: get_llm("agent"),
+    "TECHNICAL_TOOLS": lambda: _function_tools([
+        robots_txt_tool, sitemap_tool, broken_links_tool, http_headers_tool,
+        redirect_check_tool, lighthouse_tool, crawlability_tool,
+    ]),
+    "CONTENT_TOOLS": lambda: _function_tools([
+        schema_validation_tool, keyword_extraction_tool, llm_keywords_from_content_tool, gather_competitor_keywords_tool,
+    ]),
+    "UX_TOOLS": lambda: _function_tools([accessibility_tool, mobile_friendly_tool]),
+    "COMPETITOR_TOOLS": _competitor_tools,
+    "SUBAGENT_TOOLS": lambda: _function_tools(
+        [technical_agent_tool, content_agent_tool, ux_agent_tool, competitor_agent_tool],
+        {"competitor_agent_tool": "Calls the CompetitorAgent for competitor analysis subagent."},
+    ),
+    "ALL_TOOLS": lambda: (
+        _lazy("TECHNICAL_TOOLS") + _lazy("CONTENT_TOOLS") + _lazy("UX_TOOLS") + _lazy("SUBAGENT_TOOLS")
+    ),
+    "TechnicalAgent": make_technical_agent,
+    "ContentAgent": make_content_agent,
+    "UXAgent": make_ux_agent,
+    "SeoOrchestrator": lambda: _react_agent(_lazy("ALL_TOOLS"), SYSTEM_PROMPT, max_iterations=120),
+}
+_built = {}
+_build_lock = threading.RLock()
+
+
+def _lazy(name: str):
+    with _build_lock:
+        if name not in _built:
+            _built[name] = _LAZY[name]()
+        return _built[name]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
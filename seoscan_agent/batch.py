@@ -0,0 +1,228 @@
+"""
+Headless batch audits.
+
+    python -m seoscan_agent.batch domains.txt -o results.jsonl --workers 8
+    cat domains.txt | python -m seoscan_agent.batch - -o results.jsonl --mode process
+
+Each finished domain is appended to the output as one JSON line. Re-running
+with the same output file skips domains that already have a line, so a
+crashed or interrupted run picks up where it stopped.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+
+from . import tracing
+from .env import AUDIT_WORKERS
+from .fetch import audit_scope
+from .history import record_run
+from .incremental import reaudit
+from .pipeline import interpret, run_plan
+from .utils import normalize_url
+
+
+def read_domains(source) -> list:
+    """Domains from a file path, "-" for stdin, or an iterable of lines; blank lines and # comments skipped."""
+    if source == "-":
+        lines = sys.stdin
+    elif isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    else:
+        lines = source
+    seen = set()
+    domains = []
+    for line in lines:
+        domain = line.split("#", 1)[0].strip()
+        if domain and domain.lower() not in seen:
+            seen.add(domain.lower())
+            domains.append(domain)
+    return domains
+
+
+def completed_domains(path: str, retry_failed: bool = False) -> set:
+    """Lower-cased domains already written to a JSONL output file. Truncated lines are ignored."""
+    done = set()
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if retry_failed and "error" in record:
+                continue
+            done.add(str(record.get("domain", "")).lower())
+    return done
+
+
+def audit_domain(domain: str, aspects=None, report: bool = False, incremental: bool = False,
+                 profile_dir: str = None, on_tool=None) -> dict:
+    """
+    Structured audit of one domain as a JSON-serializable record; never raises.
+    With `incremental` the audit reuses the domain's last snapshot and the
+    record carries the reused tools and a diff against the previous audit.
+    With `profile_dir` (or SEOSCAN_PROFILE_DIR) the audit is traced and the
+    record gets its profile path and hottest paths. `on_tool` is passed to
+    run_plan for per-tool progress.
+    """
+    started = time.time()
+    record = {"domain": domain, "url": normalize_url(domain), "started_at": started}
+    trace = None
+    try:
+        with tracing.audit_trace(domain, profile_dir=profile_dir) as trace, audit_scope():
+            if incremental:
+                audit = reaudit(domain, aspects, on_tool=on_tool)
+                results = audit["results"]
+                record.update(results=results, reused=audit["reused"], diff=audit["diff"])
+            else:
+                results = run_plan(domain, aspects, on_tool=on_tool)
+                record["results"] = results
+            outputs = [r for k, tools in results.items() if not k.startswith("_") for r in tools.values()]
+            if outputs and all(isinstance(r, dict) and "error" in r for r in outputs):
+                # nothing reachable: mark the record failed so --retry-failed picks it up
+                record["error"] = outputs[0]["error"]
+                return record
+            if report:
+                record["report"] = interpret(domain, results)
+    except Exception as e:
+        record["error"] = str(e)
+    finally:
+        record["duration_s"] = round(time.time() - started, 3)
+        record_run(domain, record.get("results"), started_at=started, duration_s=record["duration_s"],
+                   report=record.get("report"), error=record.get("error"))
+        if trace is not None:
+            summary = trace.summary(top=5)
+            record["profile"] = {
+                "path": trace.profile_path, "spans": summary["spans"], "by_kind": summary["by_kind"],
+                "hot_paths": [{k: h[k] for k in ("path", "count", "self_ms", "total_ms")} for h in summary["hot_paths"]],
+            }
+    return record
+
+
+class Progress:
+    """Single-line done/total, throughput and ETA report, redrawn at most every `interval` seconds."""
+
+    def __init__(self, total: int, stream=sys.stderr, interval: float = 1.0):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._drawn = 0.0
+
+    def update(self, record: dict):
+        self.done += 1
+        if "error" in record:
+            self.failed += 1
+        now = time.monotonic()
+        if now - self._drawn >= self.interval or self.done == self.total:
+            self._drawn = now
+            self.stream.write("\r" + self.line(now))
+            self.stream.flush()
+
+    def line(self, now: float = None) -> str:
+        elapsed = (now or time.monotonic()) - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        eta = remaining / rate if rate else float("inf")
+        eta_text = time.strftime("%H:%M:%S", time.gmtime(eta)) if eta != float("inf") else "--:--:--"
+        return (f"[{self.done}/{self.total}] {self.failed} failed | "
+                f"{rate * 60:.1f} domains/min | elapsed {elapsed:.0f}s | ETA {eta_text}")
+
+    def close(self):
+        if self.done:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def run_batch(domains, output: str, workers: int = AUDIT_WORKERS, mode: str = "thread",
+              aspects=None, report: bool = False, resume: bool = True, retry_failed: bool = False,
+              progress: bool = True, incremental: bool = False, profile_dir: str = None) -> dict:
+    """
+    Audit `domains` on a pool of `workers` threads or processes, appending each
+    record to `output` (JSONL, "-" for stdout) as soon as it completes.
+    Returns counts of audited, skipped and failed domains.
+    """
+    to_stdout = output == "-"
+    done = completed_domains(output, retry_failed) if resume and not to_stdout else set()
+    pending = [d for d in domains if d.lower() not in done]
+    skipped = len(domains) - len(pending)
+    tracker = Progress(len(pending)) if progress else None
+    job = partial(audit_domain, aspects=aspects, report=report, incremental=incremental, profile_dir=profile_dir)
+    pool_cls = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    workers = max(1, min(workers, len(pending) or 1))
+
+    out = sys.stdout if to_stdout else open(output, "a+", encoding="utf-8")
+    try:
+        if not to_stdout and out.tell():
+            # a crash can leave a partial last line; start the next record on a fresh one
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+        failed = 0
+        queue = iter(pending)
+        with pool_cls(max_workers=workers) as pool:
+            # keep a bounded window of submissions so thousands of domains don't
+            # become thousands of queued futures (or pickled jobs in process mode)
+            running = set()
+            for domain in queue:
+                running.add(pool.submit(job, domain))
+                if len(running) >= workers * 2:
+                    break
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    record = fut.result()
+                    failed += "error" in record
+                    out.write(json.dumps(record, default=str) + "\n")
+                    out.flush()
+                    if tracker:
+                        tracker.update(record)
+                    domain = next(queue, None)
+                    if domain is not None:
+                        running.add(pool.submit(job, domain))
+    finally:
+        if tracker:
+            tracker.close()
+        if not to_stdout:
+            out.close()
+    return {"audited": len(pending), "skipped": skipped, "failed": failed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m seoscan_agent.batch", description="Audit many domains unattended.")
+    parser.add_argument("domains", help="file with one domain per line, or - for stdin")
+    parser.add_argument("-o", "--output", default="seoscan_results.jsonl", help="JSONL output file, or - for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=AUDIT_WORKERS, help="concurrent domain audits")
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread",
+                        help="thread pool (I/O bound, default) or process pool (CPU bound parsing)")
+    parser.add_argument("--aspects", default="", help="comma-separated subset of technical,content,ux")
+    parser.add_argument("--report", action="store_true", help="also write an LLM report per domain")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse each domain's last snapshot and record what changed since")
+    parser.add_argument("--profile", metavar="DIR", default=None,
+                        help="trace each audit and write its JSON profile (spans and hot paths) to DIR")
+    parser.add_argument("--no-resume", action="store_true", help="re-audit domains already in the output")
+    parser.add_argument("--retry-failed", action="store_true", help="re-audit domains whose last record is an error")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress line")
+    args = parser.parse_args(argv)
+
+    aspects = [a.strip() for a in args.aspects.split(",") if a.strip()] or None
+    domains = read_domains(args.domains)
+    summary = run_batch(
+        domains, args.output, workers=args.workers, mode=args.mode, aspects=aspects,
+        report=args.report, resume=not args.no_resume, retry_failed=args.retry_failed,
+        progress=not args.quiet, incremental=args.incremental, profile_dir=args.profile,
+    )
+    print(f"audited {summary['audited']}, skipped {summary['skipped']}, failed {summary['failed']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import asyncio
+import hashlib
+import time
+from collections import deque
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from .env import CRAWL_DELAY, CRAWL_WORKERS, USER_AGENT
+from .fetch import current_cache, in_audit_scope
+from .http_engine import engine, run
+from .page import PageSnapshot
+from .robots import robots_cache
+from .utils import normalize_url
+
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize(url: str, base: str = None) -> str:
+    """
+    Canonical form used for deduplication: absolute, lowercase scheme/host,
+    no default port or fragment, tracking params dropped, query sorted.
+    Returns "" for anything that is not an http(s) URL.
+    """
+    if base:
+        url = urljoin(base, url)
+    try:
+        p = urlparse(url.strip())
+        port = p.port
+    except ValueError:
+        return ""
+    scheme = p.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not p.hostname:
+        return ""
+    netloc = p.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc += f":{port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunparse((scheme, netloc, p.path or "/", "", urlencode(query), ""))
+
+
+def site_key(url: str) -> str:
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class CrawledPage:
+    __slots__ = ("url", "status", "depth", "content_type", "title", "links_out", "elapsed", "error")
+
+    def __init__(self, url, status=None, depth=0, content_type="", title="", links_out=0, elapsed=0.0, error=None):
+        self.url = url
+        self.status = status
+        self.depth = depth
+        self.content_type = content_type
+        self.title = title
+        self.links_out = links_out
+        self.elapsed = elapsed
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class CrawlResult:
+    """
+    Output of one crawl, kept small enough to hold for 100k-page sites:
+    per-page summaries (no HTML) plus every distinct link found and the first
+    page it was seen on, up to `max_links`.
+    """
+
+    def __init__(self, start_url: str, max_links: int):
+        self.start_url = start_url
+        self.pages = []
+        self.links = {}             # canonical link URL -> first referring page
+        self.max_links = max_links
+        self.blocked_by_robots = 0
+        self.dropped_links = 0      # links not recorded/queued because a budget was hit
+        self.unchanged_pages = 0    # answered 304 to a conditional request
+        self.states = None          # url -> validators/hash/links, when the crawl tracks state
+        self.started = time.time()
+        self.finished = None
+
+    def add_link(self, url: str, referrer: str):
+        if url in self.links:
+            return
+        if len(self.links) >= self.max_links:
+            self.dropped_links += 1
+            return
+        self.links[url] = referrer
+
+    def summary(self) -> dict:
+        statuses = {}
+        for p in self.pages:
+            key = str(p.status) if p.status is not None else "error"
+            statuses[key] = statuses.get(key, 0) + 1
+        return {
+            "start_url": self.start_url,
+            "pages_crawled": len(self.pages),
+            "max_depth_reached": max((p.depth for p in self.pages), default=0),
+            "status_counts": statuses,
+            "links_found": len(self.links),
+            "blocked_by_robots": self.blocked_by_robots,
+            "dropped_links": self.dropped_links,
+            "unchanged_pages": self.unchanged_pages,
+            "duration_s": round((self.finished or time.time()) - self.started, 2),
+        }
+
+
+class Crawler:
+    """
+    Breadth-first crawler for a single site. The frontier holds at most
+    `max_frontier` URLs and the seen-set stores 8-byte digests, so memory stays
+    bounded no matter how large the site is.
+
+    With `known` (url -> state from a previous crawl's `result.states`) pages
+    are requested conditionally and a 304 reuses the stored links instead of
+    downloading and parsing the page again.
+    """
+
+    def __init__(self, start_url: str, max_pages: int = 100, max_depth: int = 3, workers: int = CRAWL_WORKERS,
+                 delay: float = CRAWL_DELAY, respect_robots: bool = True, max_frontier: int = 50000,
+                 max_links: int = 200000, timeout: float = 15, on_page=None, known: dict = None):
+        self.start_url = canonicalize(normalize_url(start_url))
+        self.site = site_key(self.start_url)
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.workers = workers
+        self.delay = delay
+        self.respect_robots = respect_robots
+        self.max_frontier = max_frontier
+        self.timeout = timeout
+        self.on_page = on_page
+        self.result = CrawlResult(self.start_url, max_links)
+        self.known = known
+        if known is not None:
+            self.result.states = {}
+        self._frontier = deque()
+        self._seen = set()
+        self._in_flight = 0
+        self._next_slot = {}
+        self._host_delay = {}
+
+    def _mark_seen(self, url: str) -> bool:
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+        if digest in self._seen:
+            return False
+        self._seen.add(digest)
+        return True
+
+    def _enqueue(self, url: str, depth: int):
+        if depth > self.max_depth or not self._mark_seen(url):
+            return
+        if len(self._frontier) >= self.max_frontier:
+            self.result.dropped_links += 1
+            return
+        self._frontier.append((url, depth))
+
+    async def _allowed(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+        rules = await robots_cache.get_async(url)
+        host = urlparse(url).netloc
+        if host not in self._host_delay:
+            self._host_delay[host] = max(self.delay, min(rules.crawl_delay() or 0, 10))
+        return rules.is_allowed(url)
+
+    async def _polite_wait(self, url: str):
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self._host_delay.get(host, self.delay)
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _follow(self, url: str, links, depth: int):
+        for link in links:
+            self.result.add_link(link, url)
+            if site_key(link) == self.site:
+                self._enqueue(link, depth + 1)
+
+    async def _visit(self, url: str, depth: int):
+        if not await self._allowed(url):
+            self.result.blocked_by_robots += 1
+            return
+        await self._polite_wait(url)
+        page = CrawledPage(url, depth=depth)
+        start = time.monotonic()
+        previous = self.known.get(url) if self.known else None
+        headers = {"User-Agent": USER_AGENT}
+        if previous:
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+        try:
+            r = await engine.get(
+                url, timeout=self.timeout, headers=headers,
+                read_body=lambda r: "html" in r.headers.get("content-type", ""),
+            )
+            if previous and r.status_code == 304:
+                self.result.unchanged_pages += 1
+                page.status = previous["status"]
+                page.content_type = previous.get("content_type", "")
+                page.title = previous.get("title", "")
+                page.links_out = len(previous.get("links", ()))
+                self._follow(url, previous.get("links", ()), depth)
+                self.result.states[url] = previous
+            else:
+                page.status = r.status_code
+                page.content_type = r.headers.get("content-type", "").split(";")[0]
+                final_url = str(r.url)
+                links = []
+                is_html = "html" in r.headers.get("content-type", "")
+                if is_html and r.status_code < 400 and site_key(final_url) == self.site:
+                    snap = await asyncio.get_running_loop().run_in_executor(
+                        None, PageSnapshot.parse, r.text, final_url
+                    )
+                    page.title = snap.title
+                    page.links_out = len(snap.links)
+                    links = [link for link in (canonicalize(href, final_url) for href in snap.links) if link]
+                    self._follow(url, links, depth)
+                if self.result.states is not None:
+                    self.result.states[url] = {
+                        "status": r.status_code,
+                        "content_type": page.content_type,
+                        "etag": r.headers.get("etag"),
+                        "last_modified": r.headers.get("last-modified"),
+                        "hash": hashlib.blake2b(r.content, digest_size=16).hexdigest() if is_html else None,
+                        "title": page.title,
+                        "links": links,
+                    }
+        except Exception as e:
+            page.error = str(e) or type(e).__name__
+        page.elapsed = round(time.monotonic() - start, 3)
+        self.result.pages.append(page)
+        if self.on_page:
+            self.on_page(page)
+
+    async def _worker(self):
+        while True:
+            if len(self.result.pages) + self._in_flight >= self.max_pages:
+                return
+            if not self._frontier:
+                if self._in_flight == 0:
+                    return
+                await asyncio.sleep(0.05)
+                continue
+            url, depth = self._frontier.popleft()
+            self._in_flight += 1
+            try:
+                await self._visit(url, depth)
+            finally:
+                self._in_flight -= 1
+
+    async def crawl(self) -> CrawlResult:
+        self._enqueue(self.start_url, 0)
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        self.result.finished = time.time()
+        return self.result
+
+
+async def crawl_site_async(domain: str, max_pages: int = 100, max_depth: int = 3, **kwargs) -> CrawlResult:
+    return await Crawler(domain, max_pages=max_pages, max_depth=max_depth, **kwargs).crawl()
+
+
+def crawl_site(domain: str, max_pages: int = 100, max_depth: int = 3, **kwargs) -> CrawlResult:
+    """
+    Crawl a site once per audit. Other tools of the audit asking for the same
+    or a smaller budget reuse the stored result instead of crawling again.
+    Outside an audit_scope every call crawls afresh.
+    """
+    if not in_audit_scope():
+        return run(crawl_site_async(domain, max_pages=max_pages, max_depth=max_depth, **kwargs))
+    key = canonicalize(normalize_url(domain))
+    cache = current_cache()
+    # tools of one audit asking at the same time wait for a single crawl
+    with cache._key_lock("crawl:" + key):
+        cached = cache.memo("crawl", key)
+        if cached is not None and cached[0] >= max_pages and cached[1] >= max_depth:
+            return cached[2]
+        known = cache.memo("crawl_known", key)
+        if known is not None:
+            # an incremental re-audit left the previous crawl's page states for us
+            kwargs.setdefault("known", known)
+        result = run(crawl_site_async(domain, max_pages=max_pages, max_depth=max_depth, **kwargs))
+        cache.set_memo("crawl", key, (max_pages, max_depth, result))
+        return result
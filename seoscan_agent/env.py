@@ -5,4 +5,121 @@ load_dotenv()  # Load from .env file
 
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")
 GOOGLE_PSI_API_KEY = os.getenv("GOOGLE_PSI_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Page fetch cache: in-memory for the length of an audit, optionally persisted on disk
+FETCH_CACHE_TTL = int(os.getenv("SEOSCAN_FETCH_CACHE_TTL", "600"))
+FETCH_CACHE_DIR = os.getenv("SEOSCAN_FETCH_CACHE_DIR")
+FETCH_CACHE_MAX_MB = int(os.getenv("SEOSCAN_FETCH_CACHE_MAX_MB", "256"))
+
+# HTML parser backend for page snapshots: auto, html.parser, lxml or selectolax
+HTML_PARSER = os.getenv("SEOSCAN_HTML_PARSER", "auto")
+
+# Connection pooling for the sync session and the async HTTP engine
+HTTP_MAX_CONNECTIONS = int(os.getenv("SEOSCAN_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_PER_HOST = int(os.getenv("SEOSCAN_HTTP_MAX_PER_HOST", "8"))
+
+# Site crawler
+USER_AGENT = os.getenv("SEOSCAN_USER_AGENT", "SeoScanBot/1.0 (+https://github.com/Bahaatbb/SEO-Scan)")
+CRAWL_WORKERS = int(os.getenv("SEOSCAN_CRAWL_WORKERS", "8"))
+CRAWL_DELAY = float(os.getenv("SEOSCAN_CRAWL_DELAY", "0.25"))
+
+# Link checker: status cache lifetime, total and per-host concurrency
+LINK_CHECK_TTL = int(os.getenv("SEOSCAN_LINK_CHECK_TTL", "3600"))
+LINK_CHECK_CONCURRENCY = int(os.getenv("SEOSCAN_LINK_CHECK_CONCURRENCY", "64"))
+LINK_CHECK_PER_HOST = int(os.getenv("SEOSCAN_LINK_CHECK_PER_HOST", "4"))
+# Broken links kept in broken_links_tool results (prompts only ever show the first few)
+BROKEN_LINKS_MAX = int(os.getenv("SEOSCAN_BROKEN_LINKS_MAX", "1000"))
+
+# Redirect tracing: hops followed before giving up, and the hop count reported as a long chain
+REDIRECT_MAX_HOPS = int(os.getenv("SEOSCAN_REDIRECT_MAX_HOPS", "10"))
+REDIRECT_LONG_CHAIN = int(os.getenv("SEOSCAN_REDIRECT_LONG_CHAIN", "3"))
+
+# How long compiled robots.txt rules are reused per origin
+ROBOTS_CACHE_TTL = int(os.getenv("SEOSCAN_ROBOTS_CACHE_TTL", "3600"))
+# ...and how long a failed fetch (timeout, 5xx) blocks the origin before it is retried
+ROBOTS_RETRY_AFTER = int(os.getenv("SEOSCAN_ROBOTS_RETRY_AFTER", "60"))
+
+# Concurrent domain/agent audits in competitor reports, and seconds each may run before it is given up
+AUDIT_WORKERS = int(os.getenv("SEOSCAN_AUDIT_WORKERS", "6"))
+AUDIT_TIMEOUT = float(os.getenv("SEOSCAN_AUDIT_TIMEOUT", "600"))
+
+# "pipeline" runs the audit tools directly and uses the LLM once to write the report;
+# "react" lets the ReAct sub-agents pick tools themselves
+AUDIT_MODE = os.getenv("SEOSCAN_AUDIT_MODE", "pipeline")
+
+# Persistent LLM completion cache (set the path to an empty string to disable)
+LLM_CACHE_PATH = os.getenv("SEOSCAN_LLM_CACHE_PATH", ".seoscan_cache/llm.sqlite")
+LLM_CACHE_TTL = int(os.getenv("SEOSCAN_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_MB = int(os.getenv("SEOSCAN_LLM_CACHE_MAX_MB", "64"))
+
+# Google search: "serpapi" or the offline "local" stand-in, cached per normalized query
+SERP_BACKEND = os.getenv("SEOSCAN_SERP_BACKEND", "serpapi")
+SERP_LOCAL_FIXTURES = os.getenv("SEOSCAN_SERP_FIXTURES")
+SERP_CACHE_PATH = os.getenv("SEOSCAN_SERP_CACHE_PATH", ".seoscan_cache/serp.sqlite")
+SERP_CACHE_TTL = int(os.getenv("SEOSCAN_SERP_CACHE_TTL", str(7 * 24 * 3600)))
+# Paid searches allowed per period (seconds), e.g. 100 per hour
+SERP_QUOTA = float(os.getenv("SEOSCAN_SERP_QUOTA", "100"))
+SERP_QUOTA_PERIOD = float(os.getenv("SEOSCAN_SERP_QUOTA_PERIOD", "3600"))
+
+# PageSpeed Insights: endpoint (overridable for local stubs), per-key pacing, retries and result cache
+PSI_ENDPOINT = os.getenv("SEOSCAN_PSI_ENDPOINT", "https://www.googleapis.com/pagespeedonline/v5/runPagespeed")
+PSI_RATE_PER_MIN = float(os.getenv("SEOSCAN_PSI_RATE_PER_MIN", "240"))
+PSI_MAX_RETRIES = int(os.getenv("SEOSCAN_PSI_MAX_RETRIES", "4"))
+PSI_CACHE_PATH = os.getenv("SEOSCAN_PSI_CACHE_PATH", ".seoscan_cache/psi.sqlite")
+PSI_CACHE_TTL = int(os.getenv("SEOSCAN_PSI_CACHE_TTL", str(24 * 3600)))
+
+# Per-domain audit snapshots used by incremental re-audits
+SNAPSHOT_PATH = os.getenv("SEOSCAN_SNAPSHOT_PATH", ".seoscan_cache/snapshots.sqlite")
+SNAPSHOT_MAX_MB = int(os.getenv("SEOSCAN_SNAPSHOT_MAX_MB", "512"))
+
+# Audit history for trend and cross-domain queries (empty path disables it); runs committed per transaction
+HISTORY_PATH = os.getenv("SEOSCAN_HISTORY_PATH", ".seoscan_cache/history.sqlite")
+HISTORY_BATCH_SIZE = int(os.getenv("SEOSCAN_HISTORY_BATCH_SIZE", "500"))
+
+# Where competitor report sections are streamed as they finish: "-" for stdout, a file path, or empty to disable
+# (the interactive CLI streams to stdout when this is empty)
+REPORT_STREAM = os.getenv("SEOSCAN_REPORT_STREAM", "")
+REPORT_WORKERS = int(os.getenv("SEOSCAN_REPORT_WORKERS", "6"))
+
+# LLM clients per role as "backend:model" (backends: openai, ollama, stub); a role left empty uses SEOSCAN_LLM
+LLM_DEFAULT = os.getenv("SEOSCAN_LLM", "openai:gpt-4o-mini")
+LLM_ROLES = {
+    role: os.getenv(f"SEOSCAN_LLM_{role.upper()}") or LLM_DEFAULT
+    for role in ("keyword", "query", "synthesis", "agent")
+}
+LLM_TEMPERATURE = float(os.getenv("SEOSCAN_LLM_TEMPERATURE", "0.3"))
+OLLAMA_URL = os.getenv("SEOSCAN_OLLAMA_URL", "http://localhost:11434")
+# Per-backend request timeout, concurrent requests and tokens per minute (0 = unlimited)
+OPENAI_TIMEOUT = float(os.getenv("SEOSCAN_OPENAI_TIMEOUT", "990"))
+OPENAI_CONCURRENCY = int(os.getenv("SEOSCAN_OPENAI_CONCURRENCY", "8"))
+OPENAI_TPM = float(os.getenv("SEOSCAN_OPENAI_TPM", "200000"))
+OLLAMA_TIMEOUT = float(os.getenv("SEOSCAN_OLLAMA_TIMEOUT", "120"))
+OLLAMA_CONCURRENCY = int(os.getenv("SEOSCAN_OLLAMA_CONCURRENCY", "1"))
+OLLAMA_TPM = float(os.getenv("SEOSCAN_OLLAMA_TPM", "0"))
+# Seconds the offline stub backend sleeps per request
+LLM_STUB_LATENCY = float(os.getenv("SEOSCAN_LLM_STUB_LATENCY", "0"))
+
+# Audit tracing: write a JSON profile per audit to this directory and/or send spans to an
+# OTLP/HTTP collector (e.g. http://localhost:4318); tracing is off when both are empty
+PROFILE_DIR = os.getenv("SEOSCAN_PROFILE_DIR", "")
+OTLP_ENDPOINT = os.getenv("SEOSCAN_OTLP_ENDPOINT", "")
+TRACE_MAX_SPANS = int(os.getenv("SEOSCAN_TRACE_MAX_SPANS", "20000"))
+
+# Audit job service (python -m seoscan_agent.service): listen address, concurrent jobs,
+# jobs allowed to wait in the queue, and where jobs and their results are kept
+SERVICE_HOST = os.getenv("SEOSCAN_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SEOSCAN_SERVICE_PORT", "8765"))
+SERVICE_WORKERS = int(os.getenv("SEOSCAN_SERVICE_WORKERS", "4"))
+SERVICE_MAX_QUEUED = int(os.getenv("SEOSCAN_SERVICE_MAX_QUEUED", "1000"))
+SERVICE_DB_PATH = os.getenv("SEOSCAN_SERVICE_DB_PATH", ".seoscan_cache/jobs.sqlite")
+
+# Recurring audits (python -m seoscan_agent.scheduler): worker threads, seconds a host's
+# audit is reused by other schedules and competitor reports, outgoing requests per minute
+# overall and per host (0 = unlimited), and the backoff after failed audits of a host
+SCHEDULER_WORKERS = int(os.getenv("SEOSCAN_SCHEDULER_WORKERS", "6"))
+SCHEDULER_WINDOW = float(os.getenv("SEOSCAN_SCHEDULER_WINDOW", "86400"))
+SCHEDULER_GLOBAL_RPM = float(os.getenv("SEOSCAN_SCHEDULER_GLOBAL_RPM", "1200"))
+SCHEDULER_HOST_RPM = float(os.getenv("SEOSCAN_SCHEDULER_HOST_RPM", "120"))
+SCHEDULER_BACKOFF_BASE = float(os.getenv("SEOSCAN_SCHEDULER_BACKOFF_BASE", "300"))
+SCHEDULER_BACKOFF_MAX = float(os.getenv("SEOSCAN_SCHEDULER_BACKOFF_MAX", "86400"))
@@ -0,0 +1,349 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from . import tracing
+from .env import FETCH_CACHE_DIR, FETCH_CACHE_MAX_MB, FETCH_CACHE_TTL, HTTP_MAX_CONNECTIONS, HTTP_MAX_PER_HOST
+from .ratelimit import request_delay
+
+
+class TracedSession(requests.Session):
+    """Session that waits on the request budget and records an "http" span per request while an audit is traced."""
+
+    def request(self, method, url, *args, **kwargs):
+        wait = request_delay(url)
+        if wait:
+            time.sleep(wait)
+        if tracing.current() is None:
+            return super().request(method, url, *args, **kwargs)
+        with tracing.span("http", f"{method.upper()} {urlparse(url).netloc}", url=url) as s:
+            resp = super().request(method, url, *args, **kwargs)
+            if s is not None:
+                # elapsed runs from sending the request until the headers are parsed
+                body = resp._content if resp._content_consumed else None
+                s.set(status=resp.status_code, ttfb_ms=round(resp.elapsed.total_seconds() * 1000, 1),
+                      bytes=len(body) if body else int(resp.headers.get("Content-Length") or 0))
+            return resp
+
+
+# One keep-alive session for every sync request instead of a new connection per call
+session = TracedSession()
+session.mount("http://", HTTPAdapter(pool_connections=HTTP_MAX_CONNECTIONS, pool_maxsize=HTTP_MAX_PER_HOST))
+session.mount("https://", HTTPAdapter(pool_connections=HTTP_MAX_CONNECTIONS, pool_maxsize=HTTP_MAX_PER_HOST))
+
+
+def cache_key(url: str, params: dict = None) -> str:
+    """Full request URL (including query params) used as the cache key."""
+    if not params:
+        return url
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+def _build_response(meta: dict, body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = meta["status"]
+    resp.headers = CaseInsensitiveDict(meta["headers"])
+    resp.url = meta["url"]
+    resp.encoding = meta.get("encoding")
+    resp.reason = meta.get("reason")
+    resp._content = body
+    return resp
+
+
+class DiskStore:
+    """
+    On-disk response store. Entries younger than `ttl` are served directly,
+    older ones are revalidated with If-None-Match / If-Modified-Since.
+    Total size is capped at `max_bytes`, least recently used entries go first.
+    """
+
+    def __init__(self, path: str, ttl: int = FETCH_CACHE_TTL, max_bytes: int = FETCH_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._size = sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+
+    def _paths(self, key: str):
+        h = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, h + ".json"), os.path.join(self.path, h + ".body")
+
+    def load(self, key: str):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        os.utime(meta_path, (now, now))
+        return meta, body
+
+    def is_fresh(self, meta: dict) -> bool:
+        return time.time() - meta.get("stored_at", 0) < self.ttl
+
+    def validators(self, meta: dict) -> dict:
+        headers = CaseInsensitiveDict(meta.get("headers", {}))
+        cond = {}
+        if headers.get("ETag"):
+            cond["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            cond["If-Modified-Since"] = headers["Last-Modified"]
+        return cond
+
+    def refresh(self, key: str, meta: dict):
+        meta["stored_at"] = time.time()
+        meta_path, _ = self._paths(key)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def save(self, key: str, resp: requests.Response) -> dict:
+        meta = {
+            "url": resp.url,
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "encoding": resp.encoding,
+            "headers": dict(resp.headers),
+            "stored_at": time.time(),
+        }
+        meta_path, body_path = self._paths(key)
+        with self._lock:
+            self._size -= self._file_size(meta_path) + self._file_size(body_path)
+            with open(body_path, "wb") as f:
+                f.write(resp.content)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            self._size += self._file_size(meta_path) + self._file_size(body_path)
+            if self._size > self.max_bytes:
+                self._evict()
+        return meta
+
+    def _file_size(self, path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _evict(self):
+        entries = sorted(
+            (e for e in os.scandir(self.path) if e.name.endswith(".json")),
+            key=lambda e: e.stat().st_mtime,
+        )
+        target = self.max_bytes * 0.9
+        for e in entries:
+            if self._size <= target:
+                break
+            body_path = e.path[:-len(".json")] + ".body"
+            self._size -= self._file_size(e.path) + self._file_size(body_path)
+            for p in (e.path, body_path):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+
+class PageCache:
+    """
+    Per-audit response cache shared by every tool. Concurrent requests for the
+    same URL, sync (get) or async (aget), wait on a single download instead of
+    each fetching it, and both go through the disk store when there is one.
+    """
+
+    def __init__(self, ttl: int = FETCH_CACHE_TTL, store: DiskStore = None):
+        self.ttl = ttl
+        self.store = store
+        self._entries = {}
+        self._derived = {}
+        self._key_locks = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def remember(self, key: str, resp):
+        self._entries[key] = (time.time(), resp)
+
+    def _claim(self, key: str) -> tuple:
+        """(cached response, None) on a hit; else (None, future) and whether this caller must download."""
+        with self._lock:
+            resp = self.lookup(key)
+            if resp is not None:
+                self.hits += 1
+                return resp, None, False
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.hits += 1
+                return None, fut, False
+            self.misses += 1
+            fut = self._inflight[key] = Future()
+            return None, fut, True
+
+    def _settle(self, key: str, fut: Future, resp=None, error: BaseException = None):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is None:
+                self.remember(key, resp)
+        if error is None:
+            fut.set_result(resp)
+        else:
+            fut.set_exception(error)
+
+    def get(self, url: str, params: dict = None, timeout: float = 10, headers: dict = None) -> requests.Response:
+        key = cache_key(url, params)
+        resp, fut, owner = self._claim(key)
+        if resp is not None:
+            return resp
+        if not owner:
+            return fut.result()
+        try:
+            stored, headers, resp = self._prepare(key, headers or {})
+            if resp is None:
+                resp = self._finish(key, stored, session.get(url, params=params, timeout=timeout, headers=headers))
+        except BaseException as e:
+            self._settle(key, fut, error=e)
+            raise
+        self._settle(key, fut, resp)
+        return resp
+
+    async def aget(self, url: str, download, params: dict = None, headers: dict = None):
+        """
+        get() for coroutines: `await download(url, params, headers)` sends the
+        request (e.g. through the async engine) and returns a requests-style
+        response. Shares downloads and the disk store with sync callers.
+        """
+        key = cache_key(url, params)
+        resp, fut, owner = self._claim(key)
+        if resp is not None:
+            return resp
+        if not owner:
+            return await asyncio.wrap_future(fut)
+        try:
+            stored, headers, resp = self._prepare(key, headers or {})
+            if resp is None:
+                resp = self._finish(key, stored, await download(url, params, headers))
+        except BaseException as e:
+            self._settle(key, fut, error=e)
+            raise
+        self._settle(key, fut, resp)
+        return resp
+
+    def _prepare(self, key: str, headers: dict) -> tuple:
+        """(disk entry, request headers with its validators, response if the disk copy is still fresh)."""
+        if self.store is None:
+            return None, headers, None
+        stored = self.store.load(key)
+        if stored:
+            meta, body = stored
+            if self.store.is_fresh(meta):
+                return stored, headers, _build_response(meta, body)
+            headers = {**self.store.validators(meta), **headers}
+        return stored, headers, None
+
+    def _finish(self, key: str, stored, resp) -> requests.Response:
+        """Serve the disk copy on 304, store new 200 responses."""
+        if self.store is None:
+            return resp
+        if stored and resp.status_code == 304:
+            self.store.refresh(key, stored[0])
+            return _build_response(*stored)
+        if resp.status_code == 200:
+            self.store.save(key, resp)
+        return resp
+
+    def derived(self, key: str, name: str, resp, build):
+        """Memoize `build(resp)` (e.g. a parsed DOM) alongside the cached response."""
+        entry = self._derived.get((key, name))
+        if entry and entry[0] is resp:
+            return entry[1]
+        value = build(resp)
+        self._derived[(key, name)] = (resp, value)
+        return value
+
+    def memo(self, name: str, key: str):
+        """Audit-scoped value stored with set_memo (e.g. a finished crawl)."""
+        entry = self._derived.get((key, name))
+        return entry[1] if entry else None
+
+    def set_memo(self, name: str, key: str, value):
+        self._derived[(key, name)] = (None, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._derived.clear()
+            self._key_locks.clear()
+
+
+_store = DiskStore(FETCH_CACHE_DIR) if FETCH_CACHE_DIR else None
+# Used outside any audit_scope (direct tool calls); dropped whenever it holds SHARED_CACHE_MAX_ENTRIES pages
+_shared = PageCache(store=_store)
+SHARED_CACHE_MAX_ENTRIES = 500
+_scope = ContextVar("seoscan_page_cache", default=None)
+tracing.carry(_scope)
+
+
+def current_cache() -> PageCache:
+    """The page cache of the audit running in this context, or the shared one outside audits."""
+    cache = _scope.get()
+    if cache is not None:
+        return cache
+    if len(_shared._entries) >= SHARED_CACHE_MAX_ENTRIES:
+        _shared.clear()
+    return _shared
+
+
+def in_audit_scope() -> bool:
+    return _scope.get() is not None
+
+
+def fetch(url: str, params: dict = None, timeout: float = 10, headers: dict = None) -> requests.Response:
+    """GET `url` through the current page cache."""
+    return current_cache().get(url, params=params, timeout=timeout, headers=headers)
+
+
+@contextmanager
+def audit_scope():
+    """
+    Give the audit run in this block its own page cache, dropped when the
+    block exits. Tool threads started through tracing.bind() share it; a
+    nested scope reuses the enclosing one, so concurrent audits never keep
+    each other's pages alive.
+    """
+    cache = _scope.get()
+    if cache is not None:
+        yield cache
+        return
+    cache = PageCache(store=_store)
+    token = _scope.set(cache)
+    try:
+        yield cache
+    finally:
+        _scope.reset(token)
+        cache.clear()
@@ -0,0 +1,507 @@
+"""
+Audit history: every audit, agent answer and competitor report, kept in one
+indexed SQLite file for time-range and cross-domain queries.
+
+    python -m seoscan_agent.history series
+    python -m seoscan_agent.history trend lighthouse_tool perf_mobile --since 180d --bucket 7d --domains domains.txt
+    python -m seoscan_agent.history runs example.com --since 30d
+    python -m seoscan_agent.history broken example.com
+    python -m seoscan_agent.history keywords --domain example.com
+    python -m seoscan_agent.history competitors example.com
+
+Numbers and flags of each tool's compact record (see results.py) become
+points of a (tool, metric) series, keyed by series, domain and time so a
+trend over hundreds of domains is one index range scan. Keywords, broken
+links and discovered competitors get their own tables; reports and agent
+prose are stored on the run. Writes are queued and committed by one
+background thread in batches, so audits never wait on the disk.
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from urllib.parse import urlparse
+
+from .env import HISTORY_BATCH_SIZE, HISTORY_PATH
+from .results import DomainAudit
+from .utils import normalize_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, domain_id INTEGER NOT NULL, kind TEXT NOT NULL, started REAL NOT NULL,
+    duration REAL, error TEXT, report TEXT, notes TEXT);
+CREATE INDEX IF NOT EXISTS runs_domain ON runs(domain_id, started);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started);
+CREATE TABLE IF NOT EXISTS series (id INTEGER PRIMARY KEY, tool TEXT NOT NULL, metric TEXT NOT NULL, UNIQUE(tool, metric));
+CREATE TABLE IF NOT EXISTS points (
+    series_id INTEGER NOT NULL, domain_id INTEGER NOT NULL, ts REAL NOT NULL, run_id INTEGER NOT NULL, value REAL,
+    PRIMARY KEY (series_id, domain_id, ts, run_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS points_run ON points(run_id);
+CREATE TABLE IF NOT EXISTS keywords (
+    run_id INTEGER NOT NULL, domain_id INTEGER NOT NULL, ts REAL NOT NULL, keyword TEXT NOT NULL,
+    source TEXT NOT NULL, rank INTEGER);
+CREATE INDEX IF NOT EXISTS keywords_domain ON keywords(domain_id, ts);
+CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords(keyword, ts);
+CREATE TABLE IF NOT EXISTS broken_links (
+    run_id INTEGER NOT NULL, domain_id INTEGER NOT NULL, ts REAL NOT NULL, url TEXT NOT NULL, status TEXT,
+    found_on TEXT, external INTEGER);
+CREATE INDEX IF NOT EXISTS broken_links_domain ON broken_links(domain_id, ts);
+CREATE INDEX IF NOT EXISTS broken_links_url ON broken_links(url);
+CREATE TABLE IF NOT EXISTS competitors (
+    run_id INTEGER NOT NULL, domain_id INTEGER NOT NULL, competitor_id INTEGER NOT NULL, ts REAL NOT NULL, rank INTEGER);
+CREATE INDEX IF NOT EXISTS competitors_domain ON competitors(domain_id, ts);
+CREATE INDEX IF NOT EXISTS competitors_competitor ON competitors(competitor_id, ts);
+"""
+
+# Keyword lists of the compact records and the source they are stored under
+KEYWORD_FIELDS = {
+    ("keyword_extraction_tool", "keywords"): "top",
+    ("keyword_extraction_tool", "phrases"): "phrase",
+    ("gather_competitor_keywords_tool", "keywords"): "competitor",
+    ("llm_keywords_from_content_tool", "keywords"): "llm",
+}
+_STOP = object()
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)([smhdw])")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def domain_name(domain: str) -> str:
+    """"https://www.Example.com/path" -> "example.com" (ports are kept)."""
+    host = urlparse(normalize_url(domain.strip())).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_since(value) -> float:
+    """Unix time from a number, an ISO date, or an age like "90d", "12h", "30m"."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    m = _DURATION.fullmatch(value.strip())
+    if m:
+        return time.time() - float(m.group(1)) * _UNITS[m.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        return time.mktime(time.strptime(value[:10], "%Y-%m-%d"))
+
+
+def parse_seconds(value) -> float:
+    """Seconds from a number or a duration like "1d", "6h"."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    m = _DURATION.fullmatch(value.strip())
+    if m:
+        return float(m.group(1)) * _UNITS[m.group(2)]
+    return float(value)
+
+
+class HistoryStore:
+    """
+    Writes go through `record()` onto a bounded queue; one writer thread turns
+    up to `batch_size` queued runs into a single transaction. Reads use their
+    own connection and see everything committed (flush() first to include
+    queued writes).
+    """
+
+    def __init__(self, path: str = HISTORY_PATH, batch_size: int = HISTORY_BATCH_SIZE, max_queued: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # ":memory:" databases are per connection, so in that case reads share the writer's
+        self._write_db = self._connect()
+        self._write_db.executescript(SCHEMA)
+        self._read_db = self._write_db if path == ":memory:" else self._connect()
+        self._read_lock = threading.Lock()
+        self._db_lock = threading.Lock() if path == ":memory:" else None
+        self._domain_ids = {}
+        self._series_ids = {}
+        self._queue = queue.Queue(maxsize=max_queued)
+        self.written = 0
+        self.batches = 0
+        self._writer = threading.Thread(target=self._write_loop, name="seoscan-history", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # --- writes ---------------------------------------------------------
+
+    def record(self, domain: str, results: dict = None, kind: str = "audit", started_at: float = None,
+               duration_s: float = None, report: str = None, error: str = None, competitors=None):
+        """
+        Queue one run. `results` is {aspect: {tool_name: raw result}} (run_plan
+        shape) or {aspect: agent text}; `competitors` lists the domains a
+        competitor report compared against.
+        """
+        if not self._writer.is_alive():
+            raise RuntimeError("history store is closed")
+        ts = started_at or time.time()
+        audit = DomainAudit.from_aspects(domain, results or {})
+        broken = []
+        for tools in (results or {}).values():
+            raw = tools.get("broken_links_tool") if isinstance(tools, dict) else None
+            if isinstance(raw, dict):
+                broken.extend(raw.get("broken_links") or [])
+        self._queue.put({
+            "run_id": int.from_bytes(os.urandom(7), "big"), "domain": domain_name(domain), "kind": kind, "ts": ts,
+            "duration": duration_s, "error": error, "report": report,
+            "notes": json.dumps(audit.notes) if audit.notes else None,
+            "tools": audit.tools, "broken": broken,
+            "competitors": [domain_name(c) for c in competitors or ()],
+        })
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            batch, stop, flushes = [], False, []
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    flushes.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    print(f"[WARN] Could not write {len(batch)} audit(s) to history: {e}", file=sys.stderr)
+            for event in flushes:
+                event.set()
+            if stop:
+                return
+
+    def _ids(self, cache: dict, table: str, keys: set, columns: tuple) -> None:
+        missing = [k for k in keys if k not in cache]
+        if not missing:
+            return
+        rows = [k if isinstance(k, tuple) else (k,) for k in missing]
+        cols = ", ".join(columns)
+        marks = ", ".join("?" * len(columns))
+        db = self._write_db
+        db.executemany(f"INSERT OR IGNORE INTO {table} ({cols}) VALUES ({marks})", rows)
+        where = " AND ".join(f"{c} = ?" for c in columns)
+        for key, row in zip(missing, rows):
+            cache[key] = db.execute(f"SELECT id FROM {table} WHERE {where}", row).fetchone()[0]
+
+    def _write(self, batch: list):
+        with self._db_lock or nullcontext():
+            db = self._write_db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                names = {b["domain"] for b in batch} | {c for b in batch for c in b["competitors"]}
+                self._ids(self._domain_ids, "domains", names, ("name",))
+                series = {(name, field) for b in batch for name, r in b["tools"].items() for field in r.fields()}
+                self._ids(self._series_ids, "series", series, ("tool", "metric"))
+                runs, points, keywords, links, competitors = [], [], [], [], []
+                for b in batch:
+                    run_id, domain_id, ts = b["run_id"], self._domain_ids[b["domain"]], b["ts"]
+                    runs.append((run_id, domain_id, b["kind"], ts, b["duration"], b["error"], b["report"], b["notes"]))
+                    for name, record in b["tools"].items():
+                        for field in record.fields():
+                            value = getattr(record, field)
+                            if isinstance(value, (bool, int, float)):
+                                points.append((self._series_ids[(name, field)], domain_id, ts, run_id, float(value)))
+                            elif isinstance(value, list) and (name, field) in KEYWORD_FIELDS:
+                                source = KEYWORD_FIELDS[(name, field)]
+                                keywords.extend((run_id, domain_id, ts, str(k).lower(), source, i)
+                                                for i, k in enumerate(value, 1))
+                    links.extend(
+                        (run_id, domain_id, ts, link.get("url"), str(link.get("status")), link.get("found_on"),
+                         int(bool(link.get("external"))))
+                        for link in b["broken"] if isinstance(link, dict) and link.get("url")
+                    )
+                    competitors.extend((run_id, domain_id, self._domain_ids[c], ts, i)
+                                       for i, c in enumerate(b["competitors"], 1))
+                db.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", runs)
+                db.executemany("INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?)", points)
+                db.executemany("INSERT INTO keywords VALUES (?, ?, ?, ?, ?, ?)", keywords)
+                db.executemany("INSERT INTO broken_links VALUES (?, ?, ?, ?, ?, ?, ?)", links)
+                db.executemany("INSERT INTO competitors VALUES (?, ?, ?, ?, ?)", competitors)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                # ids handed out inside the rolled-back transaction are gone
+                self._domain_ids.clear()
+                self._series_ids.clear()
+                raise
+        self.written += len(batch)
+        self.batches += 1
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything queued so far is committed."""
+        if not self._writer.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 30):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+
+    # --- reads ----------------------------------------------------------
+
+    def _query(self, sql: str, args=()) -> list:
+        with self._read_lock, self._db_lock or nullcontext():
+            return self._read_db.execute(sql, args).fetchall()
+
+    def _domain_filter(self, domains, column: str = "domain_id"):
+        if domains is None:
+            return "", []
+        names = [domain_name(d) for d in domains]
+        ids = []
+        for i in range(0, len(names), 900):
+            chunk = names[i:i + 900]
+            ids += [r[0] for r in self._query(
+                f"SELECT id FROM domains WHERE name IN ({', '.join('?' * len(chunk))})", chunk)]
+        return f" AND {column} IN ({', '.join(map(str, ids)) or 'NULL'})", []
+
+    @staticmethod
+    def _range(column: str, since, until) -> tuple:
+        sql, args = "", []
+        if since is not None:
+            sql += f" AND {column} >= ?"
+            args.append(parse_since(since))
+        if until is not None:
+            sql += f" AND {column} < ?"
+            args.append(parse_since(until))
+        return sql, args
+
+    def series(self) -> list:
+        """(tool, metric) pairs with at least one stored point."""
+        return [tuple(r) for r in self._query(
+            "SELECT tool, metric FROM series s WHERE EXISTS (SELECT 1 FROM points p WHERE p.series_id = s.id)"
+            " ORDER BY tool, metric")]
+
+    def trend(self, tool: str, metric: str, domains=None, since=None, until=None, bucket=None) -> dict:
+        """
+        {domain: [(time, value), ...]} in time order. With `bucket` (seconds or
+        e.g. "7d") values are averaged per bucket, keyed by the bucket start.
+        """
+        row = self._query("SELECT id FROM series WHERE tool = ? AND metric = ?", (tool, metric))
+        if not row:
+            return {}
+        where, args = self._domain_filter(domains, "p.domain_id")
+        span, span_args = self._range("p.ts", since, until)
+        if bucket:
+            size = parse_seconds(bucket)
+            sql = (f"SELECT d.name, CAST(p.ts / {size:f} AS INTEGER) * {size:f} AS t, AVG(p.value)"
+                   f" FROM points p JOIN domains d ON d.id = p.domain_id"
+                   f" WHERE p.series_id = ?{where}{span} GROUP BY p.domain_id, t ORDER BY d.name, t")
+        else:
+            sql = (f"SELECT d.name, p.ts, p.value FROM points p JOIN domains d ON d.id = p.domain_id"
+                   f" WHERE p.series_id = ?{where}{span} ORDER BY d.name, p.ts")
+        out = {}
+        for name, ts, value in self._query(sql, (row[0][0], *args, *span_args)):
+            out.setdefault(name, []).append((ts, value))
+        return out
+
+    def latest(self, tool: str, metric: str, domains=None) -> dict:
+        """{domain: (time, value)} of the newest point per domain."""
+        row = self._query("SELECT id FROM series WHERE tool = ? AND metric = ?", (tool, metric))
+        if not row:
+            return {}
+        where, _ = self._domain_filter(domains, "p.domain_id")
+        rows = self._query(
+            f"SELECT d.name, MAX(p.ts), p.value FROM points p JOIN domains d ON d.id = p.domain_id"
+            f" WHERE p.series_id = ?{where} GROUP BY p.domain_id", (row[0][0],))
+        return {name: (ts, value) for name, ts, value in rows}
+
+    def runs(self, domain: str = None, since=None, until=None, kind: str = None, limit: int = 100,
+             reports: bool = False) -> list:
+        where, _ = self._domain_filter([domain] if domain else None, "r.domain_id")
+        span, args = self._range("r.started", since, until)
+        if kind:
+            span += " AND r.kind = ?"
+            args.append(kind)
+        text = "r.report, r.notes" if reports else "NULL, NULL"
+        rows = self._query(
+            f"SELECT r.id, d.name, r.kind, r.started, r.duration, r.error, {text} FROM runs r"
+            f" JOIN domains d ON d.id = r.domain_id WHERE 1 = 1{where}{span} ORDER BY r.started DESC LIMIT ?",
+            (*args, limit))
+        out = []
+        for run_id, name, kind, started, duration, error, report, notes in rows:
+            run = {"id": run_id, "domain": name, "kind": kind, "started": started, "duration_s": duration}
+            if error:
+                run["error"] = error
+            if report:
+                run["report"] = report
+            if notes:
+                run["notes"] = json.loads(notes)
+            out.append(run)
+        return out
+
+    def run_metrics(self, run_id: int) -> dict:
+        """{tool: {metric: value}} stored for one run."""
+        out = {}
+        for tool, metric, value in self._query(
+                "SELECT s.tool, s.metric, p.value FROM points p JOIN series s ON s.id = p.series_id"
+                " WHERE p.run_id = ?", (run_id,)):
+            out.setdefault(tool, {})[metric] = value
+        return out
+
+    def broken_links(self, domain: str, since=None, until=None, limit: int = 500) -> list:
+        where, _ = self._domain_filter([domain], "b.domain_id")
+        span, args = self._range("b.ts", since, until)
+        rows = self._query(
+            f"SELECT b.url, b.status, b.found_on, b.external, COUNT(*), MIN(b.ts), MAX(b.ts) FROM broken_links b"
+            f" WHERE 1 = 1{where}{span} GROUP BY b.url ORDER BY MAX(b.ts) DESC LIMIT ?", (*args, limit))
+        return [{"url": u, "status": s, "found_on": f, "external": bool(e), "times_seen": n,
+                 "first_seen": first, "last_seen": last} for u, s, f, e, n, first, last in rows]
+
+    def keywords(self, domain: str = None, keyword: str = None, since=None, until=None, limit: int = 200) -> list:
+        """Keyword counts for a domain, or the domains using a keyword."""
+        where, _ = self._domain_filter([domain] if domain else None, "k.domain_id")
+        span, args = self._range("k.ts", since, until)
+        if keyword:
+            span += " AND k.keyword = ?"
+            args.append(keyword.lower())
+        rows = self._query(
+            f"SELECT d.name, k.keyword, k.source, COUNT(*), MIN(k.rank), MAX(k.ts) FROM keywords k"
+            f" JOIN domains d ON d.id = k.domain_id WHERE 1 = 1{where}{span}"
+            f" GROUP BY k.domain_id, k.keyword, k.source ORDER BY COUNT(*) DESC, MIN(k.rank) LIMIT ?",
+            (*args, limit))
+        return [{"domain": d, "keyword": k, "source": s, "times_seen": n, "best_rank": r, "last_seen": t}
+                for d, k, s, n, r, t in rows]
+
+    def competitors(self, domain: str, since=None, until=None) -> list:
+        """Competitors found for `domain`, most often found first."""
+        where, _ = self._domain_filter([domain], "c.domain_id")
+        span, args = self._range("c.ts", since, until)
+        rows = self._query(
+            f"SELECT d.name, COUNT(*), MAX(c.ts) FROM competitors c JOIN domains d ON d.id = c.competitor_id"
+            f" WHERE 1 = 1{where}{span} GROUP BY c.competitor_id ORDER BY COUNT(*) DESC, MAX(c.ts) DESC", args)
+        return [{"domain": d, "times_seen": n, "last_seen": t} for d, n, t in rows]
+
+    def shared_competitors(self, min_domains: int = 2, since=None, limit: int = 100) -> list:
+        """Sites that show up as a competitor of at least `min_domains` different domains."""
+        span, args = self._range("c.ts", since, None)
+        rows = self._query(
+            f"SELECT d.name, COUNT(DISTINCT c.domain_id) AS n FROM competitors c JOIN domains d ON d.id = c.competitor_id"
+            f" WHERE 1 = 1{span} GROUP BY c.competitor_id HAVING n >= ? ORDER BY n DESC LIMIT ?",
+            (*args, min_domains, limit))
+        return [{"domain": d, "competitor_of": n} for d, n in rows]
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    """Shared store at SEOSCAN_HISTORY_PATH, or None when history is disabled."""
+    global _history
+    if _history is None and HISTORY_PATH:
+        with _history_lock:
+            if _history is None:
+                from multiprocessing import util as mp_util
+
+                _history = HistoryStore(HISTORY_PATH)
+                atexit.register(_history.close)
+                # pool worker processes exit without running atexit handlers
+                mp_util.Finalize(_history, _history.close, exitpriority=10)
+    return _history
+
+
+def record_run(domain: str, results: dict = None, **kwargs):
+    """Queue a run in the shared history store; a no-op when disabled, never raises."""
+    try:
+        history = get_history()
+        if history is not None:
+            history.record(domain, results, **kwargs)
+    except Exception as e:
+        print(f"[WARN] Could not record {domain} in history: {e}", file=sys.stderr)
+
+
+def _read_domains(value):
+    if not value:
+        return None
+    if os.path.exists(value) or value == "-":
+        from .batch import read_domains
+
+        return read_domains(value)
+    return [d.strip() for d in value.split(",") if d.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m seoscan_agent.history", description="Query stored audits.")
+    parser.add_argument("--db", default=HISTORY_PATH, help="history SQLite file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("series", help="stored (tool, metric) series")
+    p = sub.add_parser("trend", help="one metric over time for many domains")
+    p.add_argument("tool")
+    p.add_argument("metric")
+    p.add_argument("--domains", help="comma-separated domains or a file of domains (default: all)")
+    p.add_argument("--since", help='start: unix time, YYYY-MM-DD or an age like "180d"')
+    p.add_argument("--until")
+    p.add_argument("--bucket", help='average per bucket, e.g. "1d" or "7d"')
+    p = sub.add_parser("latest", help="newest value of a metric per domain")
+    p.add_argument("tool")
+    p.add_argument("metric")
+    p.add_argument("--domains")
+    p = sub.add_parser("runs", help="audits, agent answers and reports")
+    p.add_argument("domain", nargs="?")
+    p.add_argument("--since")
+    p.add_argument("--until")
+    p.add_argument("--kind", choices=("audit", "agent", "report"))
+    p.add_argument("--limit", type=int, default=100)
+    p.add_argument("--reports", action="store_true", help="include report and agent text")
+    p = sub.add_parser("broken", help="broken links found on a domain")
+    p.add_argument("domain")
+    p.add_argument("--since")
+    p = sub.add_parser("keywords", help="keywords of a domain, or domains using a keyword")
+    p.add_argument("--domain")
+    p.add_argument("--keyword")
+    p.add_argument("--since")
+    p = sub.add_parser("competitors", help="competitors found for a domain (or shared ones, without a domain)")
+    p.add_argument("domain", nargs="?")
+    p.add_argument("--since")
+    p.add_argument("--min-domains", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.db != ":memory:" and not os.path.exists(args.db):
+        parser.error(f"no history at {args.db}")
+    store = HistoryStore(args.db)
+    started = time.perf_counter()
+    if args.command == "series":
+        result = store.series()
+    elif args.command == "trend":
+        result = store.trend(args.tool, args.metric, _read_domains(args.domains), args.since, args.until, args.bucket)
+    elif args.command == "latest":
+        result = store.latest(args.tool, args.metric, _read_domains(args.domains))
+    elif args.command == "runs":
+        result = store.runs(args.domain, args.since, args.until, args.kind, args.limit, args.reports)
+    elif args.command == "broken":
+        result = store.broken_links(args.domain, args.since)
+    elif args.command == "keywords":
+        result = store.keywords(args.domain, args.keyword, args.since)
+    elif args.domain:
+        result = store.competitors(args.domain, args.since)
+    else:
+        result = store.shared_competitors(args.min_domains, args.since)
+    elapsed = time.perf_counter() - started
+    json.dump(result, sys.stdout, indent=1, default=str)
+    print(f"\n{elapsed * 1000:.1f} ms", file=sys.stderr)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import asyncio
+import importlib.util
+import threading
+import time
+from urllib.parse import urlparse
+
+from . import tracing
+from .env import HTTP_MAX_CONNECTIONS, HTTP_MAX_PER_HOST
+from .fetch import _build_response, current_cache
+from .ratelimit import request_delay
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _phase_timings(marks: dict, start: float) -> dict:
+    """connect (DNS + TCP), TLS and time-to-first-byte in ms from httpcore trace events."""
+    def at(suffix):
+        return next((t for name, t in marks.items() if name.endswith(suffix)), None)
+
+    out = {}
+    tcp, tcp_done = at("connect_tcp.started"), at("connect_tcp.complete")
+    tls, tls_done = at("start_tls.started"), at("start_tls.complete")
+    headers = at("receive_response_headers.complete")
+    if tcp is not None and tcp_done is not None:
+        out["connect_ms"] = round((tcp_done - tcp) * 1000, 1)
+    if tls is not None and tls_done is not None:
+        out["tls_ms"] = round((tls_done - tls) * 1000, 1)
+    if headers is not None:
+        out["ttfb_ms"] = round((headers - start) * 1000, 1)
+    out["reused_connection"] = tcp is None
+    return out
+
+
+class AsyncFetcher:
+    """
+    Shared asyncio HTTP client. Connections are kept alive in one pool (HTTP/2
+    when the `h2` package is installed) and each host gets its own concurrency
+    limit so fan-out never hammers a single site.
+    """
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS, per_host: int = HTTP_MAX_PER_HOST,
+                 timeout: float = 30, http2: bool = HTTP2_AVAILABLE):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.http2 = http2
+        self._client = None
+        self._host_limits = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=30,
+                ),
+            )
+        return self._client
+
+    def host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        sem = self._host_limits.get(host)
+        if sem is None:
+            sem = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def request(self, method: str, url: str, follow_redirects: bool = True, read_body: bool = True,
+                      timeout: float = None, headers: dict = None, params: dict = None):
+        """
+        Send one request under the host's concurrency limit and the request
+        budget, if one is installed. With read_body=False only the status line
+        and headers are received; it may also be a predicate on the response
+        (e.g. only read HTML bodies).
+        """
+        async with self.host_limit(url):
+            wait = request_delay(url)
+            if wait:
+                await asyncio.sleep(wait)
+            req = self.client.build_request(
+                method, url, headers=headers, params=params,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+            if tracing.current() is None:
+                return await self._send(req, follow_redirects, read_body)
+            with tracing.span("http", f"{method} {urlparse(url).netloc}", url=url) as span:
+                if span is None:
+                    return await self._send(req, follow_redirects, read_body)
+                marks = {}
+
+                async def trace(event: str, info: dict):
+                    marks.setdefault(event, time.perf_counter())
+
+                req.extensions["trace"] = trace
+                start = time.perf_counter()
+                resp = await self._send(req, follow_redirects, read_body)
+                span.set(status=resp.status_code, bytes=len(resp.content) if resp.is_stream_consumed else 0,
+                         **_phase_timings(marks, start))
+                if resp.history:
+                    span.set(redirects=len(resp.history))
+                return resp
+
+    async def _send(self, req, follow_redirects, read_body):
+        resp = await self.client.send(req, stream=True, follow_redirects=follow_redirects)
+        try:
+            if read_body(resp) if callable(read_body) else read_body:
+                await resp.aread()
+        finally:
+            await resp.aclose()
+        return resp
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def head(self, url: str, **kwargs):
+        return await self.request("HEAD", url, **kwargs)
+
+    async def fetch(self, url: str, timeout: float = None, params: dict = None):
+        """
+        GET through the current page cache (PageCache.aget), coalesced with
+        sync fetches of the same URL and revalidated against the disk store.
+        Returns a requests-compatible response so sync and async tools see
+        the same objects.
+        """
+        async def download(url, params, headers):
+            r = await self.get(url, timeout=timeout, params=params, headers=headers)
+            return _build_response({
+                "url": str(r.url),
+                "status": r.status_code,
+                "reason": r.reason_phrase,
+                "encoding": r.encoding,
+                "headers": dict(r.headers),
+            }, r.content)
+
+        return await current_cache().aget(url, download, params=params)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+engine = AsyncFetcher()
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="seoscan-http", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def run(coro, timeout: float = None):
+    """
+    Run `coro` on the engine's background event loop and wait for the result.
+    This is the sync entry point used by the FunctionTool wrappers; the loop
+    lives for the whole process so pooled connections survive between calls.
+    """
+    loop = _get_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run() called from the engine loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(tracing.bind_coro(coro), loop).result(timeout)
@@ -0,0 +1,241 @@
+"""
+Incremental re-audits.
+
+Each audit of a domain leaves a snapshot: validators and hashes of the
+homepage, robots.txt, root sitemap files and every crawled page, plus each
+tool's structured output. Sitemap indexes are always rescanned, since their
+child files are not tracked. The next audit revalidates those resources with
+conditional requests, reuses tool results whose inputs did not change, crawls
+with If-None-Match/If-Modified-Since, and reports what changed in between.
+"""
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+from . import tracing
+from .crawler import canonicalize
+from .env import SNAPSHOT_MAX_MB, SNAPSHOT_PATH, USER_AGENT
+from .fetch import audit_scope, cache_key, current_cache, session
+from .pipeline import AUDIT_PLAN, _stable, run_plan
+from .store import SqliteCache
+from .utils import normalize_url
+
+# Tool -> resources its output depends on. A tool is reused when none of them
+# changed; tools not listed (live headers, redirects, PSI, SERP) always run.
+# broken_links_tool always runs, but its crawl only re-downloads changed pages.
+TOOL_INPUTS = {
+    "robots_txt_tool": ("robots",),
+    "sitemap_tool": ("robots", "sitemaps"),
+    "crawlability_tool": ("robots", "home"),
+    "schema_validation_tool": ("home",),
+    "accessibility_tool": ("home",),
+    "mobile_friendly_tool": ("home",),
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SqliteCache:
+    """Process-wide snapshot store (snapshots never expire; the oldest are evicted past the size cap)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SqliteCache(SNAPSHOT_PATH, ttl=None, max_bytes=SNAPSHOT_MAX_MB * 1024 * 1024)
+    return _store
+
+
+def snapshot_key(domain: str) -> str:
+    """Host (and non-default port) without a leading www., so http/https/www variants share a snapshot."""
+    netloc = urlparse(canonicalize(normalize_url(domain))).netloc
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def probe(url: str, previous: dict = None, seed: bool = False, timeout: float = 30) -> dict:
+    """
+    Conditional GET of `url` against a previous state. Returns the new state
+    (status, etag, last_modified, hash) with "changed" set. With `seed` the
+    downloaded response is put in the page cache so tools don't fetch it again.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if previous:
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+    try:
+        resp = session.get(url, headers=headers, timeout=timeout, stream=not seed)
+    except Exception as e:
+        return {"status": None, "error": str(e), "changed": previous is None or previous.get("status") is not None}
+    try:
+        if previous and resp.status_code == 304:
+            return {**previous, "changed": False}
+        digest = hashlib.blake2b(digest_size=16)
+        if seed:
+            digest.update(resp.content)
+            current_cache().remember(cache_key(url), resp)
+        else:
+            for chunk in resp.iter_content(64 * 1024):
+                digest.update(chunk)
+        state = {
+            "status": resp.status_code,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "hash": digest.hexdigest(),
+        }
+    finally:
+        resp.close()
+    state["changed"] = (
+        previous is None or previous.get("hash") != state["hash"] or previous.get("status") != state["status"]
+    )
+    return state
+
+
+def _resource_urls(domain: str, previous_results: dict) -> dict:
+    home = normalize_url(domain)
+    sitemaps = previous_results.get("technical", {}).get("sitemap_tool", {}).get("sitemaps") or []
+    return {"home": [home], "robots": [urljoin(home, "/robots.txt")], "sitemaps": sitemaps}
+
+
+def _sitemap_index(previous_results: dict) -> bool:
+    """True when the last sitemap_tool run followed a sitemap index (its child files are not revalidated)."""
+    return bool(previous_results.get("technical", {}).get("sitemap_tool", {}).get("index_files"))
+
+
+def _reuse(tool, value):
+    def reused(domain):
+        return value
+    reused.__name__ = tool.__name__
+    return reused
+
+
+def _flatten(value, prefix: str = "", out: dict = None) -> dict:
+    out = {} if out is None else out
+    if isinstance(value, dict) and value:
+        for k, v in value.items():
+            _flatten(v, f"{prefix}.{k}" if prefix else str(k), out)
+    else:
+        out[prefix] = value
+    return out
+
+
+def _page_changed(old: dict, new: dict) -> bool:
+    if old.get("status") != new.get("status"):
+        return True
+    if old.get("hash") and new.get("hash"):
+        return old["hash"] != new["hash"]
+    return (old.get("etag"), old.get("last_modified")) != (new.get("etag"), new.get("last_modified"))
+
+
+def diff_snapshots(old: dict, new: dict, limit: int = 25) -> dict:
+    """What changed between two snapshots of a domain: resources, pages and tool outputs."""
+    if not old:
+        return {"first_audit": True}
+    old_pages, new_pages = old.get("pages") or {}, new.get("pages") or {}
+    added = [u for u in new_pages if u not in old_pages]
+    removed = [u for u in old_pages if u not in new_pages]
+    changed = [u for u in new_pages if u in old_pages and _page_changed(old_pages[u], new_pages[u])]
+    status_changes = [
+        {"url": u, "before": old_pages[u].get("status"), "after": new_pages[u].get("status")}
+        for u in changed if old_pages[u].get("status") != new_pages[u].get("status")
+    ]
+    results = {}
+    for aspect, tools in new.get("results", {}).items():
+        for name, result in tools.items():
+            before = old.get("results", {}).get(aspect, {}).get(name)
+            if before is None:
+                continue
+            a, b = _flatten(_stable(before, name, validators=True)), _flatten(_stable(result, name, validators=True))
+            fields = {
+                path: {"before": a.get(path), "after": b.get(path)}
+                for path in list(dict.fromkeys([*a, *b])) if a.get(path) != b.get(path)
+            }
+            if fields:
+                results[name] = dict(list(fields.items())[:limit])
+    return {
+        "since": old.get("taken_at"),
+        "resources_changed": [
+            name for name, states in new.get("resources", {}).items()
+            if any(s.get("changed") for s in states.values())
+        ],
+        "pages": {
+            "added": len(added), "removed": len(removed), "changed": len(changed),
+            "unchanged": len(new_pages) - len(added) - len(changed),
+            "added_urls": added[:limit], "removed_urls": removed[:limit], "changed_urls": changed[:limit],
+            "status_changes": status_changes[:limit],
+        },
+        "results": results,
+    }
+
+
+def reaudit(domain: str, aspects=None, plan: dict = None, store: SqliteCache = None, full: bool = False,
+            on_tool=None) -> dict:
+    """
+    Audit `domain` against its last snapshot and save a new one. Returns the
+    tool results (same shape as run_plan), the tools that were reused, and a
+    diff against the previous audit. `full=True` ignores the old snapshot;
+    `on_tool` is passed to run_plan.
+    """
+    store = store if store is not None else get_store()
+    key = snapshot_key(domain)
+    previous = store.get(key)
+    baseline = None if full else previous
+    plan = plan or AUDIT_PLAN
+    aspects = list(aspects or plan)
+    previous_results = (baseline or {}).get("results", {})
+    previous_resources = (baseline or {}).get("resources", {})
+
+    with audit_scope():
+        urls = _resource_urls(domain, previous_results)
+        jobs = [(name, u) for name, group in urls.items() for u in group]
+        with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+            states = list(pool.map(
+                tracing.bind(
+                    lambda job: probe(job[1], previous_resources.get(job[0], {}).get(job[1]), seed=job[0] != "sitemaps")
+                ),
+                jobs,
+            ))
+        resources = {name: {} for name in urls}
+        for (name, u), state in zip(jobs, states):
+            resources[name][u] = state
+        # unknown sitemap files (first audit, or none found last time) count as changed
+        changed = {name for name, group in resources.items() if not group or any(s["changed"] for s in group.values())}
+        if _sitemap_index(previous_results):
+            # only the roots are probed, so a change in one of an index's child files would go unnoticed
+            changed.add("sitemaps")
+
+        reused = []
+        selected = {}
+        for aspect in aspects:
+            selected[aspect] = []
+            for tool in plan[aspect]:
+                inputs = TOOL_INPUTS.get(tool.__name__)
+                prior = previous_results.get(aspect, {}).get(tool.__name__)
+                if inputs and prior is not None and "error" not in prior and not changed.intersection(inputs):
+                    selected[aspect].append(_reuse(tool, prior))
+                    reused.append(tool.__name__)
+                else:
+                    selected[aspect].append(tool)
+
+        crawl_key = canonicalize(normalize_url(domain))
+        current_cache().set_memo("crawl_known", crawl_key, (baseline or {}).get("pages") or {})
+        results = run_plan(domain, aspects, plan=selected, on_tool=on_tool)
+        crawl = current_cache().memo("crawl", crawl_key)
+        pages = crawl[2].states if crawl and crawl[2].states is not None else (previous or {}).get("pages", {})
+
+    current = json.loads(json.dumps({k: v for k, v in results.items() if not k.startswith("_")}, default=str))
+    snapshot = {
+        "domain": domain,
+        "taken_at": time.time(),
+        "resources": resources,
+        "pages": pages,
+        # aspects not audited this time keep their last known results
+        "results": {**(previous or {}).get("results", {}), **current},
+    }
+    diff = diff_snapshots(baseline, {**snapshot, "results": current})
+    store.set(key, snapshot)
+    return {"domain": domain, "previous_at": (baseline or {}).get("taken_at"), "results": results,
+            "reused": reused, "diff": diff}
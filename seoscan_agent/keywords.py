@@ -0,0 +1,170 @@
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+STOPWORDS = {
+    "en": frozenset("""
+        a about above after again against all also am an and any are aren't as at be because been before being
+        below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down
+        during each even ever every few for from further get gets got had hadn't has hasn't have haven't having
+        he he'd he'll he's her here here's hers herself him himself his how how's however i i'd i'll i'm i've if
+        in into is isn't it it's its itself just let's like made make many may me might more most much must
+        mustn't my myself need new no nor not now of off often on once one only or other ought our ours
+        ourselves out over own per same shan't she she'd she'll she's should shouldn't since so some still such
+        than that that's the their theirs them themselves then there there's these they they'd they'll they're
+        they've this those though through to too under until up upon us use used using very via was wasn't we
+        we'd we'll we're we've well were weren't what what's when when's where where's whether which while who
+        who's whom why why's will with within without won't would wouldn't yet you you'd you'll you're you've
+        your yours yourself yourselves
+    """.split()),
+    "es": frozenset("""
+        a al algo algunas algunos ante antes como con contra cual cuando de del desde donde durante e el ella
+        ellas ellos en entre era es esa esas ese eso esos esta estas este esto estos fue fueron ha hay la las le
+        les lo los más me mi mis mucho muy nada ni no nos nosotros o os otra otras otro otros para pero poco por
+        porque que quien se sea ser si sin sobre son su sus también te tiene tu tus un una uno unos y ya yo
+    """.split()),
+    "fr": frozenset("""
+        a au aux avec ce ces cette comme dans de des du elle elles en est et eux il ils je la le les leur leurs
+        lui ma mais me même mes moi mon ne nos notre nous on ou par pas plus pour qu que qui sa se ses son sont
+        sur ta te tes toi ton tous tout tu un une vos votre vous y à où été être
+    """.split()),
+    "de": frozenset("""
+        aber alle als also am an auch auf aus bei bin bis bist da damit dann das dass dein deine dem den der des
+        dich die dir doch du durch ein eine einem einen einer eines er es euch euer für hat hatte ich ihr im in
+        ist ja jede jeder kann kein keine mich mit muss nach nicht noch nur ob oder ohne sein sich sie sind so
+        über um und uns unser von vor war was weil wenn wer wie wir wird zu zum zur
+    """.split()),
+    "it": frozenset("""
+        a ad al alla alle anche che è chi ci come con da dal dalla dei del della delle di e ed gli ha i il in io la
+        le lei lo loro lui ma mi ne nei nel nella noi non o per più quella quello questa questo se si sono su sua
+        suo tra tu un una uno voi
+    """.split()),
+    "pt": frozenset("""
+        a à ao aos as com como da das de dela dele do dos e é ela ele eles em entre era essa esse esta este eu foi há
+        isso isto já lá lhe mais mas me mesmo meu minha muito na não nas nem no nos o os ou para pela pelo por
+        qual quando que quem se sem seu sua suas são também te tem um uma você
+    """.split()),
+}
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased word tokens (letters only, inner apostrophes kept)."""
+    return TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+
+def detect_language(tokens, default: str = "en") -> str:
+    """Language whose stopword list covers the most of the first 500 tokens."""
+    sample = tokens[:500]
+    best, best_hits = default, 0
+    for lang, words in STOPWORDS.items():
+        hits = sum(map(words.__contains__, sample))
+        if hits > best_hits:
+            best, best_hits = lang, hits
+    return best
+
+
+def terms(tokens: list, stopwords=frozenset(), max_n: int = 3, min_len: int = 3) -> list:
+    """
+    Unigrams plus phrases of up to `max_n` words. Phrases may contain
+    stopwords inside ("bed and breakfast") but never start or end with one.
+    """
+    ok = [len(t) >= min_len and t not in stopwords for t in tokens]
+    out = [t for t, keep in zip(tokens, ok) if keep]
+    if max_n >= 2:
+        out += [f"{a} {b}" for a, b, x, y in zip(tokens, tokens[1:], ok, ok[1:]) if x and y]
+    if max_n >= 3:
+        out += [
+            f"{a} {b} {c}"
+            for a, b, c, x, y in zip(tokens, tokens[1:], tokens[2:], ok, ok[2:]) if x and y
+        ]
+    for n in range(4, max_n + 1):
+        out += [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1) if ok[i] and ok[i + n - 1]]
+    return out
+
+
+class KeywordIndex:
+    """
+    Streaming TF-IDF over many documents. Target documents (the audited site)
+    contribute term frequencies; every document, target or background (e.g.
+    competitor pages), contributes document frequencies. Documents themselves
+    are never kept, and once the vocabulary passes `max_terms` the rarest
+    terms are pruned, so memory stays bounded for any number of documents.
+    """
+
+    def __init__(self, max_n: int = 3, language: str = None, max_terms: int = 250000):
+        self.max_n = max_n
+        self.language = language
+        self.max_terms = max_terms
+        self.tf = Counter()
+        self.df = Counter()
+        self.docs = 0
+        self.target_docs = 0
+        self.languages = Counter()
+
+    def add(self, text: str, target: bool = True):
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        lang = self.language or detect_language(tokens)
+        self.languages[lang] += 1
+        found = terms(tokens, STOPWORDS.get(lang, frozenset()), self.max_n)
+        self.docs += 1
+        # iterables (not mappings) take Counter's C counting loop
+        self.df.update(set(found))
+        if target:
+            self.target_docs += 1
+            self.tf.update(found)
+        if len(self.df) > self.max_terms:
+            self._prune()
+
+    def _prune(self):
+        floor = 1
+        while len(self.df) > self.max_terms * 0.8:
+            for term in [t for t, n in self.df.items() if n <= floor]:
+                del self.df[term]
+                self.tf.pop(term, None)
+            floor += 1
+
+    def idf(self, term: str) -> float:
+        return math.log((1 + self.docs) / (1 + self.df.get(term, 0))) + 1
+
+    def top(self, k: int = 20, min_count: int = 1, min_phrase_count: int = 2, max_words: int = None) -> list:
+        """
+        Best `k` target terms by sublinear TF x smoothed IDF, as
+        (term, score, count, doc_freq). A term that only ever occurs inside a
+        better-ranked phrase ("boutique" in "boutique hotels") is left out.
+        """
+        scored = []
+        for term, count in self.tf.items():
+            words = term.count(" ") + 1
+            if max_words and words > max_words:
+                continue
+            if count < (min_phrase_count if words > 1 else min_count):
+                continue
+            scored.append((term, (1 + math.log(count)) * self.idf(term), count, words))
+        scored.sort(key=lambda x: (x[1], x[3]), reverse=True)
+        picked = []
+        for term, score, count, _ in scored:
+            padded = f" {term} "
+            if any(c == count and padded in f" {t} " for t, _, c, _ in picked):
+                continue
+            picked.append((term, round(score, 3), count, self.df[term]))
+            if len(picked) == k:
+                break
+        return picked
+
+    @property
+    def main_language(self) -> str:
+        return self.languages.most_common(1)[0][0] if self.languages else (self.language or "en")
+
+
+def rank_keywords(target_texts, background_texts=(), k: int = 20, max_n: int = 3) -> list:
+    """Ranked keywords of `target_texts`, made distinctive against `background_texts`."""
+    index = KeywordIndex(max_n=max_n)
+    for text in target_texts:
+        index.add(text, target=True)
+    for text in background_texts:
+        index.add(text, target=False)
+    return index.top(k)
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+from .env import LINK_CHECK_CONCURRENCY, LINK_CHECK_PER_HOST, LINK_CHECK_TTL, USER_AGENT
+from .http_engine import engine, run
+
+# Servers that reject or mishandle HEAD; retry these with a one-byte ranged GET
+HEAD_FALLBACK_STATUSES = {403, 405, 406, 501}
+
+
+class LinkStatus:
+    __slots__ = ("url", "status", "final_url", "error", "method", "checked_at")
+
+    def __init__(self, url, status=None, final_url=None, error=None, method="HEAD"):
+        self.url = url
+        self.status = status
+        self.final_url = final_url
+        self.error = error
+        self.method = method
+        self.checked_at = time.time()
+
+    @property
+    def broken(self) -> bool:
+        return self.status is None or self.status >= 400
+
+    def to_dict(self) -> dict:
+        return {"url": self.url, "status": self.status if self.status is not None else "error",
+                "final_url": self.final_url, "error": self.error}
+
+
+class LinkChecker:
+    """
+    Checks link status with HEAD, falling back to a ranged GET, without ever
+    downloading bodies. Results are cached by URL for `ttl` seconds and shared
+    by every page and every domain in the process, and concurrent checks of the
+    same URL share one request.
+    """
+
+    def __init__(self, ttl: float = LINK_CHECK_TTL, per_host: int = LINK_CHECK_PER_HOST, timeout: float = 15,
+                 max_entries: int = 500000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.per_host = per_host
+        self.timeout = timeout
+        self._cache = {}
+        self._pending = {}
+        self._host_limits = {}
+
+    def cached(self, url: str):
+        entry = self._cache.get(url)
+        if entry and time.time() - entry.checked_at < self.ttl:
+            return entry
+        return None
+
+    def record(self, url: str, status: int = None, final_url: str = None, error: str = None, method: str = "GET"):
+        """Store a status observed elsewhere (e.g. by the crawler) so it is not checked again."""
+        self._store(LinkStatus(url, status, final_url or url, error, method))
+
+    def _store(self, status: LinkStatus):
+        self._cache.pop(status.url, None)
+        self._cache[status.url] = status
+        if len(self._cache) > self.max_entries:
+            # dicts keep insertion order, so the first key is the oldest check
+            del self._cache[next(iter(self._cache))]
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        sem = self._host_limits.get(host)
+        if sem is None:
+            sem = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def check(self, url: str) -> LinkStatus:
+        hit = self.cached(url)
+        if hit is not None:
+            return hit
+        pending = self._pending.get(url)
+        if pending is not None:
+            return await pending
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[url] = fut
+        try:
+            result = await self._check(url)
+            self._store(result)
+            fut.set_result(result)
+            return result
+        finally:
+            if not fut.done():
+                fut.cancel()
+            del self._pending[url]
+
+    async def _check(self, url: str) -> LinkStatus:
+        headers = {"User-Agent": USER_AGENT}
+        async with self._host_limit(url):
+            try:
+                r = await engine.head(url, timeout=self.timeout, headers=headers, read_body=False)
+                if r.status_code not in HEAD_FALLBACK_STATUSES:
+                    return LinkStatus(url, r.status_code, str(r.url), method="HEAD")
+            except Exception:
+                pass
+            try:
+                r = await engine.get(
+                    url, timeout=self.timeout, headers={**headers, "Range": "bytes=0-0"}, read_body=False
+                )
+                status = 200 if r.status_code == 206 else r.status_code
+                return LinkStatus(url, status, str(r.url), method="GET")
+            except Exception as e:
+                return LinkStatus(url, None, None, str(e) or type(e).__name__, method="GET")
+
+    async def check_many(self, urls, concurrency: int = LINK_CHECK_CONCURRENCY) -> dict:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(u):
+            async with sem:
+                return await self.check(u)
+
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(one(u) for u in unique))
+        return dict(zip(unique, results))
+
+
+link_checker = LinkChecker()
+
+
+def check_links(urls, concurrency: int = LINK_CHECK_CONCURRENCY) -> dict:
+    """Sync wrapper: url -> LinkStatus for every distinct URL."""
+    return run(link_checker.check_many(urls, concurrency=concurrency))
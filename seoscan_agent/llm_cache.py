@@ -0,0 +1,53 @@
+import hashlib
+import json
+import threading
+
+from . import tracing
+from .env import LLM_CACHE_MAX_MB, LLM_CACHE_PATH, LLM_CACHE_TTL
+from .store import SqliteCache
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide completion cache, or None when SEOSCAN_LLM_CACHE_PATH is empty."""
+    global _cache
+    with _cache_lock:
+        if _cache is None and LLM_CACHE_PATH:
+            _cache = SqliteCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+def completion_key(llm, prompt: str) -> str:
+    """Content address of a completion: backend, model, temperature and prompt."""
+    ident = [
+        type(llm).__name__,
+        getattr(llm, "model", None),
+        getattr(llm, "temperature", None),
+        prompt,
+    ]
+    return hashlib.sha256(json.dumps(ident, default=str).encode("utf-8")).hexdigest()
+
+
+def complete_text(llm, prompt: str, cache: bool = True) -> str:
+    """
+    llm.complete(prompt).text, served from the persistent completion cache when
+    the same model, temperature and prompt were seen before. Pass cache=False
+    to always call the model (the fresh answer still replaces the cached one).
+    """
+    store = get_cache()
+    key = completion_key(llm, prompt) if store is not None else None
+    if cache and store is not None:
+        hit = store.get(key)
+        if hit is not None:
+            with tracing.span("llm", "cache", cached=True, model=getattr(llm, "model", None)):
+                return hit
+    resp = llm.complete(prompt)
+    text = resp.text if hasattr(resp, "text") else str(resp)
+    if store is not None:
+        try:
+            store.set(key, text)
+        except Exception as e:
+            print(f"[WARN] LLM cache write failed: {e}")
+    return text
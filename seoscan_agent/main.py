@@ -1,13 +1,25 @@
+import sys
+
 from .agents import SeoOrchestrator
+from .env import REPORT_STREAM
+from .fetch import audit_scope
+from .synthesis import set_report_stream
+from .tracing import audit_trace, format_summary
 
 def main():
+    # competitor report sections show up here as they finish
+    set_report_stream(REPORT_STREAM or "-")
     print("=== SEOSCAN ===")
     while True:
         query = input("\nYour request: ").strip()
         if query.lower() == "exit":
             break
         print("\n=== SEO Response ===\n")
-        print(SeoOrchestrator.chat(query))
+        with audit_trace(query[:80]) as trace, audit_scope():
+            response = SeoOrchestrator.chat(query)
+        print(response)
+        if trace is not None:
+            print(f"\n=== Profile ({trace.profile_path or 'not saved'}) ===\n{format_summary(trace.summary())}", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+import importlib.util
+import re
+
+from .env import HTML_PARSER
+from .fetch import cache_key, current_cache, fetch
+from .utils import normalize_url
+
+# backend name -> module that must be importable, fastest first
+BACKENDS = {"selectolax": "selectolax", "lxml": "lxml", "html.parser": "bs4"}
+RESPONSIVE_RE = re.compile("max-width|media")
+_INVISIBLE = ["script", "style", "noscript", "template"]
+
+
+def available_backends() -> list:
+    return [name for name, module in BACKENDS.items() if importlib.util.find_spec(module) is not None]
+
+
+def resolve_backend(parser: str = None) -> str:
+    parser = parser or HTML_PARSER
+    if parser and parser != "auto":
+        return parser
+    found = available_backends()
+    return found[0] if found else "html.parser"
+
+
+class PageSnapshot:
+    """
+    Everything the tools read from a page, extracted in a single parse.
+    """
+
+    __slots__ = (
+        "url", "title", "meta_description", "links", "images", "jsonld",
+        "og_tags", "twitter_tags", "viewport", "styles", "has_nav", "has_main", "text",
+    )
+
+    def __init__(self, url: str = ""):
+        self.url = url
+        self.title = ""
+        self.meta_description = ""
+        self.links = []           # raw href values of <a href>
+        self.images = []          # (src, alt) pairs
+        self.jsonld = []          # raw JSON-LD script bodies
+        self.og_tags = []         # (property, content) pairs
+        self.twitter_tags = []    # (name, content) pairs
+        self.viewport = None
+        self.styles = []          # inline <style> bodies
+        self.has_nav = False
+        self.has_main = False
+        self.text = ""
+
+    @property
+    def has_responsive_styles(self) -> bool:
+        return any(RESPONSIVE_RE.search(s) for s in self.styles)
+
+    @classmethod
+    def parse(cls, html: str, url: str = "", parser: str = None) -> "PageSnapshot":
+        backend = resolve_backend(parser)
+        snap = cls(url)
+        if backend == "selectolax":
+            _parse_selectolax(snap, html)
+        else:
+            _parse_soup(snap, html, backend)
+        return snap
+
+
+def _parse_soup(snap: PageSnapshot, html: str, backend: str):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, backend)
+    snap.title = soup.title.get_text().strip() if soup.title else ""
+    for meta in soup.find_all("meta"):
+        name = (meta.get("name") or "").lower()
+        prop = meta.get("property") or ""
+        content = meta.get("content")
+        if name == "description" and content and not snap.meta_description:
+            snap.meta_description = content
+        elif name == "viewport" and snap.viewport is None:
+            snap.viewport = content or ""
+        elif name.startswith("twitter:"):
+            snap.twitter_tags.append((meta.get("name"), content))
+        if prop.startswith("og:"):
+            snap.og_tags.append((prop, content))
+    snap.links = [a["href"] for a in soup.find_all("a", href=True)]
+    snap.images = [(img.get("src"), img.get("alt")) for img in soup.find_all("img")]
+    snap.has_nav = soup.find("nav") is not None
+    snap.has_main = soup.find("main") is not None
+    for script in soup.find_all("script"):
+        if "ld+json" in (script.get("type") or ""):
+            snap.jsonld.append(script.get_text())
+    snap.styles = [s.get_text() for s in soup.find_all("style")]
+    for tag in soup.find_all(_INVISIBLE):
+        tag.decompose()
+    snap.text = soup.get_text(separator=" ", strip=True)
+
+
+def _parse_selectolax(snap: PageSnapshot, html: str):
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:  # selectolax < 0.3
+        from selectolax.parser import HTMLParser
+
+    tree = HTMLParser(html)
+    title = tree.css_first("title")
+    snap.title = title.text().strip() if title else ""
+    for meta in tree.css("meta"):
+        attrs = meta.attributes
+        name = (attrs.get("name") or "").lower()
+        prop = attrs.get("property") or ""
+        content = attrs.get("content")
+        if name == "description" and content and not snap.meta_description:
+            snap.meta_description = content
+        elif name == "viewport" and snap.viewport is None:
+            snap.viewport = content or ""
+        elif name.startswith("twitter:"):
+            snap.twitter_tags.append((attrs.get("name"), content))
+        if prop.startswith("og:"):
+            snap.og_tags.append((prop, content))
+    snap.links = [a.attributes["href"] for a in tree.css("a[href]") if a.attributes.get("href") is not None]
+    snap.images = [(img.attributes.get("src"), img.attributes.get("alt")) for img in tree.css("img")]
+    snap.has_nav = tree.css_first("nav") is not None
+    snap.has_main = tree.css_first("main") is not None
+    for script in tree.css("script"):
+        if "ld+json" in (script.attributes.get("type") or ""):
+            snap.jsonld.append(script.text(deep=True))
+    snap.styles = [s.text(deep=True) for s in tree.css("style")]
+    tree.strip_tags(_INVISIBLE)
+    root = tree.root
+    snap.text = " ".join(root.text(separator=" ", strip=True).split()) if root else ""
+
+
+def snapshot(url: str, timeout: float = 10, parser: str = None) -> PageSnapshot:
+    """Fetch `url` through the page cache and parse it at most once per audit."""
+    resp = fetch(url, timeout=timeout)
+    backend = resolve_backend(parser)
+    return current_cache().derived(
+        cache_key(url), "snapshot:" + backend, resp,
+        lambda r: PageSnapshot.parse(r.text, url=r.url, parser=backend),
+    )
+
+
+def page_snapshot(domain: str, timeout: float = 10, parser: str = None) -> PageSnapshot:
+    return snapshot(normalize_url(domain), timeout=timeout, parser=parser)
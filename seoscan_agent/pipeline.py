@@ -0,0 +1,184 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import tracing
+from .history import record_run
+from .llm_cache import complete_text
+from .prompts import AUDIT_REPORT_PROMPT
+from .tools.content import gather_competitor_keywords_tool, keyword_extraction_tool, schema_validation_tool
+from .tools.llm import get_llm
+from .tools.technical import (
+    broken_links_tool, crawlability_tool, http_headers_tool, lighthouse_tool,
+    redirect_check_tool, robots_txt_tool, sitemap_tool,
+)
+from .tools.ux import accessibility_tool, mobile_friendly_tool
+
+# Declarative audit plan: aspect -> tools that take a domain and run once each.
+# llm_keywords_from_content_tool is covered by gather_competitor_keywords_tool.
+AUDIT_PLAN = {
+    "technical": [
+        robots_txt_tool, sitemap_tool, broken_links_tool, http_headers_tool,
+        redirect_check_tool, lighthouse_tool, crawlability_tool,
+    ],
+    "content": [schema_validation_tool, keyword_extraction_tool, gather_competitor_keywords_tool],
+    "ux": [accessibility_tool, mobile_friendly_tool],
+}
+
+
+def _timed(tool, domain: str):
+    start = time.monotonic()
+    with tracing.span("tool", tool.__name__) as span:
+        try:
+            result = tool(domain)
+        except Exception as e:
+            result = {"error": str(e)}
+        if span is not None and isinstance(result, dict) and result.get("error"):
+            span.set(error_result=str(result["error"])[:200])
+    return result, round(time.monotonic() - start, 3)
+
+
+def run_plan(domain: str, aspects=None, plan: dict = None, workers: int = 12, on_tool=None) -> dict:
+    """
+    Run every tool of the selected aspects concurrently, without an LLM.
+    Returns {aspect: {tool_name: result}} plus per-tool timings under "_timings".
+    `on_tool(aspect, tool_name, result, seconds)` is called as each tool
+    finishes; if it raises, tools not started yet are dropped and the error
+    propagates without waiting for the ones still running.
+    """
+    plan = plan or AUDIT_PLAN
+    aspects = list(aspects or plan)
+    jobs = [(aspect, tool) for aspect in aspects for tool in plan[aspect]]
+    results = {aspect: {} for aspect in aspects}
+    timings = {}
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(jobs)) or 1)
+    try:
+        futures = {pool.submit(tracing.bind(_timed), tool, domain): (aspect, tool) for aspect, tool in jobs}
+        for fut in as_completed(futures) if on_tool else futures:
+            aspect, tool = futures[fut]
+            results[aspect][tool.__name__], timings[tool.__name__] = fut.result()
+            if on_tool:
+                on_tool(aspect, tool.__name__, *fut.result())
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    # results keep plan order whatever order the tools finished in
+    results = {aspect: {tool.__name__: results[aspect][tool.__name__] for tool in plan[aspect]} for aspect in aspects}
+    results["_timings"] = timings
+    return results
+
+
+# Run bookkeeping that means nothing to the report; left out of the prompt
+# so re-audits of an unchanged site hit the completion cache.
+VOLATILE_FIELDS = {"duration_s", "fetched_at", "unchanged_pages"}
+# Latency of our own requests (redirect hops and chains); network jitter is far
+# larger than lab drift, so these are shown as the bucket they fall in
+TIMING_FIELDS = {"ms", "elapsed_ms", "slowest_ms"}
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 5000)
+# http_headers_tool values that differ on every request; the prompt only says they were sent
+PER_REQUEST_HEADERS = {
+    "date", "age", "expires", "set-cookie", "server-timing", "x-request-id", "x-amz-request-id", "x-amz-cf-id",
+    "cf-ray", "cf-cache-status", "x-cache", "x-cache-hits", "x-served-by", "x-timer", "x-runtime", "x-varnish",
+    "x-vercel-id", "x-vercel-cache",
+}
+VALIDATOR_HEADERS = {"etag", "last-modified"}
+PRESENT = "(present)"
+
+
+def _coarse(value):
+    """Two significant figures: timings drift a little between runs, the prompt should not."""
+    value = float(f"{value:.2g}")
+    return int(value) if value >= 10 else value
+
+
+def _latency(ms) -> str:
+    bound = next((b for b in LATENCY_BUCKETS_MS if ms < b), None)
+    return f"<{bound}" if bound else f">={LATENCY_BUCKETS_MS[-1]}"
+
+
+def _stable_headers(headers: dict, validators: bool) -> dict:
+    out = {}
+    for name, value in headers.items():
+        lower = str(name).lower()
+        if lower in PER_REQUEST_HEADERS or (lower in VALIDATOR_HEADERS and not validators):
+            out[name] = PRESENT
+        elif lower == "content-length" and str(value).isdigit():
+            out[name] = _coarse(int(value))
+        else:
+            out[name] = value
+    return out
+
+
+def _stable(value, key: str = "", validators: bool = False):
+    """
+    `value` with per-fetch noise normalized: run bookkeeping dropped, request
+    latencies bucketed, lab timings coarsened and the per-request headers of
+    http_headers_tool reduced to PRESENT. With `validators`, ETag and
+    Last-Modified keep their values (snapshot diffs report them changing);
+    otherwise they are reduced too.
+    """
+    if key == "http_headers_tool" and isinstance(value, dict) and "error" not in value:
+        return _stable_headers(value, validators)
+    if isinstance(value, dict):
+        return {k: _stable(v, str(k), validators) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_stable(v, validators=validators) for v in value]
+    timing = key in TIMING_FIELDS or key.endswith("_ms")
+    if timing and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _latency(value) if key in TIMING_FIELDS else _coarse(value)
+    return value
+
+
+# Longest list shown to the LLM; counts next to a list still cover every item
+PROMPT_LIST_LIMIT = 25
+
+
+def prompt_view(value, limit: int = PROMPT_LIST_LIMIT):
+    """`value` as it goes into a prompt: lists cut to `limit` items, the stored result keeps them all."""
+    if isinstance(value, dict):
+        return {k: prompt_view(v, limit) for k, v in value.items()}
+    if isinstance(value, list):
+        return [prompt_view(v, limit) for v in value[:limit]]
+    return value
+
+
+def interpret(domain: str, results: dict, llm=None, cache: bool = True) -> str:
+    """Single LLM call that turns structured tool results into the audit report."""
+    if llm is None:
+        llm = get_llm("synthesis")
+    data = prompt_view(_stable({k: v for k, v in results.items() if not k.startswith("_")}))
+    prompt = AUDIT_REPORT_PROMPT.format(
+        domain=domain,
+        aspects=", ".join(data),
+        results=json.dumps(data, indent=1, default=str),
+    )
+    return complete_text(llm, prompt, cache=cache)
+
+
+def fast_audit(domain: str, aspects=None, llm=None) -> str:
+    """Deterministic audit: run the plan directly, then one LLM call to write it up."""
+    started = time.time()
+    results = run_plan(domain, aspects)
+    report = interpret(domain, results, llm=llm)
+    record_run(domain, results, started_at=started, duration_s=round(time.time() - started, 3), report=report)
+    return report
+
+
+def competitor_plan(competitors, plan: dict = None) -> dict:
+    """`plan` with keyword_extraction_tool ranking terms against the competitors' pages."""
+    def keywords(domain):
+        return keyword_extraction_tool(domain, competitors=competitors)
+
+    keywords.__name__ = keyword_extraction_tool.__name__
+    plan = plan or AUDIT_PLAN
+    return {a: [keywords if t is keyword_extraction_tool else t for t in tools] for a, tools in plan.items()}
+
+
+def aspect_runner(aspect: str, main: str = None, competitors=None):
+    """
+    Callable(domain) -> structured results of one aspect, for use in batch/competitor audits.
+    With `competitors`, the keywords of `main` are ranked against their pages.
+    """
+    plan = competitor_plan(competitors) if competitors else None
+    return lambda domain: run_plan(domain, [aspect], plan=plan if domain == main else None)[aspect]
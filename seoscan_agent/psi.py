@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import tracing
+from .env import (
+    GOOGLE_PSI_API_KEY, PSI_CACHE_PATH, PSI_CACHE_TTL, PSI_ENDPOINT, PSI_MAX_RETRIES, PSI_RATE_PER_MIN,
+)
+from .fetch import session
+from .ratelimit import RateLimiter
+from .store import SqliteCache
+from .utils import normalize_url
+
+STRATEGIES = ("mobile", "desktop")
+CATEGORIES = ("performance", "accessibility", "best-practices", "seo")
+# Lighthouse audit id -> output field; values are numericValue (milliseconds, except CLS)
+METRICS = {
+    "first-contentful-paint": "first_contentful_paint_ms",
+    "largest-contentful-paint": "largest_contentful_paint_ms",
+    "speed-index": "speed_index_ms",
+    "interactive": "interactive_ms",
+    "total-blocking-time": "total_blocking_time_ms",
+    "server-response-time": "server_response_time_ms",
+    "cumulative-layout-shift": "cumulative_layout_shift",
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PSIError(Exception):
+    pass
+
+
+def extract_metrics(data: dict) -> dict:
+    """Compact numeric summary of a PSI v5 response (scores 0-1, timings in ms)."""
+    lh = data.get("lighthouseResult", {})
+    categories = lh.get("categories", {})
+    audits = lh.get("audits", {})
+    result = {
+        category.replace("-", "_") + "_score": categories.get(category, {}).get("score")
+        for category in CATEGORIES
+    }
+    for audit_id, field in METRICS.items():
+        value = audits.get(audit_id, {}).get("numericValue")
+        result[field] = round(value, 3 if field == "cumulative_layout_shift" else 1) if value is not None else None
+    field_data = data.get("loadingExperience", {}).get("metrics", {})
+    if field_data:
+        result["field"] = {
+            name.lower(): {"percentile": m.get("percentile"), "category": m.get("category")}
+            for name, m in field_data.items()
+        }
+    result["lighthouse_version"] = lh.get("lighthouseVersion")
+    return result
+
+
+class PSIClient:
+    """
+    PageSpeed Insights client. Every URL/strategy pair is cached for `ttl`
+    seconds, calls are paced per API key, and 429/5xx responses are retried
+    with exponential backoff and jitter.
+    """
+
+    def __init__(self, api_key: str = GOOGLE_PSI_API_KEY, endpoint: str = PSI_ENDPOINT,
+                 cache: SqliteCache = None, rate_per_min: float = PSI_RATE_PER_MIN,
+                 max_retries: int = PSI_MAX_RETRIES, timeout: float = 60):
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.cache = cache
+        self.rate_per_min = rate_per_min
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, key: str) -> RateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = RateLimiter(self.rate_per_min, 60.0)
+            return limiter
+
+    def _request(self, url: str, strategy: str) -> dict:
+        params = [("url", url), ("strategy", strategy)] + [("category", c) for c in CATEGORIES]
+        if self.api_key:
+            params.append(("key", self.api_key))
+        limiter = self._limiter(self.api_key or "")
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            try:
+                resp = session.get(self.endpoint, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise PSIError(str(e))
+            else:
+                if resp.status_code == 200:
+                    return resp.json()
+                if resp.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    try:
+                        message = resp.json().get("error", {}).get("message")
+                    except ValueError:
+                        message = None
+                    raise PSIError(f"HTTP {resp.status_code}: {message or resp.reason}")
+                retry_after = resp.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    time.sleep(min(float(retry_after), 60))
+                    continue
+            time.sleep(min(2 ** attempt, 30) + random.uniform(0, 1))
+        raise PSIError("retries exhausted")
+
+    def run(self, url: str, strategy: str = "mobile", use_cache: bool = True) -> dict:
+        key = f"{strategy}:{url}"
+        if use_cache and self.cache is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        result = extract_metrics(self._request(url, strategy))
+        result["fetched_at"] = time.time()
+        if self.cache is not None:
+            self.cache.set(key, result)
+        return result
+
+    def collect(self, urls, strategies=STRATEGIES, workers: int = 8, use_cache: bool = True) -> dict:
+        """{url: {strategy: metrics or {"error": ...}}} for every url and strategy, run concurrently."""
+        jobs = [(u, s) for u in urls for s in strategies]
+        results = {u: {} for u in urls}
+
+        def one(job):
+            u, s = job
+            try:
+                return self.run(u, s, use_cache=use_cache)
+            except Exception as e:
+                return {"error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+            for (u, s), result in zip(jobs, pool.map(tracing.bind(one), jobs)):
+                results[u][s] = result
+        return results
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> PSIClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            cache = SqliteCache(PSI_CACHE_PATH, ttl=PSI_CACHE_TTL) if PSI_CACHE_PATH else None
+            _client = PSIClient(cache=cache)
+    return _client
+
+
+def pagespeed(domain: str, strategies=STRATEGIES) -> dict:
+    url = normalize_url(domain)
+    return get_client().collect([url], strategies)[url]
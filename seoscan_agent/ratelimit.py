@@ -0,0 +1,119 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: `rate` requests per `per` seconds, with bursts of
+    up to `burst` requests. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0, burst: float = None):
+        self.rate = rate
+        self.per = per
+        self.capacity = burst if burst is not None else max(1.0, min(rate, 5.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available and return 0, else return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) * self.per / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now, going into debt if needed, and return how long the caller should wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            return max(0.0, -self._tokens) * self.per / self.rate
+
+    def debit(self, tokens: float):
+        """Charge tokens after the fact (may go negative, making later callers wait)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+
+
+class RequestBudget:
+    """
+    Outgoing HTTP requests per minute for the whole process: one bucket shared
+    by all hosts and one per host, each allowing ~10 seconds' worth of burst.
+    reserve() books a request in both and returns the seconds to wait before
+    sending it, so sync and async callers can sleep in their own way. Hosts in
+    `exempt` (API endpoints with their own limits) are not counted.
+    """
+
+    def __init__(self, global_per_min: float = 0, host_per_min: float = 0, exempt=(), max_hosts: int = 10000):
+        self.host_per_min = host_per_min
+        self.exempt = {h.lower() for h in exempt}
+        self.max_hosts = max_hosts
+        self.all = RateLimiter(global_per_min, 60, burst=max(1.0, global_per_min / 6)) if global_per_min > 0 else None
+        self.hosts = {}
+        self.requests = 0
+        self.waited_s = 0.0
+        self._lock = threading.Lock()
+
+    def _host(self, host: str):
+        with self._lock:
+            bucket = self.hosts.get(host)
+            if bucket is None:
+                if len(self.hosts) >= self.max_hosts:
+                    # forget hosts whose bucket has refilled: they have been idle for a while
+                    now = time.monotonic()
+                    for name, b in list(self.hosts.items()):
+                        b._refill(now)
+                        if b._tokens >= b.capacity:
+                            del self.hosts[name]
+                bucket = self.hosts[host] = RateLimiter(self.host_per_min, 60, burst=max(1.0, self.host_per_min / 6))
+            return bucket
+
+    def reserve(self, url: str) -> float:
+        host = (urlparse(url).hostname or "").lower()
+        if host in self.exempt:
+            return 0.0
+        wait = self.all.reserve() if self.all is not None else 0.0
+        if self.host_per_min > 0:
+            wait = max(wait, self._host(host).reserve())
+        with self._lock:
+            self.requests += 1
+            self.waited_s += wait
+        return wait
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "waited_s": round(self.waited_s, 1), "hosts": len(self.hosts)}
+
+
+_budget = None
+
+
+def set_request_budget(budget: RequestBudget = None):
+    """Install (or with None remove) the process-wide request budget used by the HTTP clients."""
+    global _budget
+    _budget = budget
+
+
+def request_delay(url: str) -> float:
+    """Seconds to wait before requesting `url` under the installed budget (0 without one)."""
+    budget = _budget
+    return budget.reserve(url) if budget is not None else 0.0
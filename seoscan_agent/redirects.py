@@ -0,0 +1,270 @@
+"""
+Redirect chain tracing.
+
+Hops are followed one request at a time (HEAD, falling back to a one-byte
+ranged GET) so no body is ever downloaded, and every hop keeps its status,
+Location, latency and Strict-Transport-Security header. Chains are checked
+concurrently, either for the http/https and www/non-www variants of a domain
+or in bulk for every URL of a crawl or sitemap.
+
+    python -m seoscan_agent.redirects example.com
+    python -m seoscan_agent.redirects example.com --source sitemap --max-urls 5000
+    python -m seoscan_agent.redirects urls.txt
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from urllib.parse import urljoin, urlparse
+
+from .env import LINK_CHECK_CONCURRENCY, REDIRECT_LONG_CHAIN, REDIRECT_MAX_HOPS, USER_AGENT
+from .http_engine import engine, run
+from .linkcheck import HEAD_FALLBACK_STATUSES
+from .utils import normalize_url
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+PERMANENT = {301, 308}
+
+
+class Hop:
+    __slots__ = ("url", "status", "location", "elapsed_ms", "hsts", "method")
+
+    def __init__(self, url, status, location=None, elapsed_ms=0.0, hsts=None, method="HEAD"):
+        self.url = url
+        self.status = status
+        self.location = location
+        self.elapsed_ms = elapsed_ms
+        self.hsts = hsts
+        self.method = method
+
+    def to_dict(self) -> dict:
+        d = {"url": self.url, "status": self.status, "ms": self.elapsed_ms}
+        if self.location is not None:
+            d["location"] = self.location
+        if self.hsts is not None:
+            d["hsts"] = self.hsts
+        return d
+
+
+class RedirectChain:
+    """Every hop from `url` to the first non-redirect response (or the failure that ended the chain)."""
+    __slots__ = ("url", "hops", "error", "loop", "truncated")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.hops = []
+        self.error = None
+        self.loop = False
+        self.truncated = False
+
+    @property
+    def redirects(self) -> int:
+        return sum(1 for h in self.hops if h.status in REDIRECT_STATUSES)
+
+    @property
+    def final_url(self):
+        """Where the chain ends up: the last hop, or the target of its Location when it redirected."""
+        if not self.hops:
+            return None
+        last = self.hops[-1]
+        if last.status in REDIRECT_STATUSES and last.location:
+            return urljoin(last.url, last.location.strip())
+        return last.url
+
+    @property
+    def final_status(self):
+        """Status of the page the chain ends on; None when it never got there (error, loop, too many hops)."""
+        last = self.hops[-1] if self.hops else None
+        return None if last is None or self.error or self.loop or self.truncated else last.status
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round(sum(h.elapsed_ms for h in self.hops), 1)
+
+    def flags(self, long_chain: int = REDIRECT_LONG_CHAIN) -> list:
+        statuses = {h.status for h in self.hops if h.status in REDIRECT_STATUSES}
+        flags = []
+        if self.loop:
+            flags.append("loop")
+        if self.truncated:
+            flags.append("too_many_hops")
+        if self.redirects >= long_chain:
+            flags.append("long_chain")
+        if statuses & PERMANENT and statuses - PERMANENT:
+            flags.append("mixed_301_302")
+        elif statuses and not statuses & PERMANENT:
+            flags.append("temporary_only")
+        if any(h.url.startswith("https://") and (h.location or "").startswith("http://") for h in self.hops):
+            flags.append("https_downgrade")
+        final = self.hops[-1] if self.hops else None
+        if final is not None and final.url.startswith("https://") and final.hsts is None and not self.loop:
+            flags.append("no_hsts")
+        if self.error or (self.final_status or 0) >= 400:
+            flags.append("broken")
+        return flags
+
+    def to_dict(self) -> dict:
+        d = {
+            "status": self.final_status, "final_url": self.final_url, "redirects": self.redirects,
+            "ms": self.elapsed_ms, "hops": [h.to_dict() for h in self.hops], "flags": self.flags(),
+        }
+        if self.error:
+            d["error"] = self.error
+        return d
+
+
+async def _request(url: str, timeout: float) -> tuple:
+    headers = {"User-Agent": USER_AGENT}
+    start = time.perf_counter()
+    try:
+        r = await engine.head(url, timeout=timeout, headers=headers, follow_redirects=False, read_body=False)
+        if r.status_code not in HEAD_FALLBACK_STATUSES:
+            return r, "HEAD", time.perf_counter() - start
+    except Exception:
+        pass
+    start = time.perf_counter()
+    r = await engine.get(url, timeout=timeout, headers={**headers, "Range": "bytes=0-0"},
+                         follow_redirects=False, read_body=False)
+    return r, "GET", time.perf_counter() - start
+
+
+async def trace_redirects(url: str, max_hops: int = REDIRECT_MAX_HOPS, timeout: float = 15) -> RedirectChain:
+    """Follow `url` hop by hop without reading bodies; stops at a loop or after `max_hops` redirects."""
+    chain = RedirectChain(url)
+    seen = set()
+    current = url
+    while True:
+        if current in seen:
+            chain.loop = True
+            return chain
+        seen.add(current)
+        try:
+            r, method, elapsed = await _request(current, timeout)
+        except Exception as e:
+            chain.error = f"{current}: {str(e) or type(e).__name__}"
+            return chain
+        status = 200 if r.status_code == 206 else r.status_code
+        location = r.headers.get("location") if status in REDIRECT_STATUSES else None
+        hsts = r.headers.get("strict-transport-security") if current.startswith("https://") else None
+        chain.hops.append(Hop(current, status, location, round(elapsed * 1000, 1), hsts, method))
+        if status not in REDIRECT_STATUSES:
+            return chain
+        if not location:
+            chain.error = f"{current}: HTTP {status} without Location"
+            return chain
+        if chain.redirects > max_hops:
+            chain.truncated = True
+            return chain
+        current = urljoin(current, location.strip())
+
+
+async def trace_many(urls, concurrency: int = LINK_CHECK_CONCURRENCY, **kwargs) -> dict:
+    """url -> RedirectChain for every distinct URL, `concurrency` chains in flight (per-host limits still apply)."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(u):
+        async with sem:
+            return await trace_redirects(u, **kwargs)
+
+    unique = list(dict.fromkeys(urls))
+    chains = await asyncio.gather(*(one(u) for u in unique))
+    return dict(zip(unique, chains))
+
+
+def check_redirects(urls, concurrency: int = LINK_CHECK_CONCURRENCY, **kwargs) -> dict:
+    """Sync wrapper around trace_many()."""
+    return run(trace_many(urls, concurrency=concurrency, **kwargs))
+
+
+def domain_variants(domain: str) -> list:
+    """http/https x bare/www versions of a domain's homepage."""
+    host = urlparse(normalize_url(domain)).netloc
+    bare = re.sub(r"^www\.", "", host, flags=re.I)
+    return [f"{scheme}://{h}" for h in (bare, f"www.{bare}") for scheme in ("http", "https")]
+
+
+def summarize(chains: dict, sample: int = 25) -> dict:
+    """Flag counts and hop-length histogram over many chains, with the worst ones listed."""
+    flag_counts, lengths = {}, {}
+    flagged = []
+    for url, chain in chains.items():
+        flags = chain.flags()
+        lengths[chain.redirects] = lengths.get(chain.redirects, 0) + 1
+        for f in flags:
+            flag_counts[f] = flag_counts.get(f, 0) + 1
+        if flags and flags != ["no_hsts"]:
+            flagged.append((len(flags), chain.redirects, url, chain))
+    flagged.sort(key=lambda t: (t[0], t[1]), reverse=True)
+    return {
+        "urls_checked": len(chains),
+        "redirected": sum(n for hops, n in lengths.items() if hops),
+        "hops_histogram": {str(k): v for k, v in sorted(lengths.items())},
+        "flags": flag_counts,
+        "slowest_ms": max((c.elapsed_ms for c in chains.values()), default=0),
+        "flagged": [{"url": url, **chain.to_dict()} for _, _, url, chain in flagged[:sample]],
+    }
+
+
+def site_urls(domain: str, source: str = "sitemap", max_urls: int = 1000) -> list:
+    """URLs to check in bulk: sitemap <loc>s, or pages and links found by a crawl."""
+    if source == "crawl":
+        from .crawler import crawl_site
+
+        crawl = crawl_site(domain, max_pages=max_urls)
+        return list(dict.fromkeys([*(p.url for p in crawl.pages), *crawl.links]))[:max_urls]
+    if source != "sitemap":
+        raise ValueError(f"unknown URL source {source!r} (expected sitemap or crawl)")
+    from .robots import robots_cache
+    from .sitemap import DEFAULT_SITEMAPS, iter_sitemaps, sitemap_roots
+
+    roots = sitemap_roots(domain, robots_cache.get(normalize_url(domain)).sitemaps)
+    roots = roots or [urljoin(normalize_url(domain), p) for p in DEFAULT_SITEMAPS]
+    urls = []
+    for entry in iter_sitemaps(roots):
+        urls.append(entry.loc)
+        if len(urls) >= max_urls:
+            break
+    return urls
+
+
+def check_site_redirects(domain: str, source: str = "sitemap", max_urls: int = 1000, **kwargs) -> dict:
+    """Bulk check of every URL from `domain`'s sitemaps or a crawl of it."""
+    try:
+        urls = site_urls(domain, source, max_urls)
+        if not urls:
+            return {"error": f"no URLs found via {source}"}
+        return {"source": source, **summarize(check_redirects(urls, **kwargs))}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m seoscan_agent.redirects",
+                                     description="Trace redirect chains without downloading pages.")
+    parser.add_argument("target", help="domain, or a file of URLs (one per line, '-' for stdin)")
+    parser.add_argument("--source", choices=("variants", "sitemap", "crawl"), default="variants",
+                        help="URLs to check for a domain (default: http/https and www variants)")
+    parser.add_argument("--max-urls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=LINK_CHECK_CONCURRENCY)
+    parser.add_argument("--max-hops", type=int, default=REDIRECT_MAX_HOPS)
+    args = parser.parse_args(argv)
+
+    opts = {"concurrency": args.concurrency, "max_hops": args.max_hops}
+    if args.target == "-" or args.target.endswith(".txt"):
+        stream = sys.stdin if args.target == "-" else open(args.target, encoding="utf-8")
+        with stream:
+            urls = [line.strip() for line in stream if line.strip() and not line.startswith("#")]
+        result = summarize(check_redirects([normalize_url(u) for u in urls], **opts))
+    elif args.source == "variants":
+        chains = check_redirects(domain_variants(args.target), **opts)
+        result = {url: chain.to_dict() for url, chain in chains.items()}
+    else:
+        result = check_site_redirects(args.target, args.source, args.max_urls, **opts)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
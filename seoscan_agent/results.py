@@ -0,0 +1,304 @@
+"""
+Compact audit result model.
+
+Every audit tool gets a small slotted record that keeps only the numbers and
+flags a report needs. DomainAudit groups them per domain, and
+comparison_tables renders them as markdown tables for synthesis prompts
+instead of raw JSON or agent prose.
+"""
+
+
+class ToolResult:
+    """Base record: fixed fields per tool, no per-instance dict, `error` on failure."""
+    __slots__ = ("error",)
+    tool = ""
+    aspect = ""
+
+    def __init__(self, **values):
+        for name in self.fields():
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def fields(cls) -> tuple:
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(getattr(klass, "__slots__", ()))
+        return tuple(names[1:] + names[:1])  # error last
+
+    @classmethod
+    def parse(cls, result):
+        """Build the record from a tool's raw dict result."""
+        if not isinstance(result, dict):
+            return cls(error=str(result)[:200])
+        try:
+            values = cls.extract(result)
+        except Exception as e:
+            values = {"error": f"unreadable result: {e}"}
+        if result.get("error") and not values.get("error"):
+            values["error"] = str(result["error"])[:200]
+        return cls(**values)
+
+    @staticmethod
+    def extract(result: dict) -> dict:
+        raise NotImplementedError
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.fields() if getattr(self, name) is not None}
+
+
+class RobotsResult(ToolResult):
+    __slots__ = ("found", "rules", "sitemaps")
+    tool, aspect = "robots_txt_tool", "technical"
+
+    @staticmethod
+    def extract(r):
+        found = "robots.txt_url" in r
+        return {"found": found, "rules": r.get("rules_count"), "sitemaps": len(r.get("sitemaps") or []) if found else None}
+
+
+class SitemapResult(ToolResult):
+    __slots__ = ("found", "files", "urls", "invalid", "no_lastmod", "errors")
+    tool, aspect = "sitemap_tool", "technical"
+
+    @staticmethod
+    def extract(r):
+        found = "sitemap" not in r and not r.get("error")
+        return {
+            "found": found, "files": r.get("files"), "urls": r.get("num_urls"),
+            "invalid": r.get("invalid_entries"), "no_lastmod": r.get("lastmod_missing"),
+            "errors": len(r.get("errors") or []) if found else None,
+        }
+
+
+class BrokenLinksResult(ToolResult):
+    __slots__ = ("pages", "links", "broken", "broken_int", "broken_ext")
+    tool, aspect = "broken_links_tool", "technical"
+
+    @staticmethod
+    def extract(r):
+        return {
+            "pages": r.get("pages_crawled"), "links": r.get("links_checked"), "broken": r.get("broken_links_count"),
+            "broken_int": r.get("broken_internal"), "broken_ext": r.get("broken_external"),
+        }
+
+
+class HeadersResult(ToolResult):
+    __slots__ = ("hsts", "csp", "x_frame", "compression", "cache_control", "x_robots")
+    tool, aspect = "http_headers_tool", "technical"
+
+    @staticmethod
+    def extract(r):
+        h = {str(k).lower(): v for k, v in r.items()}
+        return {
+            "hsts": "strict-transport-security" in h, "csp": "content-security-policy" in h,
+            "x_frame": "x-frame-options" in h, "compression": h.get("content-encoding"),
+            "cache_control": (h.get("cache-control") or "")[:40] or None, "x_robots": h.get("x-robots-tag"),
+        }
+
+
+class RedirectResult(ToolResult):
+    __slots__ = ("reachable", "variants", "https_enforced", "final_hosts", "max_redirects", "flags")
+    tool, aspect = "redirect_check_tool", "technical"
+
+    @staticmethod
+    def extract(r):
+        chains = [v for v in r.values() if isinstance(v, dict)]
+        ok = [v for v in chains if (v.get("status") or 500) < 400]
+        finals = {v.get("final_url") or "" for v in ok}
+        flags = {f for v in chains for f in v.get("flags", ())}
+        return {
+            "reachable": len(ok), "variants": len(r),
+            "https_enforced": bool(ok) and all(f.startswith("https://") for f in finals),
+            "final_hosts": len({f.split("/")[2] for f in finals if f.count("/") >= 2}),
+            "max_redirects": max((v.get("redirects") or 0 for v in chains), default=None),
+            "flags": sorted(flags),
+        }
+
+
+class LighthouseResult(ToolResult):
+    __slots__ = ("perf_mobile", "perf_desktop", "seo", "a11y", "best_practices", "lcp_ms", "cls", "tbt_ms")
+    tool, aspect = "lighthouse_tool", "technical"
+
+    @staticmethod
+    def extract(r):
+        m, d = r.get("mobile") or {}, r.get("desktop") or {}
+        values = {
+            "perf_mobile": m.get("performance_score"), "perf_desktop": d.get("performance_score"),
+            "seo": m.get("seo_score"), "a11y": m.get("accessibility_score"),
+            "best_practices": m.get("best_practices_score"), "lcp_ms": m.get("largest_contentful_paint_ms"),
+            "cls": m.get("cumulative_layout_shift"), "tbt_ms": m.get("total_blocking_time_ms"),
+        }
+        if m.get("error") and d.get("error"):
+            values["error"] = str(m["error"])[:200]
+        return values
+
+
+class CrawlabilityResult(ToolResult):
+    __slots__ = ("allowed", "googlebot", "robots_status", "crawl_delay", "home_status")
+    tool, aspect = "crawlability_tool", "technical"
+
+    @staticmethod
+    def extract(r):
+        return {
+            "allowed": r.get("robots_allow_homepage"), "googlebot": r.get("googlebot_allowed"),
+            "robots_status": r.get("robots_status"), "crawl_delay": r.get("crawl_delay"),
+            "home_status": r.get("homepage_status"),
+        }
+
+
+class SchemaResult(ToolResult):
+    __slots__ = ("jsonld", "og", "twitter")
+    tool, aspect = "schema_validation_tool", "content"
+
+    @staticmethod
+    def extract(r):
+        return {"jsonld": r.get("jsonld_blocks"), "og": len(r.get("og_tags") or []), "twitter": len(r.get("twitter_tags") or [])}
+
+
+class KeywordsResult(ToolResult):
+    __slots__ = ("keywords", "phrases", "language")
+    tool, aspect = "keyword_extraction_tool", "content"
+
+    @staticmethod
+    def extract(r):
+        return {"keywords": list(r.get("top_keywords") or [])[:8], "phrases": list(r.get("top_phrases") or [])[:5],
+                "language": r.get("language")}
+
+
+class CompetitorKeywordsResult(ToolResult):
+    __slots__ = ("keywords",)
+    tool, aspect = "gather_competitor_keywords_tool", "content"
+
+    @staticmethod
+    def extract(r):
+        return {"keywords": list(r.get("all_competitor_keywords") or [])[:8]}
+
+
+class LlmKeywordsResult(ToolResult):
+    __slots__ = ("keywords",)
+    tool, aspect = "llm_keywords_from_content_tool", "content"
+
+    @staticmethod
+    def extract(r):
+        return {"keywords": list(r.get("llm_keywords") or [])[:3]}
+
+
+class CompetitorsResult(ToolResult):
+    __slots__ = ("competitors",)
+    tool, aspect = "find_competitors_tool", "competitor"
+
+    @classmethod
+    def parse(cls, result):
+        # find_competitors_tool returns a bare list of domains
+        return super().parse({"competitors": result} if isinstance(result, list) else result)
+
+    @staticmethod
+    def extract(r):
+        return {"competitors": [str(d) for d in r.get("competitors") or ()][:5]}
+
+
+class AccessibilityResult(ToolResult):
+    __slots__ = ("img_no_alt", "has_nav", "has_main")
+    tool, aspect = "accessibility_tool", "ux"
+
+    @staticmethod
+    def extract(r):
+        return {"img_no_alt": r.get("img_no_alt"), "has_nav": r.get("has_nav"), "has_main": r.get("has_main")}
+
+
+class MobileResult(ToolResult):
+    __slots__ = ("viewport", "responsive")
+    tool, aspect = "mobile_friendly_tool", "ux"
+
+    @staticmethod
+    def extract(r):
+        viewport = r.get("viewport_meta")
+        return {"viewport": viewport is not None and viewport != "Missing", "responsive": r.get("has_responsive_styles")}
+
+
+MODELS = {cls.tool: cls for cls in (
+    RobotsResult, SitemapResult, BrokenLinksResult, HeadersResult, RedirectResult, LighthouseResult,
+    CrawlabilityResult, SchemaResult, KeywordsResult, CompetitorKeywordsResult, LlmKeywordsResult, CompetitorsResult,
+    AccessibilityResult, MobileResult,
+)}
+
+
+class DomainAudit:
+    """
+    One domain's audit as compact records. Structured tool output goes into
+    `tools`; anything that is only prose (ReAct agent answers) is kept,
+    trimmed to `note_chars`, in `notes`.
+    """
+    __slots__ = ("domain", "tools", "notes")
+
+    def __init__(self, domain: str, tools: dict = None, notes: dict = None):
+        self.domain = domain
+        self.tools = tools or {}
+        self.notes = notes or {}
+
+    @classmethod
+    def from_aspects(cls, domain: str, aspects: dict, note_chars: int = 1200):
+        """From {aspect: {tool_name: raw result}} (pipeline) or {aspect: response text} (agents)."""
+        audit = cls(domain)
+        for aspect, value in aspects.items():
+            if aspect.startswith("_"):
+                continue
+            if isinstance(value, dict) and "error" not in value:
+                for name, result in value.items():
+                    model = MODELS.get(name)
+                    if model is not None:
+                        audit.tools[name] = model.parse(result)
+            elif isinstance(value, dict):
+                audit.notes[aspect] = f"error: {value['error']}"[:note_chars]
+            else:
+                text = getattr(value, "response", None) or str(value)
+                audit.notes[aspect] = " ".join(text.split())[:note_chars]
+        return audit
+
+    def get(self, tool: str):
+        return self.tools.get(tool)
+
+
+def _cell(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float):
+        return f"{value:.3g}"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(map(str, value)) or "-"
+    return str(value).replace("|", "/")
+
+
+def comparison_tables(audits, aspects=None, tools=None) -> str:
+    """
+    Markdown tables, one per tool, one row per domain, with the record's
+    fields as columns, optionally limited to some aspects or tool names.
+    Tools no domain produced are skipped; agent prose is appended as short
+    per-domain notes.
+    """
+    aspects = set(aspects) if aspects else None
+    sections = []
+    for name, model in MODELS.items():
+        if (aspects and model.aspect not in aspects) or (tools and name not in tools):
+            continue
+        rows = [(a.domain, a.tools[name]) for a in audits if name in a.tools]
+        if not rows:
+            continue
+        fields = [f for f in model.fields() if f != "error" and any(getattr(r, f) is not None for _, r in rows)]
+        has_error = any(r.error for _, r in rows)
+        header = ["domain"] + fields + (["error"] if has_error else [])
+        lines = [f"### {name} ({model.aspect})", "| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+        for domain, r in rows:
+            cells = [domain] + [_cell(getattr(r, f)) for f in fields] + ([_cell(r.error)] if has_error else [])
+            lines.append("| " + " | ".join(cells) + " |")
+        sections.append("\n".join(lines))
+    notes = [
+        f"- {a.domain} / {aspect}: {text}"
+        for a in audits for aspect, text in a.notes.items()
+        if not aspects or aspect in aspects
+    ]
+    if notes:
+        sections.append("### Notes\n" + "\n".join(notes))
+    return "\n\n".join(sections)
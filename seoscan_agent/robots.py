@@ -0,0 +1,226 @@
+import re
+import string
+import threading
+import time
+from urllib.parse import quote, urlparse
+
+from .env import ROBOTS_CACHE_TTL, ROBOTS_RETRY_AFTER, USER_AGENT
+from .http_engine import engine, run
+
+
+def _product_token(agent: str) -> str:
+    """'SeoScanBot/1.0 (+https://...)' -> 'seoscanbot'"""
+    return re.split(r"[/\s]", agent.strip(), 1)[0].lower()
+
+
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+_PRINTABLE = "".join(chr(c) for c in range(33, 127))
+
+
+def _normalize_path(path: str) -> str:
+    """RFC 9309 2.2.2: decode escaped unreserved characters, uppercase other escapes, encode non-ASCII."""
+    def unescape(m):
+        char = chr(int(m.group(1), 16))
+        return char if char in _UNRESERVED else "%" + m.group(1).upper()
+
+    return quote(_ESCAPE.sub(unescape, path), safe=_PRINTABLE)
+
+
+class Rule:
+    __slots__ = ("allow", "pattern", "length", "_prefix", "_regex")
+
+    def __init__(self, allow: bool, pattern: str):
+        pattern = _normalize_path(pattern)
+        self.allow = allow
+        self.pattern = pattern
+        self.length = len(pattern)
+        if "*" in pattern or pattern.endswith("$"):
+            anchored = pattern.endswith("$")
+            body = pattern[:-1] if anchored else pattern
+            regex = ".*".join(re.escape(part) for part in body.split("*"))
+            self._prefix = None
+            self._regex = re.compile(regex + ("$" if anchored else ""))
+        else:
+            self._prefix = pattern
+            self._regex = None
+
+    def matches(self, path: str) -> bool:
+        if self._prefix is not None:
+            return path.startswith(self._prefix)
+        return self._regex.match(path) is not None
+
+
+class Group:
+    __slots__ = ("agents", "rules", "crawl_delay")
+
+    def __init__(self):
+        self.agents = []
+        self.rules = []
+        self.crawl_delay = None
+
+    def compile(self):
+        # Longest pattern wins; on equal length Allow beats Disallow
+        self.rules.sort(key=lambda r: (-r.length, not r.allow))
+
+
+class RobotsRules:
+    """
+    Parsed robots.txt (RFC 9309 semantics): user-agent groups, `*` wildcards,
+    `$` anchors and longest-match precedence. Each rule is compiled once, so
+    checking a URL is a short scan over pre-sorted rules.
+    """
+
+    def __init__(self, groups=None, sitemaps=None, allow_all: bool = False, disallow_all: bool = False,
+                 status: int = None):
+        self.groups = groups or []
+        self.sitemaps = sitemaps or []
+        self.allow_all = allow_all
+        self.disallow_all = disallow_all
+        self.status = status
+        self.fetched_at = time.time()
+        self._by_agent = {}
+
+    @classmethod
+    def parse(cls, text: str, status: int = 200) -> "RobotsRules":
+        groups, sitemaps = [], []
+        current = None
+        in_agents = False
+        for raw in text.splitlines():
+            line = raw.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            field, value = (part.strip() for part in line.split(":", 1))
+            field = field.lower()
+            if field == "user-agent":
+                if current is None or not in_agents:
+                    current = Group()
+                    groups.append(current)
+                current.agents.append("*" if value == "*" else _product_token(value))
+                in_agents = True
+            elif field in ("allow", "disallow"):
+                in_agents = False
+                if current is not None and value:
+                    current.rules.append(Rule(field == "allow", value))
+            elif field == "crawl-delay":
+                in_agents = False
+                if current is not None:
+                    try:
+                        current.crawl_delay = float(value)
+                    except ValueError:
+                        pass
+            elif field == "sitemap":
+                sitemaps.append(value)
+        for g in groups:
+            g.compile()
+        return cls(groups, sitemaps, status=status)
+
+    def group_for(self, agent: str = USER_AGENT):
+        """Merged rules of every group naming our product token (case-insensitive), falling back to `*`."""
+        token = _product_token(agent)
+        if token in self._by_agent:
+            return self._by_agent[token]
+        best, wildcard = [], []
+        for g in self.groups:
+            for a in g.agents:
+                if a == "*":
+                    wildcard.append(g)
+                elif a == token:
+                    best.append(g)
+        chosen = best or wildcard
+        merged = Group()
+        for g in dict.fromkeys(chosen):
+            merged.rules.extend(g.rules)
+            if g.crawl_delay is not None:
+                merged.crawl_delay = g.crawl_delay
+        merged.compile()
+        self._by_agent[token] = merged
+        return merged
+
+    def decide(self, url: str, agent: str = USER_AGENT):
+        """(allowed, matching rule pattern or None) for `url`."""
+        if self.allow_all:
+            return True, None
+        if self.disallow_all:
+            return False, "/"
+        p = urlparse(url)
+        path = _normalize_path((p.path or "/") + ("?" + p.query if p.query else ""))
+        if path == "/robots.txt":
+            return True, None
+        for rule in self.group_for(agent).rules:
+            if rule.matches(path):
+                return rule.allow, ("Allow: " if rule.allow else "Disallow: ") + rule.pattern
+        return True, None
+
+    def is_allowed(self, url: str, agent: str = USER_AGENT) -> bool:
+        return self.decide(url, agent)[0]
+
+    def crawl_delay(self, agent: str = USER_AGENT):
+        return self.group_for(agent).crawl_delay
+
+
+def _origin(url: str) -> str:
+    p = urlparse(url)
+    return f"{p.scheme}://{p.netloc}".lower()
+
+
+class RobotsCache:
+    """
+    robots.txt rules per origin, downloaded and compiled once and reused for
+    `ttl` seconds. Missing files (4xx) allow everything; server errors and
+    unreachable hosts disallow everything, as RFC 9309 asks, but only for
+    `retry_after` seconds so one transient failure does not block a site for
+    the whole ttl.
+    """
+
+    def __init__(self, ttl: int = ROBOTS_CACHE_TTL, timeout: float = 15, retry_after: int = ROBOTS_RETRY_AFTER):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._rules = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, origin: str):
+        rules = self._rules.get(origin)
+        if rules and time.time() - rules.fetched_at < (self.retry_after if rules.disallow_all else self.ttl):
+            return rules
+        return None
+
+    async def get_async(self, url: str) -> RobotsRules:
+        origin = _origin(url)
+        rules = self._fresh(origin)
+        if rules is not None:
+            return rules
+        failed = self._rules.get(origin)
+        # a retry skips the page cache, which may still hold the failed response
+        fetch = engine.get if failed is not None and failed.disallow_all else engine.fetch
+        try:
+            resp = await fetch(origin + "/robots.txt", timeout=self.timeout)
+            if resp.status_code == 200:
+                rules = RobotsRules.parse(resp.text, status=200)
+            elif 400 <= resp.status_code < 500:
+                rules = RobotsRules(allow_all=True, status=resp.status_code)
+            else:
+                rules = RobotsRules(disallow_all=True, status=resp.status_code)
+        except Exception:
+            rules = RobotsRules(disallow_all=True)
+        with self._lock:
+            self._rules[origin] = rules
+        return rules
+
+    def get(self, url: str) -> RobotsRules:
+        rules = self._fresh(_origin(url))
+        return rules if rules is not None else run(self.get_async(url))
+
+    async def is_allowed_async(self, url: str, agent: str = USER_AGENT) -> bool:
+        return (await self.get_async(url)).is_allowed(url, agent)
+
+    def is_allowed(self, url: str, agent: str = USER_AGENT) -> bool:
+        return self.get(url).is_allowed(url, agent)
+
+
+robots_cache = RobotsCache()
+
+
+def is_allowed(url: str, agent: str = USER_AGENT) -> bool:
+    return robots_cache.is_allowed(url, agent)
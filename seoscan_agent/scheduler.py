@@ -0,0 +1,497 @@
+"""
+Recurring audits.
+
+    python -m seoscan_agent.scheduler schedules.json --workers 8
+    python -m seoscan_agent.scheduler schedules.json --once      # run every schedule once, then exit
+
+schedules.json is a list of entries (or {"schedules": [...]}) such as
+
+    {"domain": "example.com", "every": "1d", "priority": 1, "client": "acme", "competitors": true}
+    {"domain": "shop.example", "cron": "0 3 * * 1", "aspects": ["technical"], "report": true}
+
+"every" takes seconds or a duration like "6h"; "cron" a five-field
+expression in local time. Lower priorities run first when several
+schedules are due. A fixed fleet of workers takes the most urgent due
+schedule whose host is not already being audited, so the fleet stays busy
+while no site is audited twice at once.
+
+Every request goes through a global and a per-host request budget. A host
+audited in the last --window seconds is not fetched again: schedules of
+other clients, and competitor reports listing it as a competitor, reuse
+that audit. Hosts whose audits fail are backed off exponentially; their
+schedules wait and other work runs instead.
+"""
+import argparse
+import heapq
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from . import tracing
+from .env import (
+    PSI_ENDPOINT, SCHEDULER_BACKOFF_BASE, SCHEDULER_BACKOFF_MAX, SCHEDULER_GLOBAL_RPM, SCHEDULER_HOST_RPM,
+    SCHEDULER_WINDOW, SCHEDULER_WORKERS, SERPAPI_KEY,
+)
+from .fetch import audit_scope
+from .history import domain_name, get_history, parse_seconds
+from .pipeline import AUDIT_PLAN
+from .ratelimit import RequestBudget, set_request_budget
+
+# API hosts with limits of their own; never counted against the request budget
+BUDGET_EXEMPT = {urlparse(PSI_ENDPOINT).hostname or "", "serpapi.com"}
+
+
+class Cron:
+    """Five-field cron expression (minute hour day-of-month month day-of-week, 0 or 7 = Sunday) in local time."""
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._field(text, lo, hi) for text, (lo, hi) in zip(fields, self.RANGES)
+        )
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        # with both day fields restricted a day matching either runs (standard cron)
+        self.either_day = fields[2] != "*" and fields[4] != "*"
+        self.next_after(time.time())  # fail now on expressions that never match
+
+    @staticmethod
+    def _field(text: str, lo: int, hi: int) -> frozenset:
+        values = set()
+        for part in text.split(","):
+            span, _, step = part.partition("/")
+            if span == "*":
+                a, b = lo, hi
+            elif "-" in span:
+                a, b = (int(x) for x in span.split("-", 1))
+            else:
+                a = int(span)
+                b = hi if step else a
+            step = int(step) if step else 1
+            if not lo <= a <= b <= hi or step < 1:
+                raise ValueError(f"bad cron field {text!r}")
+            values.update(range(a, b + 1, step))
+        return frozenset(values)
+
+    def _day(self, t: datetime) -> bool:
+        dom, dow = t.day in self.days, t.isoweekday() % 7 in self.weekdays
+        return dom or dow if self.either_day else dom and dow
+
+    def next_after(self, ts: float) -> float:
+        t = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=4 * 366)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t.timestamp()
+        raise ValueError(f"cron expression never matches: {self.expr!r}")
+
+
+class Schedule:
+    __slots__ = ("domain", "host", "client", "priority", "every", "cron", "params", "next_run", "last_run",
+                 "runs", "failures", "last_error")
+
+    def __init__(self, domain: str, every=None, cron: str = None, priority: int = 5, client: str = "default",
+                 aspects=None, report: bool = False, incremental: bool = False, competitors: bool = False):
+        if not domain:
+            raise ValueError("schedule without a domain")
+        if every is None and cron is None:
+            raise ValueError(f"schedule for {domain} needs 'every' or 'cron'")
+        unknown = set(aspects or ()) - set(AUDIT_PLAN)
+        if unknown:
+            raise ValueError(f"unknown aspects for {domain}: {', '.join(sorted(unknown))}")
+        self.domain = domain
+        self.host = domain_name(domain)
+        self.client = client
+        self.priority = int(priority)
+        self.every = parse_seconds(every) if every is not None else None
+        self.cron = Cron(cron) if cron else None
+        self.params = {"aspects": list(aspects) if aspects else None, "report": bool(report),
+                       "incremental": bool(incremental), "competitors": bool(competitors)}
+        self.next_run = time.time()
+        self.last_run = None
+        self.runs = 0
+        self.failures = 0
+        self.last_error = None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        known = ("domain", "every", "cron", "priority", "client", "aspects", "report", "incremental", "competitors")
+        extra = set(d) - set(known)
+        if extra:
+            raise ValueError(f"unknown schedule fields: {', '.join(sorted(extra))}")
+        return cls(**d)
+
+    @property
+    def kind(self) -> str:
+        return "report" if self.params["competitors"] else "audit"
+
+    def following(self, after: float) -> float:
+        return self.cron.next_after(after) if self.cron else after + self.every
+
+    def to_dict(self) -> dict:
+        return {"domain": self.domain, "client": self.client, "priority": self.priority, "kind": self.kind,
+                "next_run": self.next_run, "last_run": self.last_run, "runs": self.runs, "failures": self.failures,
+                "last_error": self.last_error}
+
+
+def load_schedules(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("schedules", []) if isinstance(data, dict) else data
+    return [Schedule.from_dict(e) for e in entries]
+
+
+class HostBackoff:
+    """Exponential, jittered pause per host after failed audits; a success clears it."""
+
+    def __init__(self, base: float = SCHEDULER_BACKOFF_BASE, maximum: float = SCHEDULER_BACKOFF_MAX):
+        self.base = base
+        self.maximum = maximum
+        self._hosts = {}  # host -> (consecutive failures, paused until)
+        self._lock = threading.Lock()
+
+    def until(self, host: str) -> float:
+        entry = self._hosts.get(host)
+        return entry[1] if entry and entry[1] > time.time() else 0.0
+
+    def failure(self, host: str) -> float:
+        with self._lock:
+            streak = self._hosts.get(host, (0, 0.0))[0] + 1
+            delay = min(self.maximum, self.base * 2 ** (streak - 1)) * random.uniform(0.9, 1.1)
+            self._hosts[host] = (streak, time.time() + delay)
+            return delay
+
+    def success(self, host: str):
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def paused(self) -> dict:
+        now = time.time()
+        return {h: round(until - now) for h, (_, until) in self._hosts.items() if until > now}
+
+
+def _failed(aspects) -> bool:
+    """
+    True when at least half of a domain's tool results are errors: the site
+    itself is down or refusing us (third-party tools such as PageSpeed still
+    answer for a dead site, so requiring every tool to fail is too strict).
+    """
+    if not isinstance(aspects, dict) or not aspects:
+        return True
+    outputs = []
+    for aspect, value in aspects.items():
+        if aspect.startswith("_"):
+            continue
+        if isinstance(value, dict) and "error" not in value:
+            outputs.extend(value.values())
+        else:
+            outputs.append(value)
+    errors = sum(1 for r in outputs if isinstance(r, dict) and "error" in r)
+    return errors * 2 >= len(outputs)
+
+
+class AuditWindow:
+    """
+    Each host's latest audit results, reused for `window` seconds by every
+    schedule and competitor report that asks for the same aspects. Concurrent
+    requests for one host share a single audit; hosts in backoff are not
+    fetched and get an error result instead.
+    """
+
+    def __init__(self, window: float = SCHEDULER_WINDOW, backoff: HostBackoff = None):
+        self.window = window
+        self.backoff = backoff or HostBackoff()
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # host -> (audited at, {aspect: result})
+        self._inflight = {}  # host -> Event set when its audit is stored
+        self._lock = threading.Lock()
+
+    def fresh(self, host: str, aspects):
+        entry = self._entries.get(host)
+        if entry and time.time() - entry[0] < self.window and set(aspects) <= set(entry[1]):
+            return {a: entry[1][a] for a in aspects}
+        return None
+
+    def store(self, host: str, results: dict):
+        with self._lock:
+            self._entries[host] = (time.time(), {a: r for a, r in results.items() if not a.startswith("_")})
+            if len(self._entries) > 50000:
+                cutoff = time.time() - self.window
+                self._entries = {h: e for h, e in self._entries.items() if e[0] >= cutoff}
+
+    def claim(self, hosts) -> tuple:
+        """Split hosts into (fresh results, hosts this caller must audit, events of audits running elsewhere)."""
+        found, mine, others = {}, [], {}
+        with self._lock:
+            for host, aspects in hosts.items():
+                hit = self.fresh(host, aspects)
+                if hit is not None:
+                    found[host] = hit
+                    self.hits += 1
+                elif host in self._inflight:
+                    others[host] = self._inflight[host]
+                else:
+                    self._inflight[host] = threading.Event()
+                    mine.append(host)
+                    self.misses += 1
+        return found, mine, others
+
+    def release(self, hosts):
+        with self._lock:
+            for host in hosts:
+                event = self._inflight.pop(host, None)
+                if event is not None:
+                    event.set()
+
+    def outcome(self, host: str, results) -> bool:
+        """Store a fresh audit, or back its host off when it failed; returns whether it failed."""
+        if _failed(results):
+            self.backoff.failure(host)
+            return True
+        self.backoff.success(host)
+        self.store(host, results)
+        return False
+
+    def run(self, domains, aspects: dict) -> dict:
+        """run_domain_audits() that skips hosts audited within the window (see smart_competitor_analysis)."""
+        from .agents import record_audits, run_domain_audits
+
+        by_host = {domain_name(d): d for d in domains}
+        found, mine, others = self.claim({h: list(aspects) for h in by_host})
+        results = {by_host[h]: r for h, r in found.items()}
+        try:
+            paused = [h for h in mine if self.backoff.until(h)]
+            for h in paused:
+                results[by_host[h]] = {a: {"error": "host backing off after failed audits"} for a in aspects}
+            todo = [by_host[h] for h in mine if h not in paused]
+            if todo:
+                raw = run_domain_audits(todo, aspects)
+                record_audits(raw)
+                for d in todo:
+                    self.outcome(domain_name(d), raw[d])
+                results.update(raw)
+        finally:
+            self.release(mine)
+        for host, event in others.items():
+            event.wait()
+            hit = self.fresh(host, aspects)
+            if hit is None:
+                # that audit failed (and its host is backing off) or covered fewer aspects
+                hit = {a: {"error": "audit failed; host backing off"} for a in aspects} if self.backoff.until(host) \
+                    else run_domain_audits([by_host[host]], aspects)[by_host[host]]
+            else:
+                self.hits += 1
+            results[by_host[host]] = hit
+        return results
+
+
+class Scheduler:
+    """Due schedules in a priority queue, run by a fixed pool of worker threads."""
+
+    def __init__(self, schedules, workers: int = SCHEDULER_WORKERS, window: float = SCHEDULER_WINDOW,
+                 global_rpm: float = SCHEDULER_GLOBAL_RPM, host_rpm: float = SCHEDULER_HOST_RPM,
+                 once: bool = False, log=sys.stderr):
+        self.schedules = list(schedules)
+        self.workers = max(1, workers)
+        self.once = once
+        self.log = log
+        self.backoff = HostBackoff()
+        self.window = AuditWindow(window, self.backoff)
+        self.budget = RequestBudget(global_rpm, host_rpm, exempt=BUDGET_EXEMPT)
+        self.running_hosts = set()
+        self.completed = 0
+        self.failed = 0
+        self._waiting = []  # (next_run, seq, schedule)
+        self._ready = []  # (priority, next_run, seq, schedule)
+        self._seq = 0
+        self._pending = len(self.schedules)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _push(self, s: Schedule):
+        self._seq += 1
+        heapq.heappush(self._waiting, (s.next_run, self._seq, s))
+        self._cond.notify_all()
+
+    def _resume_times(self):
+        """Start each schedule one interval after its last recorded run instead of re-auditing everything."""
+        history = get_history()
+        now = time.time()
+        for s in self.schedules:
+            last = None
+            if history is not None:
+                runs = history.runs(s.domain, kind=s.kind, limit=1)
+                last = runs[0]["started"] if runs else None
+            s.last_run = last
+            s.next_run = now if last is None or self.once else max(now, s.following(last))
+
+    def _take(self):
+        """Most urgent due schedule whose host is free and not backing off; blocks until there is one."""
+        with self._cond:
+            while not self._stop.is_set():
+                now = time.time()
+                while self._waiting and self._waiting[0][0] <= now:
+                    _, seq, s = heapq.heappop(self._waiting)
+                    heapq.heappush(self._ready, (s.priority, s.next_run, seq, s))
+                skipped, chosen = [], None
+                while self._ready:
+                    item = heapq.heappop(self._ready)
+                    s = item[3]
+                    paused = not self.once and self.backoff.until(s.host)
+                    if paused:
+                        s.next_run = paused
+                        self._push(s)
+                    elif s.host in self.running_hosts:
+                        skipped.append(item)
+                    else:
+                        chosen = s
+                        break
+                for item in skipped:
+                    heapq.heappush(self._ready, item)
+                if chosen is not None:
+                    self.running_hosts.add(chosen.host)
+                    return chosen
+                if self.once and not self._pending:
+                    return None
+                wake = self._waiting[0][0] - now if self._waiting else None
+                self._cond.wait(min(wake, 60) if wake is not None else 60)
+            return None
+
+    def _finish(self, s: Schedule, error: str = None):
+        with self._cond:
+            self.running_hosts.discard(s.host)
+            s.runs += 1
+            s.last_run = time.time()
+            s.last_error = error
+            self.completed += 1
+            if error:
+                s.failures += 1
+                self.failed += 1
+            if self.once:
+                self._pending -= 1
+            else:
+                s.next_run = s.following(s.last_run)
+                self._push(s)
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            s = self._take()
+            if s is None:
+                return
+            started = time.time()
+            error = None
+            try:
+                error = self.run_schedule(s)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            self._finish(s, error)
+            status = f"failed: {error}" if error else "done"
+            upcoming = "" if self.once else f", next {time.strftime('%Y-%m-%d %H:%M', time.localtime(s.next_run))}"
+            print(f"[scheduler] {s.kind} {s.domain} ({s.client}) {status} in {time.time() - started:.1f}s{upcoming}",
+                  file=self.log, flush=True)
+
+    def run_schedule(self, s: Schedule):
+        """Run one schedule; returns an error message or None."""
+        p = s.params
+        if p["competitors"]:
+            from .agents import smart_competitor_analysis
+
+            with tracing.audit_trace(s.domain), audit_scope():
+                smart_competitor_analysis(s.domain, SERPAPI_KEY, on_section=lambda section, text: None,
+                                          audit=self.window.run)
+            return None
+        from .batch import audit_domain
+
+        if self.backoff.until(s.host):
+            return "host backing off after failed audits"
+        aspects = p["aspects"] or list(AUDIT_PLAN)
+        found, mine, others = self.window.claim({s.host: aspects})
+        if found:
+            return None  # audited for another schedule within the window
+        try:
+            if others:
+                # only one schedule per host runs at a time, so this is a competitor report's audit
+                others[s.host].wait()
+                if self.window.fresh(s.host, aspects) is not None:
+                    return None
+            record = audit_domain(s.domain, aspects, report=p["report"], incremental=p["incremental"])
+            failed = self.window.outcome(s.host, record.get("results") if "error" not in record else None)
+            return record.get("error") or ("most tools failed" if failed else None)
+        finally:
+            self.window.release(mine)
+
+    def start(self):
+        set_request_budget(self.budget)
+        self._resume_times()
+        with self._cond:
+            for s in self.schedules:
+                self._push(s)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"seoscan-sched-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def join(self, timeout: float = None):
+        for t in self._threads:
+            t.join(timeout)
+        set_request_budget(None)
+
+    def stats(self) -> dict:
+        with self._cond:
+            due = len(self._ready) + sum(1 for t, _, _ in self._waiting if t <= time.time())
+        return {
+            "schedules": len(self.schedules), "workers": self.workers, "running": len(self.running_hosts),
+            "due": due, "completed": self.completed, "failed": self.failed,
+            "reused_audits": self.window.hits, "fresh_audits": self.window.misses,
+            "backing_off": self.backoff.paused(), "requests": self.budget.stats(),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m seoscan_agent.scheduler", description="Run recurring audits.")
+    parser.add_argument("schedules", help="JSON file of schedules")
+    parser.add_argument("-w", "--workers", type=int, default=SCHEDULER_WORKERS)
+    parser.add_argument("--window", default=SCHEDULER_WINDOW, help="seconds (or e.g. 12h) a host's audit is reused")
+    parser.add_argument("--global-rpm", type=float, default=SCHEDULER_GLOBAL_RPM, help="requests/minute, all hosts")
+    parser.add_argument("--host-rpm", type=float, default=SCHEDULER_HOST_RPM, help="requests/minute per host")
+    parser.add_argument("--once", action="store_true", help="run every schedule once now, then exit")
+    args = parser.parse_args(argv)
+
+    scheduler = Scheduler(load_schedules(args.schedules), workers=args.workers, window=parse_seconds(args.window),
+                          global_rpm=args.global_rpm, host_rpm=args.host_rpm, once=args.once)
+    scheduler.start()
+    try:
+        while any(t.is_alive() for t in scheduler._threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        scheduler.stop()
+    scheduler.join(5)
+    print(json.dumps(scheduler.stats(), indent=1), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import Future
+
+import requests
+
+from .env import (
+    SERP_BACKEND, SERP_CACHE_PATH, SERP_CACHE_TTL, SERP_LOCAL_FIXTURES,
+    SERP_QUOTA, SERP_QUOTA_PERIOD, SERPAPI_KEY,
+)
+from .ratelimit import RateLimiter
+from .store import SqliteCache
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+
+def normalize_query(query: str) -> str:
+    """Queries that differ only in case, quotes or spacing share a key ("c++" and "c#" stay distinct)."""
+    q = re.sub(r"[\"'`“”‘’]", "", query.lower())
+    return " ".join(q.split())
+
+
+def serpapi_backend(query: str, num: int, api_key: str = None) -> list:
+    params = {"engine": "google", "q": query, "api_key": api_key or SERPAPI_KEY, "num": num}
+    r = requests.get(SERPAPI_URL, params=params, timeout=20)
+    r.raise_for_status()
+    return r.json().get("organic_results", [])
+
+
+def local_backend(query: str, num: int, api_key: str = None) -> list:
+    """
+    Offline stand-in. Serves results from the SEOSCAN_SERP_FIXTURES JSON file
+    ({normalized query: [urls]}) when it has the query, otherwise synthesizes
+    stable fake domains from the query words.
+    """
+    norm = normalize_query(query)
+    if SERP_LOCAL_FIXTURES:
+        with open(SERP_LOCAL_FIXTURES, "r", encoding="utf-8") as f:
+            fixtures = {normalize_query(k): v for k, v in json.load(f).items()}
+        if norm in fixtures:
+            return [{"position": i + 1, "link": url} for i, url in enumerate(fixtures[norm][:num])]
+    words = [w for w in norm.split() if len(w) > 2] or ["site"]
+    seed = hashlib.sha1(norm.encode("utf-8")).hexdigest()
+    return [
+        {"position": i + 1, "link": f"https://www.{words[i % len(words)]}-{seed[i:i + 4]}.example/"}
+        for i in range(num)
+    ]
+
+
+BACKENDS = {"serpapi": serpapi_backend, "local": local_backend}
+
+
+class SerpScheduler:
+    """
+    Front door for every Google search. Results are cached per normalized
+    query, concurrent identical searches wait on the same request, and real
+    calls are paced by a token bucket sized to the configured quota.
+    """
+
+    def __init__(self, backend: str = SERP_BACKEND, cache: SqliteCache = None,
+                 quota: float = SERP_QUOTA, period: float = SERP_QUOTA_PERIOD):
+        self.backend_name = backend
+        self.backend = BACKENDS[backend]
+        self.cache = cache
+        self.limiter = RateLimiter(quota, period)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hits = 0
+
+    def _key(self, query: str, num: int) -> str:
+        return f"{self.backend_name}:{num}:{normalize_query(query)}"
+
+    def search(self, query: str, num: int = 10, api_key: str = None, use_cache: bool = True) -> list:
+        """Organic results (SerpAPI format) for `query`."""
+        key = self._key(query, num)
+        if use_cache and self.cache is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                self.hits += 1
+                return hit
+        with self._lock:
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+        if not owner:
+            self.hits += 1
+            return fut.result()
+        try:
+            self.limiter.acquire()
+            self.calls += 1
+            results = self.backend(query, num, api_key)
+            if self.cache is not None:
+                self.cache.set(key, results)
+            fut.set_result(results)
+            return results
+        except Exception as e:
+            # failures are not cached; waiters get the same error and the caller decides how to degrade
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SerpScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            cache = SqliteCache(SERP_CACHE_PATH, ttl=SERP_CACHE_TTL) if SERP_CACHE_PATH else None
+            _scheduler = SerpScheduler(cache=cache)
+    return _scheduler
+
+
+def search(query: str, num: int = 10, api_key: str = None, use_cache: bool = True) -> list:
+    return get_scheduler().search(query, num=num, api_key=api_key, use_cache=use_cache)
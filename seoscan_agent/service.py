@@ -0,0 +1,521 @@
+"""
+Local audit job service.
+
+    python -m seoscan_agent.service --port 8765 --workers 4
+
+    POST   /jobs               {"domain": "example.com", "aspects": ["technical"], "report": false,
+                                "incremental": false, "competitors": false, "client": "dashboard"}
+    GET    /jobs               ?status=running&client=dashboard&limit=50
+    GET    /jobs/<id>          the job, its result once finished, and progress events (?after=N skips N)
+    GET    /jobs/<id>/events   progress as server-sent events until the job ends (?after=N)
+    DELETE /jobs/<id>          cancel
+    GET    /health
+
+Jobs wait in one queue per client and the workers take from the clients in
+turn, so a client submitting hundreds of audits does not starve the others.
+Each job runs the structured audit (audit_domain) or, with "competitors",
+the full competitor report. Jobs, their final progress and results are kept
+in SQLite; jobs queued or running when the service stopped are queued again
+on the next start. Cancelling a queued job removes it at once; a running
+audit stops after the tool that is finishing, a competitor report before or
+after its domain audits or after the report section that is finishing.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import tracing
+from .batch import audit_domain
+from .env import (
+    AUDIT_MODE, SERPAPI_KEY, SERVICE_DB_PATH, SERVICE_HOST, SERVICE_MAX_QUEUED, SERVICE_PORT, SERVICE_WORKERS,
+)
+from .fetch import audit_scope
+from .pipeline import AUDIT_PLAN
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class Job:
+    __slots__ = ("id", "client", "domain", "params", "status", "created_at", "started_at", "finished_at",
+                 "result", "error", "events", "cancel_requested", "_cond")
+
+    def __init__(self, domain: str, client: str = "default", params: dict = None, job_id: str = None,
+                 created_at: float = None):
+        self.id = job_id or os.urandom(8).hex()
+        self.client = client
+        self.domain = domain
+        self.params = params or {}
+        self.status = "queued"
+        self.created_at = created_at or time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self.cancel_requested = False
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def emit(self, event: str, **data):
+        with self._cond:
+            self.events.append({"seq": len(self.events) + 1, "t": round(time.time(), 3), "event": event, **data})
+            self._cond.notify_all()
+
+    def finish(self, status: str, result=None, error: str = None):
+        self.result, self.error = result, error
+        self.finished_at = time.time()
+        self.status = status
+        self.emit(status, **({"error": error} if error else {}))
+
+    def wait_events(self, after: int, timeout: float) -> list:
+        """Events after the first `after`, waiting up to `timeout` for one unless the job has finished."""
+        with self._cond:
+            if len(self.events) <= after and not self.finished:
+                self._cond.wait(timeout)
+            return self.events[after:]
+
+    def check(self):
+        if self.cancel_requested:
+            raise JobCancelled(f"job {self.id} cancelled")
+
+    def to_dict(self, events_after: int = None, result: bool = True) -> dict:
+        d = {
+            "id": self.id, "client": self.client, "domain": self.domain, "params": self.params,
+            "status": self.status, "created_at": self.created_at, "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error:
+            d["error"] = self.error
+        if result and self.result is not None:
+            d["result"] = self.result
+        if events_after is not None:
+            d["events"] = self.events[events_after:]
+        return d
+
+    @classmethod
+    def from_row(cls, row):
+        job_id, client, domain, params, status, created, started, finished, events, result, error = row
+        job = cls(domain, client, json.loads(params), job_id, created)
+        job.status, job.started_at, job.finished_at, job.error = status, started, finished, error
+        job.events = json.loads(events) if events else []
+        job.result = json.loads(result) if result else None
+        return job
+
+
+class FairQueue:
+    """One FIFO per client; get() takes from the clients round-robin."""
+
+    def __init__(self):
+        self._queues = OrderedDict()
+        self._cond = threading.Condition()
+        self._size = 0
+
+    def put(self, job: Job):
+        with self._cond:
+            self._queues.setdefault(job.client, deque()).append(job)
+            self._size += 1
+            self._cond.notify()
+
+    def get(self, timeout: float = None):
+        """Next job, or None after `timeout` seconds with nothing queued."""
+        with self._cond:
+            if not self._size and not self._cond.wait_for(lambda: self._size, timeout):
+                return None
+            client, jobs = next(iter(self._queues.items()))
+            job = jobs.popleft()
+            self._size -= 1
+            if jobs:
+                self._queues.move_to_end(client)
+            else:
+                del self._queues[client]
+            return job
+
+    def remove(self, job: Job) -> bool:
+        with self._cond:
+            jobs = self._queues.get(job.client)
+            if not jobs or job not in jobs:
+                return False
+            jobs.remove(job)
+            self._size -= 1
+            if not jobs:
+                del self._queues[job.client]
+            return True
+
+    def depth(self) -> dict:
+        with self._cond:
+            return {client: len(jobs) for client, jobs in self._queues.items()}
+
+    def __len__(self):
+        return self._size
+
+
+class JobStore:
+    """Jobs with their final events and results in one SQLite file."""
+
+    COLUMNS = "id, client, domain, params, status, created, started, finished, events, result, error"
+
+    def __init__(self, path: str):
+        self.path = path or ":memory:"
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, client TEXT NOT NULL, domain TEXT NOT NULL, params TEXT NOT NULL,"
+            " status TEXT NOT NULL, created REAL NOT NULL, started REAL, finished REAL,"
+            " events TEXT, result TEXT, error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_client ON jobs(client, created)")
+
+    def save(self, job: Job):
+        result = json.dumps(job.result, separators=(",", ":"), default=str) if job.result is not None else None
+        row = (job.id, job.client, job.domain, json.dumps(job.params), job.status, job.created_at, job.started_at,
+               job.finished_at, json.dumps(job.events, default=str), result, job.error)
+        with self._lock:
+            self._db.execute(f"INSERT OR REPLACE INTO jobs ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._db.execute(f"SELECT {self.COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def list(self, status: str = None, client: str = None, limit: int = 50) -> list:
+        where, args = [], []
+        if status:
+            where.append("status = ?")
+            args.append(status)
+        if client:
+            where.append("client = ?")
+            args.append(client)
+        sql = (f"SELECT {self.COLUMNS.replace('events, result', 'NULL, NULL')} FROM jobs"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY created DESC LIMIT ?")
+        with self._lock:
+            rows = self._db.execute(sql, (*args, limit)).fetchall()
+        return [Job.from_row(r) for r in rows]
+
+    def unfinished(self) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE status IN ('queued', 'running') ORDER BY created"
+            ).fetchall()
+        return [Job.from_row(r) for r in rows]
+
+
+class AuditService:
+    """Job queue, worker threads and the jobs they are running."""
+
+    def __init__(self, workers: int = SERVICE_WORKERS, store: JobStore = None, max_queued: int = SERVICE_MAX_QUEUED):
+        self.workers = max(1, workers)
+        self.store = store if store is not None else JobStore(SERVICE_DB_PATH)
+        self.max_queued = max_queued
+        self.queue = FairQueue()
+        self.live = {}
+        self.busy = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for job in self.store.unfinished():
+            job.status = "queued"
+            job.started_at = None
+            job.emit("requeued")
+            self._enqueue(job)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"seoscan-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _enqueue(self, job: Job):
+        with self._lock:
+            self.live[job.id] = job
+        self.store.save(job)
+        self.queue.put(job)
+
+    def submit(self, domain: str, client: str = "default", aspects=None, report: bool = False,
+               incremental: bool = False, competitors: bool = False) -> Job:
+        if domain is not None and not isinstance(domain, str):
+            raise ValueError("domain must be a string")
+        domain = (domain or "").strip()
+        if not domain:
+            raise ValueError("domain is required")
+        if client is not None and not isinstance(client, str):
+            raise ValueError("client must be a string")
+        if aspects is not None and (
+            not isinstance(aspects, (list, tuple)) or not all(isinstance(a, str) for a in aspects)
+        ):
+            raise ValueError("aspects must be a list of aspect names")
+        for name, flag in (("report", report), ("incremental", incremental), ("competitors", competitors)):
+            if flag is not None and not isinstance(flag, bool):
+                raise ValueError(f"{name} must be true or false")
+        unknown = set(aspects or ()) - set(AUDIT_PLAN)
+        if unknown:
+            raise ValueError(f"unknown aspects: {', '.join(sorted(unknown))} (expected {', '.join(AUDIT_PLAN)})")
+        if len(self.queue) >= self.max_queued:
+            raise ServiceBusy(f"{len(self.queue)} jobs already queued")
+        params = {"aspects": list(aspects) if aspects else None, "report": bool(report),
+                  "incremental": bool(incremental), "competitors": bool(competitors)}
+        job = Job(domain, client or "default", params)
+        job.emit("queued")
+        self._enqueue(job)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            job = self.live.get(job_id)
+        return job if job is not None else self.store.get(job_id)
+
+    def list(self, status: str = None, client: str = None, limit: int = 50) -> list:
+        return self.store.list(status, client, limit)
+
+    def cancel(self, job_id: str):
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested = True
+        if self.queue.remove(job):
+            self._done(job, "cancelled")
+        else:
+            job.emit("cancelling")
+        return job
+
+    def health(self) -> dict:
+        return {"workers": self.workers, "busy": self.busy, "queued": len(self.queue),
+                "queued_by_client": self.queue.depth()}
+
+    def _done(self, job: Job, status: str, result=None, error: str = None):
+        job.finish(status, result, error)
+        self.store.save(job)
+        with self._lock:
+            self.live.pop(job.id, None)
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.queue.get(timeout=0.5)
+            if job is None:
+                continue
+            with self._lock:
+                self.busy += 1
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self.busy -= 1
+
+    def _run(self, job: Job):
+        if job.cancel_requested:
+            self._done(job, "cancelled")
+            return
+        job.status, job.started_at = "running", time.time()
+        job.emit("started")
+        self.store.save(job)
+        try:
+            if job.params.get("competitors"):
+                result, error = self._competitor_report(job), None
+            else:
+                result = self._audit(job)
+                failed = "error" in result and not result.get("results")
+                error = result["error"] if failed else None
+            if job.cancel_requested:
+                self._done(job, "cancelled")
+            else:
+                self._done(job, "failed" if error else "done", result, error)
+        except JobCancelled:
+            self._done(job, "cancelled")
+        except Exception as e:
+            self._done(job, "failed", error=str(e) or type(e).__name__)
+
+    def _audit(self, job: Job) -> dict:
+        def on_tool(aspect, tool, result, seconds):
+            ok = not (isinstance(result, dict) and result.get("error"))
+            job.emit("tool", aspect=aspect, tool=tool, seconds=seconds, ok=ok)
+            job.check()
+
+        p = job.params
+        return audit_domain(job.domain, p.get("aspects"), report=p.get("report"), incremental=p.get("incremental"),
+                            on_tool=on_tool)
+
+    def _competitor_report(self, job: Job) -> dict:
+        from .agents import record_audits, run_domain_audits, smart_competitor_analysis
+
+        def audit(domains, aspects):
+            # the domain audits are the longest step; don't start them, or the report, once cancelled
+            job.check()
+            job.emit("auditing", domains=domains)
+            raw = run_domain_audits(domains, aspects)
+            record_audits(raw, kind="audit" if AUDIT_MODE == "pipeline" else "agent")
+            job.check()
+            return raw
+
+        def on_section(section, text):
+            job.emit("section", title=section.title, chars=len(text))
+            job.check()
+
+        with tracing.audit_trace(job.domain), audit_scope():
+            report = smart_competitor_analysis(job.domain, SERPAPI_KEY, on_section=on_section, audit=audit)
+        return {"domain": job.domain, "report": report}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service = None
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _json(self, status: int, body):
+        data = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        return parts, query
+
+    def _job(self, job_id: str):
+        job = self.service.get(job_id)
+        if job is None:
+            self._json(404, {"error": f"no job {job_id}"})
+        return job
+
+    def do_GET(self):
+        parts, query = self._route()
+        try:
+            after = int(query.get("after", 0))
+            limit = int(query.get("limit", 50))
+        except ValueError:
+            return self._json(400, {"error": "after and limit must be integers"})
+        if parts == ["health"]:
+            return self._json(200, self.service.health())
+        if parts == ["jobs"]:
+            jobs = self.service.list(query.get("status"), query.get("client"), limit)
+            return self._json(200, {"jobs": [j.to_dict(result=False) for j in jobs]})
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self._job(parts[1])
+            if job is not None:
+                self._json(200, job.to_dict(events_after=after))
+            return
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            job = self._job(parts[1])
+            if job is not None:
+                self._stream(job, after)
+            return
+        self._json(404, {"error": "not found"})
+
+    def _stream(self, job: Job, after: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                events = job.wait_events(after, timeout=15)
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                for event in events:
+                    self.wfile.write(f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n".encode())
+                after += len(events)
+                self.wfile.flush()
+                if job.finished and after >= len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            return self._json(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("expected a JSON object")
+            aspects = body.get("aspects")
+            if isinstance(aspects, str):
+                aspects = [a.strip() for a in aspects.split(",") if a.strip()]
+            job = self.service.submit(
+                body.get("domain"), client=body.get("client") or self.headers.get("X-Client") or self.client_address[0],
+                aspects=aspects, report=body.get("report", False), incremental=body.get("incremental", False),
+                competitors=body.get("competitors", False),
+            )
+        except ServiceBusy as e:
+            return self._json(429, {"error": str(e)})
+        except ValueError as e:
+            return self._json(400, {"error": str(e)})
+        self._json(202, job.to_dict(result=False))
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._json(404, {"error": "not found"})
+        job = self.service.cancel(parts[1])
+        if job is None:
+            return self._json(404, {"error": f"no job {parts[1]}"})
+        self._json(200, job.to_dict(result=False))
+
+
+def make_server(service: AuditService, host: str = SERVICE_HOST, port: int = SERVICE_PORT, quiet: bool = True):
+    handler = type("Handler", (_Handler,), {"service": service, "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m seoscan_agent.service", description="Run audits as HTTP jobs.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=SERVICE_WORKERS, help="jobs run at once")
+    parser.add_argument("--db", default=SERVICE_DB_PATH, help="SQLite file for jobs and results")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    service = AuditService(workers=args.workers, store=JobStore(args.db))
+    service.start()
+    server = make_server(service, args.host, args.port, quiet=not args.verbose)
+    print(f"seoscan service on http://{args.host}:{server.server_port} ({service.workers} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
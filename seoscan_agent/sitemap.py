@@ -0,0 +1,272 @@
+import queue
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from . import tracing
+from .env import USER_AGENT
+from .fetch import session
+from .utils import normalize_url
+
+DEFAULT_SITEMAPS = ("/sitemap.xml", "/sitemap_index.xml")
+MAX_LOC_LENGTH = 2048
+SITEMAP_NAMESPACES = {"http://www.sitemaps.org/schemas/sitemap/0.9", "https://www.sitemaps.org/schemas/sitemap/0.9"}
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """Raised from the parse callbacks once the consumer of iter_sitemaps has gone away."""
+
+
+class SitemapEntry:
+    __slots__ = ("loc", "lastmod", "source")
+
+    def __init__(self, loc, lastmod, source):
+        self.loc = loc
+        self.lastmod = lastmod
+        self.source = source
+
+
+class SitemapStats:
+    """Running totals kept in constant memory while URLs stream past."""
+
+    def __init__(self, sample_size: int = 5, max_errors: int = 20):
+        self.files = 0
+        self.index_files = 0
+        self.urls = 0
+        self.invalid = 0
+        self.lastmod_missing = 0
+        self.lastmod_by_month = {}
+        self.sample = []
+        self.errors = []
+        self.sample_size = sample_size
+        self.max_errors = max_errors
+
+    def add(self, entry: SitemapEntry):
+        self.urls += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(entry.loc)
+        month = entry.lastmod[:7] if entry.lastmod else None
+        if month is None:
+            self.lastmod_missing += 1
+        elif len(month) == 7 and month[4] == "-" and month[:4].isdigit():
+            self.lastmod_by_month[month] = self.lastmod_by_month.get(month, 0) + 1
+        else:
+            self.invalid += 1
+
+    def error(self, url: str, message: str):
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"sitemap": url, "error": message})
+
+    def to_dict(self) -> dict:
+        months = sorted(self.lastmod_by_month.items(), reverse=True)
+        return {
+            "files": self.files,
+            "index_files": self.index_files,
+            "num_urls": self.urls,
+            "invalid_entries": self.invalid,
+            "lastmod_missing": self.lastmod_missing,
+            "lastmod_by_month": dict(months[:12]),
+            "sample_urls": self.sample,
+            "errors": self.errors,
+        }
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _sitemap_tag(tag: str) -> str:
+    """Local name of a tag in the sitemap namespace (or no namespace); "" for extension tags like image:loc."""
+    if tag.startswith("{"):
+        ns, _, name = tag[1:].partition("}")
+        return name if ns in SITEMAP_NAMESPACES else ""
+    return tag
+
+
+def _iter_chunks(url: str, timeout: float, chunk_size: int = 64 * 1024):
+    """Raw XML bytes of a sitemap, gunzipping .xml.gz files on the fly."""
+    resp = session.get(url, stream=True, timeout=timeout, headers={"User-Agent": USER_AGENT})
+    try:
+        if resp.status_code != 200:
+            raise ValueError(f"HTTP {resp.status_code}")
+        inflate = None
+        for chunk in resp.iter_content(chunk_size):
+            if inflate is None:
+                # .xml.gz served without Content-Encoding still arrives compressed
+                inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == b"\x1f\x8b" else False
+            yield inflate.decompress(chunk) if inflate else chunk
+    finally:
+        resp.close()
+
+
+def parse_sitemap(url: str, on_url, on_child, timeout: float = 30) -> bool:
+    """
+    Stream one sitemap file through an incremental XML parser, calling
+    on_url(loc, lastmod) for <url> entries and on_child(loc) for <sitemap>
+    entries of an index. Parsed elements are discarded as we go so file size
+    does not matter. Returns True if the file was a sitemap index. An
+    exception from a callback aborts the download.
+    """
+    chunks = _iter_chunks(url, timeout)
+    try:
+        return parse_sitemap_chunks(chunks, on_url, on_child)
+    finally:
+        chunks.close()
+
+
+def parse_sitemap_chunks(chunks, on_url, on_child) -> bool:
+    """
+    parse_sitemap() over raw XML bytes. Only <loc>/<lastmod> directly under
+    <url> or <sitemap> count, so extension tags such as <image:loc> nested
+    deeper never replace the page URL.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    is_index = False
+    depth = 0
+    loc = lastmod = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                depth += 1
+                if root is None:
+                    root = elem
+                    is_index = _local(root.tag) == "sitemapindex"
+                continue
+            depth -= 1
+            tag = _sitemap_tag(elem.tag)
+            if depth == 2 and tag == "loc":
+                loc = (elem.text or "").strip()
+            elif depth == 2 and tag == "lastmod":
+                lastmod = (elem.text or "").strip()
+            elif depth == 1 and tag in ("url", "sitemap"):
+                if tag == "sitemap":
+                    on_child(loc)
+                else:
+                    on_url(loc, lastmod)
+                loc = lastmod = None
+                root.clear()
+    parser.close()
+    return is_index
+
+
+def _valid_loc(loc) -> bool:
+    return bool(loc) and loc.startswith(("http://", "https://")) and len(loc) <= MAX_LOC_LENGTH
+
+
+def iter_sitemaps(roots, stats: SitemapStats = None, workers: int = 8, max_files: int = 1000,
+                  timeout: float = 30, buffer: int = 10000):
+    """
+    Yield SitemapEntry objects from the given sitemap URLs, following index
+    files concurrently. Only `buffer` entries are held in memory at once;
+    stopping iteration early skips queued files and aborts the downloads in
+    progress at their next entry.
+    """
+    stats = stats if stats is not None else SitemapStats()
+    out = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+    lock = threading.Lock()
+    seen_files = set()
+    pending = [0]
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def submit(url):
+        with lock:
+            if url in seen_files or len(seen_files) >= max_files:
+                return
+            seen_files.add(url)
+            pending[0] += 1
+        pool.submit(tracing.bind(work), url)
+
+    def work(url):
+        try:
+            if stop.is_set():
+                return
+
+            def on_url(loc, lastmod):
+                if stop.is_set():
+                    raise _Stopped
+                if not _valid_loc(loc):
+                    with lock:
+                        stats.invalid += 1
+                    return
+                put(SitemapEntry(loc, lastmod, url))
+
+            def on_child(loc):
+                if stop.is_set():
+                    raise _Stopped
+                if _valid_loc(loc):
+                    submit(urljoin(url, loc))
+                else:
+                    with lock:
+                        stats.invalid += 1
+
+            is_index = parse_sitemap(url, on_url, on_child, timeout=timeout)
+            with lock:
+                stats.files += 1
+                stats.index_files += int(is_index)
+        except _Stopped:
+            pass
+        except Exception as e:
+            with lock:
+                stats.error(url, str(e) or type(e).__name__)
+        finally:
+            with lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                put(_DONE)
+
+    for root in roots:
+        submit(root)
+    if not pending[0]:
+        return
+    try:
+        while True:
+            item = out.get()
+            if item is _DONE:
+                with lock:
+                    if pending[0] == 0:
+                        break
+                continue
+            with lock:
+                stats.add(item)
+            yield item
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def sitemap_roots(domain: str, robots_sitemaps=None) -> list:
+    """Sitemaps declared in robots.txt (resolved against the site), de-duplicated."""
+    base = normalize_url(domain)
+    return list(dict.fromkeys(urljoin(base, s) for s in (robots_sitemaps or []) if s))
+
+
+def scan_sitemaps(domain: str, robots_sitemaps=None, max_urls: int = None, **kwargs) -> dict:
+    """
+    Stream every sitemap of `domain` and return the aggregate stats. Without
+    robots.txt declarations the conventional locations are tried in order.
+    """
+    declared = sitemap_roots(domain, robots_sitemaps)
+    candidates = [declared] if declared else [[urljoin(normalize_url(domain), p)] for p in DEFAULT_SITEMAPS]
+    for roots in candidates:
+        stats = SitemapStats()
+        for i, _ in enumerate(iter_sitemaps(roots, stats=stats, **kwargs), 1):
+            if max_urls and i >= max_urls:
+                break
+        if stats.files or declared:
+            return {"sitemap_url": roots[0], "sitemaps": roots, **stats.to_dict()}
+    return {}
@@ -0,0 +1,85 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SqliteCache:
+    """
+    Small persistent key/value cache in one SQLite file. Entries expire after
+    `ttl` seconds and the least recently used ones are evicted once the stored
+    values exceed `max_bytes`. Values are anything json can encode.
+    """
+
+    def __init__(self, path: str, ttl: float = None, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    def get(self, key: str, ttl: float = None):
+        ttl = ttl if ttl is not None else self.ttl
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if ttl is not None and time.time() - row[1] > ttl:
+                self._delete(key)
+                return None
+            self._db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        data = json.dumps(value, separators=(",", ":"), default=str)
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._db.execute(
+                "INSERT INTO cache (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, data, now, now, len(data)),
+            )
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _delete(self, key: str):
+        row = self._db.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._size -= row[0]
+
+    def _evict(self):
+        target = self.max_bytes * 0.9
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,))
+            self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        while self._size > target:
+            rows = self._db.execute("SELECT key, size FROM cache ORDER BY accessed LIMIT 100").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._size -= size
+                if self._size <= target:
+                    break
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM cache")
+            self._size = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
@@ -0,0 +1,145 @@
+"""
+Map-reduce synthesis of competitor reports.
+
+Each report section is its own LLM call over only the slice of the audit
+tables it discusses, and all sections run concurrently. Sections are handed
+to `on_section` the moment they finish (so the first one shows up in
+seconds), and the report is assembled in the fixed section order at the end.
+"""
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import tracing
+from .env import REPORT_STREAM, REPORT_WORKERS
+from .llm_cache import complete_text
+from .prompts import REPORT_SECTION_PROMPT
+from .results import comparison_tables
+
+KEYWORD_TOOLS = ("keyword_extraction_tool", "gather_competitor_keywords_tool")
+
+
+class Section:
+    __slots__ = ("key", "title", "instructions", "aspects", "tools")
+
+    def __init__(self, key, title, instructions, aspects=None, tools=None):
+        self.key = key
+        self.title = title
+        self.instructions = instructions
+        self.aspects = aspects
+        self.tools = tools
+
+    def data(self, audits) -> str:
+        return comparison_tables(audits, aspects=self.aspects, tools=self.tools) or "(no data)"
+
+
+REPORT_SECTIONS = (
+    Section(
+        "summary", "Executive Summary",
+        "- Write an executive summary of at least 400 words on how the main website compares to its competitors "
+        "across technical SEO, performance, content, structured data, UX and keyword focus.\n"
+        "- Name the main site's biggest strengths and its most urgent gaps.",
+    ),
+    Section(
+        "technical", "Technical SEO Comparison",
+        "- Cover robots.txt, sitemap, crawlability, broken links, HTTP headers, redirects and performance.\n"
+        "- For each, explain what it is and why it matters for SEO, then compare the sites.\n"
+        "- Include a comparison table and bullet-point strengths/weaknesses per site.",
+        aspects=("technical",),
+    ),
+    Section(
+        "content", "Content & Structured Data",
+        "- Explain structured data (JSON-LD, OpenGraph, Twitter cards) and why it matters, then compare the sites.\n"
+        "- Include a comparison table and bullet-point strengths/weaknesses per site.",
+        aspects=("content",), tools=("schema_validation_tool",),
+    ),
+    Section(
+        "ux", "UX & Mobile",
+        "- Explain accessibility (alt text, landmarks) and mobile friendliness (viewport, responsive styles) "
+        "and why they matter, then compare the sites in a table.",
+        aspects=("ux",),
+    ),
+    Section(
+        "keywords", "Keyword Focus Analysis",
+        "- For every domain, show its main keywords and phrases and comment on their relevance and focus.\n"
+        "- Point out keyword themes competitors cover that the main website does not.",
+        tools=KEYWORD_TOOLS,
+    ),
+    Section(
+        "recommendations", "Actionable Recommendations",
+        "- Give a prioritized to-do list for the main website (highest impact first), each item referencing "
+        "what competitors do better where relevant.",
+    ),
+)
+
+
+_stream_target = REPORT_STREAM
+
+
+def set_report_stream(target: str) -> str:
+    """Default target of stream_sections() for this process ("-", a file path, or "" for off); returns the old one."""
+    global _stream_target
+    previous, _stream_target = _stream_target, target
+    return previous
+
+
+class SectionStream:
+    """on_section callback writing each finished section to stdout ("-") or appending it to a file."""
+    __slots__ = ("target", "count", "_lock")
+
+    def __init__(self, target: str):
+        self.target = target
+        self.count = 0  # sections written so far
+        self._lock = threading.Lock()
+
+    def __call__(self, section: Section, text: str):
+        block = f"\n## {section.title}\n\n{text.strip()}\n"
+        with self._lock:
+            if self.target == "-":
+                sys.stdout.write(block)
+                sys.stdout.flush()
+            else:
+                with open(self.target, "a", encoding="utf-8") as f:
+                    f.write(block)
+            self.count += 1
+
+
+def stream_sections(target: str = None):
+    """A SectionStream for `target` (default: set_report_stream / SEOSCAN_REPORT_STREAM); None if streaming is off."""
+    target = _stream_target if target is None else target
+    return SectionStream(target) if target else None
+
+
+def write_section(llm, section: Section, audits, main_domain: str, competitors) -> str:
+    prompt = REPORT_SECTION_PROMPT.format(
+        main_domain=main_domain,
+        competitors=", ".join(competitors) or "none found",
+        title=section.title,
+        data=section.data(audits),
+        instructions=section.instructions,
+    )
+    return complete_text(llm, prompt).strip()
+
+
+def synthesize_report(llm, audits, main_domain: str, competitors, sections=REPORT_SECTIONS,
+                      on_section=None, workers: int = REPORT_WORKERS) -> str:
+    """
+    Write every section concurrently, call on_section(section, text) as each
+    one completes, and return the full markdown report in section order.
+    A failed section is reported inline instead of failing the report.
+    """
+    texts = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sections)))) as pool:
+        futures = {
+            pool.submit(tracing.bind(write_section), llm, section, audits, main_domain, competitors): section
+            for section in sections
+        }
+        for fut in as_completed(futures):
+            section = futures[fut]
+            try:
+                texts[section.key] = fut.result()
+            except Exception as e:
+                texts[section.key] = f"_This section could not be generated: {e}_"
+            if on_section:
+                on_section(section, texts[section.key])
+    return "\n\n".join(f"## {s.title}\n\n{texts[s.key]}" for s in sections)
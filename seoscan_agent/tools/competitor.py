@@ -1,14 +1,13 @@
 import re
-import requests
 from urllib.parse import urlparse
 
 from seoscan_agent.env import SERPAPI_KEY
 
+from ..llm_cache import complete_text
+from ..page import page_snapshot
 from ..utils import normalize_url, serpapi_google_search
 from .content import gather_competitor_keywords_tool
-from bs4 import BeautifulSoup
-from .llm import llm
-from llama_index.llms.ollama import Ollama
+from .llm import get_llm
 
 
 def extract_search_query(llm, title, desc, keywords):
@@ -34,7 +33,7 @@ Examples:
 
 Now, only output the best search query.
 """
-    raw = llm.complete(query_prompt).text.strip()
+    raw = complete_text(llm, query_prompt).strip()
     lines = [line.strip() for line in raw.splitlines() if line.strip()]
     query = lines[-1] if lines else ""
     return query
@@ -42,11 +41,8 @@ Now, only output the best search query.
 
 def find_competitors_tool(domain: str, count: int = 5, serpapi_key: str = None) -> list:
     """Find up to 5 real competitor websites for the domain using Google and SerpAPI."""
-    html = requests.get(normalize_url(domain), timeout=10).text
-    soup = BeautifulSoup(html, "html.parser")
-    title = soup.title.string.strip() if soup.title else ""
-    meta = soup.find("meta", attrs={"name": "description"})
-    desc = meta["content"] if meta and meta.get("content") else ""
+    page = page_snapshot(domain, timeout=10)
+    title, desc = page.title, page.meta_description
     combined_keywords = gather_competitor_keywords_tool(domain)["all_competitor_keywords"]
 
     prompt = f"""
@@ -56,8 +52,11 @@ Given these keywords and content for the main site:
     - Keywords: {combined_keywords}
 Create a single, highly-effective Google search query to find this site's direct online competitors (not just similar topics). Output only the query.
 """
-    search_query = llm.complete(prompt).text.strip()
-    urls = serpapi_google_search(search_query, top_n=count, api_key=SERPAPI_KEY)
+    search_query = complete_text(get_llm("query"), prompt).strip()
+    try:
+        urls = serpapi_google_search(search_query, top_n=count, api_key=SERPAPI_KEY)
+    except Exception as e:
+        return {"error": str(e)}
     competitors = []
     seen = set()
     for url in urls:
@@ -1,72 +1,102 @@
-import re
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
-from bs4 import BeautifulSoup
-from llama_index.llms.openai import OpenAI
+from .. import tracing
+from ..crawler import crawl_site
+from ..keywords import STOPWORDS, KeywordIndex, detect_language, tokenize
+from ..llm_cache import complete_text
+from ..page import page_snapshot, snapshot
+from .llm import get_llm
 
-from seoscan_agent.env import OPENAI_API_KEY
 
-from ..utils import normalize_url
+def _site_pages(domain: str, max_pages: int) -> list:
+    """
+    Snapshots of the homepage and the first HTML pages it links to, up to
+    max_pages. Only those pages are crawled, unless this audit has already
+    crawled the site more deeply (broken_links_tool) and can reuse it. Pages
+    are taken in the order their links were found, so either crawl gives
+    the same pages.
+    """
+    crawl = crawl_site(domain, max_pages=max_pages, max_depth=1)
+    found = {url: i for i, url in enumerate(crawl.links)}
+    urls = [
+        p.url for p in sorted(crawl.pages, key=lambda p: (p.depth, found.get(p.url, -1)))
+        if p.error is None and (p.status or 500) < 400 and "html" in (p.content_type or "")
+    ][:max_pages]
+    if not urls:
+        return [page_snapshot(domain, timeout=10)]
 
+    def load(url):
+        try:
+            return snapshot(url, timeout=10)
+        except Exception:
+            return None
 
-def keyword_extraction_tool(domain: str, max_keywords: int = 10) -> dict:
-    """Extract top keywords from homepage content."""
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return [p for p in pool.map(tracing.bind(load), urls) if p is not None]
+
+
+def keyword_extraction_tool(domain: str, max_keywords: int = 10, max_pages: int = 10, competitors: list = None) -> dict:
+    """Rank the site's keywords and phrases by TF-IDF over its main pages, against competitor pages if given."""
     try:
-        html = requests.get(normalize_url(domain), timeout=10).text
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(separator=' ', strip=True).lower()
-        words = re.findall(r'\b\w{4,}\b', text)
-        freq = {}
-        for w in words:
-            freq[w] = freq.get(w, 0) + 1
-        sorted_keywords = sorted(freq.items(), key=lambda x: x[1], reverse=True)[:max_keywords]
-        return {"top_keywords": [k for k, _ in sorted_keywords]}
+        index = KeywordIndex()
+        pages = _site_pages(domain, max_pages)
+        for page in pages:
+            index.add(f"{page.title} {page.meta_description} {page.text}", target=True)
+        for competitor in competitors or ():
+            try:
+                for page in _site_pages(competitor, max(1, max_pages // 2)):
+                    index.add(f"{page.title} {page.meta_description} {page.text}", target=False)
+            except Exception:
+                continue
+        return {
+            "top_keywords": [term for term, *_ in index.top(max_keywords, max_words=1)],
+            "top_phrases": [term for term, *_ in index.top(max_keywords, min_count=2) if " " in term][:max_keywords],
+            "language": index.main_language,
+            "pages_analyzed": index.target_docs,
+        }
     except Exception as e:
         return {"top_keywords": [], "error": str(e)}
 
 def schema_validation_tool(domain: str) -> dict:
     try:
-        html = requests.get(normalize_url(domain), timeout=10).text
-        soup = BeautifulSoup(html, "html.parser")
-        schemas = soup.find_all("script", {"type": re.compile("ld\\+json")})
-        og = soup.find_all("meta", {"property": re.compile("^og:")})
-        twitter = soup.find_all("meta", {"name": re.compile("^twitter:")})
+        page = page_snapshot(domain, timeout=10)
         return {
-            "jsonld_blocks": len(schemas),
-            "og_tags": [m.get("property") for m in og],
-            "twitter_tags": [m.get("name") for m in twitter],
-            "sample_schema": [s.get_text()[:200] for s in schemas[:1]]
+            "jsonld_blocks": len(page.jsonld),
+            "og_tags": [prop for prop, _ in page.og_tags],
+            "twitter_tags": [name for name, _ in page.twitter_tags],
+            "sample_schema": [s[:200] for s in page.jsonld[:1]]
         }
     except Exception as e:
         return {"error": str(e)}
 
-def llm_keywords_from_content_tool(html: str) -> dict:
-    llm = OpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY, temperature=0.3, request_timeout=990)
+def llm_keywords_from_content_tool(content: str) -> dict:
+    """Ask the LLM for the 3 keywords that best describe a site, given its title, description and ranked terms."""
+    llm = get_llm("keyword")
     prompt = f"""
 You are an expert at identifying a website's main topics for SEO/competitor analysis.
-Given this homepage HTML/text:
+Given this summary of the website (title, description and its most distinctive terms, best first):
 
-{html[:2000]}
+{content[:2000]}
 
 List 3 and only 3 highly relevant SEO keywords (single words or short phrases, comma-separated) that best capture what this site is about.
 ONLY output the keywords, comma-separated, with NO extra text.
 """
-    resp = llm.complete(prompt)
-    if hasattr(resp, 'text'):
-        result = resp.text
-    else:
-        result = str(resp)
+    result = complete_text(llm, prompt)
     keywords = [k.strip() for k in result.split(",") if k.strip()]
     return {"llm_keywords": keywords}
 
 def gather_competitor_keywords_tool(domain: str) -> dict:
-    html = requests.get(normalize_url(domain), timeout=10).text
-    soup = BeautifulSoup(html, "html.parser")
-    title = soup.title.string.strip() if soup.title else ""
-    meta = soup.find("meta", attrs={"name": "description"})
-    desc = meta["content"] if meta and meta.get("content") else ""
-    basic_keywords = re.findall(r'\b\w{4,}\b', (title + " " + desc).lower())
-    unique_basic = list(dict.fromkeys(basic_keywords))[:5]
-    llm_result = llm_keywords_from_content_tool(html)
+    page = page_snapshot(domain, timeout=10)
+    title, desc = page.title, page.meta_description
+    tokens = tokenize(title + " " + desc)
+    stop = STOPWORDS.get(detect_language(tokens), frozenset())
+    unique_basic = list(dict.fromkeys(t for t in tokens if len(t) >= 4 and t not in stop))[:5]
+    ranked = keyword_extraction_tool(domain, max_keywords=15)
+    summary = (
+        f"Title: {title}\nDescription: {desc}\n"
+        f"Top terms: {', '.join(ranked.get('top_keywords', []))}\n"
+        f"Top phrases: {', '.join(ranked.get('top_phrases', []))}"
+    )
+    llm_result = llm_keywords_from_content_tool(summary)
     all_keywords = list(dict.fromkeys(unique_basic + llm_result.get("llm_keywords", [])))
-    return {"all_competitor_keywords": all_keywords}
\ No newline at end of file
+    return {"all_competitor_keywords": all_keywords}
@@ -1,4 +1,237 @@
-from llama_index.llms.openai import OpenAI
-from ..env import OPENAI_API_KEY
+"""
+Shared LLM clients by role.
 
-llm = OpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY, temperature=0.3, request_timeout=990)
+Each role (keyword, query, synthesis, agent) maps to a "backend:model" spec
+(SEOSCAN_LLM_<ROLE>, falling back to SEOSCAN_LLM). Clients are built on first
+use, one per backend and model, and reused by every role and thread that asks
+for the same one. Every request goes through its backend's limits: a cap on
+concurrent requests and a tokens-per-minute bucket, so parallel audits queue
+here instead of overloading a local Ollama server or running into OpenAI 429s.
+"""
+import asyncio
+import contextvars
+import re
+import threading
+import time
+
+from .. import tracing
+from ..env import (
+    LLM_ROLES, LLM_STUB_LATENCY, LLM_TEMPERATURE, OLLAMA_CONCURRENCY, OLLAMA_TIMEOUT, OLLAMA_TPM, OLLAMA_URL,
+    OPENAI_API_KEY, OPENAI_CONCURRENCY, OPENAI_TIMEOUT, OPENAI_TPM,
+)
+from ..ratelimit import RateLimiter
+
+ROLES = tuple(LLM_ROLES)
+
+# set while a request holds its backend slot, so a client method calling another
+# one (complete -> chat) is not gated twice
+_in_request = contextvars.ContextVar("seoscan_llm_in_request", default=False)
+
+
+def _usage(resp) -> tuple:
+    """(prompt tokens, completion tokens) reported by the provider (OpenAI usage / Ollama eval counts)."""
+    raw = getattr(resp, "raw", None)
+    usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+    if usage is not None:
+        get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+        if get("prompt_tokens") is not None:
+            return get("prompt_tokens"), get("completion_tokens") or 0
+    if isinstance(raw, dict) and "eval_count" in raw:
+        return raw.get("prompt_eval_count") or 0, raw.get("eval_count") or 0
+    return None, None
+
+
+def _text_len(resp) -> int:
+    text = getattr(resp, "text", None)
+    if text is None:
+        message = getattr(resp, "message", None)
+        text = getattr(message, "content", None) or ""
+    return len(text)
+
+
+class BackendLimits:
+    """Concurrency and token-rate gate shared by every client of one backend."""
+
+    def __init__(self, name: str, concurrency: int = 0, tokens_per_minute: float = 0):
+        self.name = name
+        self.semaphore = threading.BoundedSemaphore(concurrency) if concurrency > 0 else None
+        self.tokens = RateLimiter(tokens_per_minute, 60, burst=tokens_per_minute) if tokens_per_minute > 0 else None
+        self.calls = 0
+        self.tokens_used = 0
+        self.wait_s = 0.0
+        self._lock = threading.Lock()
+
+    def _enter(self, estimate: int):
+        start = time.monotonic()
+        if self.tokens is not None:
+            self.tokens.acquire(min(estimate, self.tokens.capacity))
+        if self.semaphore is not None:
+            self.semaphore.acquire()
+        return time.monotonic() - start
+
+    def _exit(self, waited: float, resp, estimate: int, span=None):
+        if self.semaphore is not None:
+            self.semaphore.release()
+        tokens_in, tokens_out = _usage(resp)
+        if tokens_in is None:
+            # no usage reported: ~4 characters per token
+            tokens_in, tokens_out = estimate, (_text_len(resp) // 4 if resp is not None else 0)
+        used = tokens_in + tokens_out
+        if self.tokens is not None and used > estimate:
+            self.tokens.debit(used - estimate)
+        with self._lock:
+            self.calls += 1
+            self.tokens_used += used
+            self.wait_s += waited
+        if span is not None:
+            span.set(tokens_in=tokens_in, tokens_out=tokens_out, wait_ms=round(waited * 1000, 1))
+
+    def call(self, fn, prompt_chars: int, model: str, *args, **kwargs):
+        """Run one model request within the backend's limits, as an "llm" span when traced."""
+        if _in_request.get():
+            return fn(*args, **kwargs)
+        estimate = prompt_chars // 4 + 1
+        with tracing.span("llm", f"{self.name}:{model}", backend=self.name, model=model) as span:
+            waited = self._enter(estimate)
+            token = _in_request.set(True)
+            resp = None
+            try:
+                resp = fn(*args, **kwargs)
+                return resp
+            finally:
+                _in_request.reset(token)
+                self._exit(waited, resp, estimate, span)
+
+    async def acall(self, fn, prompt_chars: int, model: str, *args, **kwargs):
+        if _in_request.get():
+            return await fn(*args, **kwargs)
+        estimate = prompt_chars // 4 + 1
+        with tracing.span("llm", f"{self.name}:{model}", backend=self.name, model=model) as span:
+            waited = await asyncio.to_thread(self._enter, estimate)
+            token = _in_request.set(True)
+            resp = None
+            try:
+                resp = await fn(*args, **kwargs)
+                return resp
+            finally:
+                _in_request.reset(token)
+                self._exit(waited, resp, estimate, span)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "tokens": self.tokens_used, "wait_s": round(self.wait_s, 3)}
+
+
+LIMITS = {
+    "openai": BackendLimits("openai", OPENAI_CONCURRENCY, OPENAI_TPM),
+    "ollama": BackendLimits("ollama", OLLAMA_CONCURRENCY, OLLAMA_TPM),
+    "stub": BackendLimits("stub"),
+}
+
+
+def _messages_len(messages) -> int:
+    return sum(len(str(getattr(m, "content", None) or "")) for m in messages)
+
+
+def _limited(cls, limits: BackendLimits):
+    """Subclass of a llama_index LLM class whose requests go through `limits` (same class name, so cache keys hold)."""
+
+    class Limited(cls):
+        def complete(self, prompt, formatted=False, **kwargs):
+            return limits.call(super().complete, len(prompt), self.model, prompt, formatted=formatted, **kwargs)
+
+        def chat(self, messages, **kwargs):
+            return limits.call(super().chat, _messages_len(messages), self.model, messages, **kwargs)
+
+        async def acomplete(self, prompt, formatted=False, **kwargs):
+            return await limits.acall(super().acomplete, len(prompt), self.model, prompt, formatted=formatted, **kwargs)
+
+        async def achat(self, messages, **kwargs):
+            return await limits.acall(super().achat, _messages_len(messages), self.model, messages, **kwargs)
+
+    Limited.__name__ = Limited.__qualname__ = cls.__name__
+    return Limited
+
+
+def _openai_client(model: str):
+    from llama_index.llms.openai import OpenAI
+
+    cls = _limited(OpenAI, LIMITS["openai"])
+    return cls(model=model, api_key=OPENAI_API_KEY, temperature=LLM_TEMPERATURE, timeout=OPENAI_TIMEOUT)
+
+
+def _ollama_client(model: str):
+    from llama_index.llms.ollama import Ollama
+
+    cls = _limited(Ollama, LIMITS["ollama"])
+    return cls(model=model, base_url=OLLAMA_URL, temperature=LLM_TEMPERATURE, request_timeout=OLLAMA_TIMEOUT)
+
+
+def stub_reply(prompt: str) -> str:
+    """Deterministic offline answer; ReAct prompts get a final answer so agents stop after one step."""
+    words = " ".join(re.findall(r"[A-Za-z]{4,}", prompt[-2000:])[-8:])
+    if "Thought:" in prompt:
+        return f"Thought: I can answer without using any more tools.\nAnswer: Stub answer about {words}"
+    return f"Stub answer about {words}"
+
+
+def _stub_client(model: str):
+    from llama_index.core.llms import CompletionResponse, CustomLLM, LLMMetadata
+
+    class StubLLM(CustomLLM):
+        """Offline stand-in for benchmarks and dry runs: no network, optional fixed latency."""
+        model: str = "stub"
+        temperature: float = 0.0
+
+        @property
+        def metadata(self) -> LLMMetadata:
+            return LLMMetadata(model_name=self.model, is_chat_model=False)
+
+        def complete(self, prompt, formatted=False, **kwargs):
+            if LLM_STUB_LATENCY:
+                time.sleep(LLM_STUB_LATENCY)
+            return CompletionResponse(text=stub_reply(prompt))
+
+        def stream_complete(self, prompt, formatted=False, **kwargs):
+            yield self.complete(prompt, formatted=formatted, **kwargs)
+
+    cls = _limited(StubLLM, LIMITS["stub"])
+    return cls(model=model or "stub", temperature=LLM_TEMPERATURE)
+
+
+BACKENDS = {"openai": _openai_client, "ollama": _ollama_client, "stub": _stub_client}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def parse_spec(spec: str) -> tuple:
+    """"ollama:qwen3:4b" -> ("ollama", "qwen3:4b"); the model is optional for the stub."""
+    backend, _, model = spec.strip().partition(":")
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown LLM backend {backend!r} in {spec!r} (expected one of {', '.join(BACKENDS)})")
+    return backend, model
+
+
+def get_llm(role: str = "agent"):
+    """Shared client for a role, built (and its llama_index backend imported) on first use."""
+    if role not in LLM_ROLES:
+        raise ValueError(f"unknown LLM role {role!r} (expected one of {', '.join(ROLES)})")
+    key = parse_spec(LLM_ROLES[role])
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = BACKENDS[key[0]](key[1])
+    return client
+
+
+def llm_stats() -> dict:
+    """Requests, tokens and seconds spent waiting for a slot, per backend used so far."""
+    return {name: limits.stats() for name, limits in LIMITS.items() if limits.calls}
+
+
+def __getattr__(name):
+    # `from .tools.llm import llm` keeps working without building the client at import time
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
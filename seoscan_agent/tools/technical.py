@@ -1,15 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
-import re
-from urllib.parse import urljoin, urlparse
+import asyncio
 
-from seoscan_agent.env import GOOGLE_PSI_API_KEY
+from urllib.parse import urljoin
+
+from ..crawler import crawl_site, site_key
+from ..env import BROKEN_LINKS_MAX
+from ..fetch import fetch
+from ..http_engine import engine, run
+from ..linkcheck import check_links, link_checker
+from ..psi import pagespeed
+from ..redirects import domain_variants, trace_many
+from ..robots import robots_cache
+from ..sitemap import scan_sitemaps
 from ..utils import normalize_url
 
-def robots_txt_tool(domain: str) -> dict:
+async def robots_txt(domain: str) -> dict:
     url = urljoin(normalize_url(domain), "/robots.txt")
     try:
-        resp = requests.get(url, timeout=30)
+        resp = await engine.fetch(url, timeout=30)
         if resp.status_code != 200:
             return {"robots.txt": "Not found"}
         lines = resp.text.strip().splitlines()
@@ -19,114 +26,89 @@ def robots_txt_tool(domain: str) -> dict:
     except Exception as e:
         return {"error": str(e)}
 
+def robots_txt_tool(domain: str) -> dict:
+    return run(robots_txt(domain))
+
+async def sitemap(domain: str) -> dict:
+    robots = await robots_txt(domain)
+    try:
+        result = await asyncio.to_thread(scan_sitemaps, domain, robots.get("sitemaps"))
+    except Exception as e:
+        return {"error": str(e)}
+    return result or {"sitemap": "Not found"}
+
 def sitemap_tool(domain: str) -> dict:
-    candidates = [
-        urljoin(normalize_url(domain), "/sitemap.xml"),
-        urljoin(normalize_url(domain), "/sitemap_index.xml"),
-    ]
-    for url in candidates:
-        try:
-            r = requests.get(url, timeout=30)
-            if r.status_code == 200:
-                soup = BeautifulSoup(r.content, "xml")
-                urls = [loc.get_text() for loc in soup.find_all("loc")]
-                return {"sitemap_url": url, "num_urls": len(urls), "sample_urls": urls[:5]}
-        except Exception:
-            continue
-    return {"sitemap": "Not found"}
+    return run(sitemap(domain))
 
-def broken_links_tool(domain: str, max_pages: int = 1) -> dict:
-    start_url = normalize_url(domain)
-    checked = set()
-    broken = []
+def broken_links_tool(domain: str, max_pages: int = 100, max_depth: int = 3, check_external: bool = True) -> dict:
     try:
-        resp = requests.get(start_url, timeout=10)
-        if resp.status_code != 200:
-            return {"error": f"Homepage not reachable ({resp.status_code})"}
-        soup = BeautifulSoup(resp.text, "html.parser")
-        links = {urljoin(start_url, a["href"]) for a in soup.find_all("a", href=True)}
-        links = {l for l in links if urlparse(l).netloc == urlparse(start_url).netloc}
-        pages = [start_url] + list(links)[:max_pages]
-        for url in pages:
-            if url in checked:
-                continue
-            checked.add(url)
-            try:
-                r = requests.get(url, timeout=10)
-                if r.status_code >= 400:
-                    broken.append({"url": url, "status": r.status_code})
-            except Exception:
-                broken.append({"url": url, "status": "error"})
-        return {"broken_links_count": len(broken), "broken_links": broken[:10]}
+        crawl = crawl_site(domain, max_pages=max_pages, max_depth=max_depth)
+        if not crawl.pages:
+            return {"error": "Homepage blocked by robots.txt or not reachable"}
+        home = crawl.pages[0]
+        if home.status is None or home.status >= 400:
+            return {"error": f"Homepage not reachable ({home.status or home.error})"}
+        for p in crawl.pages:
+            link_checker.record(p.url, p.status, error=p.error)
+        site = site_key(crawl.start_url)
+        links = [u for u in crawl.links if check_external or site_key(u) == site]
+        statuses = check_links(links)
+        broken = [
+            {**s.to_dict(), "found_on": crawl.links.get(u), "external": site_key(u) != site}
+            for u, s in statuses.items() if s.broken
+        ]
+        return {
+            "pages_crawled": len(crawl.pages),
+            "links_checked": len(statuses),
+            "broken_links_count": len(broken),
+            "broken_internal": sum(1 for b in broken if not b["external"]),
+            "broken_external": sum(1 for b in broken if b["external"]),
+            "broken_links": broken[:BROKEN_LINKS_MAX],
+            "crawl": crawl.summary(),
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+async def http_headers(domain: str) -> dict:
+    try:
+        r = await engine.fetch(normalize_url(domain), timeout=60)
+        # names lowercased: the cached response may come from either HTTP client
+        return {k.lower(): v for k, v in r.headers.items()}
     except Exception as e:
         return {"error": str(e)}
 
 def http_headers_tool(domain: str) -> dict:
+    return run(http_headers(domain))
+
+async def redirect_check(domain: str) -> dict:
     try:
-        r = requests.get(normalize_url(domain), timeout=60)
-        return dict(r.headers)
+        chains = await trace_many(domain_variants(domain))
     except Exception as e:
         return {"error": str(e)}
+    return {url: chain.to_dict() for url, chain in chains.items()}
 
 def redirect_check_tool(domain: str) -> dict:
-    base = re.sub(r"^https?://", "", domain)
-    urls = [
-        f"http://{base}", f"https://{base}", f"http://www.{base}", f"https://www.{base}"
-    ]
-    results = {}
-    for u in urls:
-        try:
-            r = requests.get(u, timeout=60, allow_redirects=True)
-            results[u] = {"status": r.status_code, "final_url": r.url}
-        except Exception as e:
-            results[u] = {"error": str(e)}
-    return results
+    return run(redirect_check(domain))
 
 def crawlability_tool(domain: str) -> dict:
     try:
-        robots = robots_txt_tool(domain)
-        user_agent = "SeoScanBot"
-        allow = True
-        for rule in robots.get("sample", []):
-            if rule.lower().startswith("user-agent") and user_agent.lower() in rule.lower():
-                allow = True
-            if "disallow: /" in rule.lower():
-                allow = False
-        homepage = requests.get(normalize_url(domain), timeout=10)
+        url = normalize_url(domain)
+        rules = robots_cache.get(url)
+        allow, rule = rules.decide(url, "SeoScanBot")
+        homepage = fetch(url, timeout=10)
         return {
             "robots_allow_homepage": allow,
+            "blocking_rule": None if allow else rule,
+            "googlebot_allowed": rules.is_allowed(url, "Googlebot"),
+            "robots_status": rules.status,
+            "crawl_delay": rules.crawl_delay("SeoScanBot"),
             "homepage_status": homepage.status_code,
         }
     except Exception as e:
         return {"error": str(e)}
 
 def lighthouse_tool(domain: str) -> dict:
-    import os
-    url = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
-    target = normalize_url(domain)
-    api_key = GOOGLE_PSI_API_KEY
     try:
-        resp = requests.get(
-            url,
-            params={
-                "url": target,
-                "key": api_key,
-                "strategy": "desktop",
-                "category": "performance"
-            },
-            timeout=30,
-        )
-        data = resp.json()
-        audits = data.get("lighthouseResult", {}).get("audits", {})
-        categories = data.get("lighthouseResult", {}).get("categories", {})
-        return {
-            "performance_score": categories.get("performance", {}).get("score"),
-            "first_contentful_paint": audits.get("first-contentful-paint", {}).get("displayValue", ""),
-            "speed_index": audits.get("speed-index", {}).get("displayValue", ""),
-            "largest_contentful_paint": audits.get("largest-contentful-paint", {}).get("displayValue", ""),
-            "interactive": audits.get("interactive", {}).get("displayValue", ""),
-            "cumulative_layout_shift": audits.get("cumulative-layout-shift", {}).get("displayValue", ""),
-            "total_blocking_time": audits.get("total-blocking-time", {}).get("displayValue", ""),
-        }
+        return {"url": normalize_url(domain), **pagespeed(domain)}
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
@@ -1,33 +1,23 @@
-import requests
-from bs4 import BeautifulSoup
-import re
-from ..utils import normalize_url
+from ..page import page_snapshot
 
 def accessibility_tool(domain: str) -> dict:
     try:
-        html = requests.get(normalize_url(domain), timeout=10).text
-        soup = BeautifulSoup(html, "html.parser")
-        imgs = soup.find_all("img")
-        no_alt = [img for img in imgs if not img.get("alt")]
-        nav = soup.find("nav")
-        main = soup.find("main")
+        page = page_snapshot(domain, timeout=10)
+        no_alt = [src for src, alt in page.images if not alt]
         return {
             "img_no_alt": len(no_alt),
-            "has_nav": nav is not None,
-            "has_main": main is not None,
+            "has_nav": page.has_nav,
+            "has_main": page.has_main,
         }
     except Exception as e:
         return {"error": str(e)}
 
 def mobile_friendly_tool(domain: str) -> dict:
     try:
-        html = requests.get(normalize_url(domain), timeout=60).text
-        soup = BeautifulSoup(html, "html.parser")
-        vp = soup.find("meta", {"name": "viewport"})
-        responsive = bool(soup.find("style", string=re.compile("max-width|media")))
+        page = page_snapshot(domain, timeout=60)
         return {
-            "viewport_meta": vp.get("content") if vp else "Missing",
-            "has_responsive_styles": responsive,
+            "viewport_meta": page.viewport if page.viewport is not None else "Missing",
+            "has_responsive_styles": page.has_responsive_styles,
         }
     except Exception as e:
         return {"error": str(e)}
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+Per-audit tracing.
+
+An audit opened with `audit_trace()` records a span for every tool call,
+HTTP request (status, bytes, connect/TLS/time-to-first-byte) and LLM request
+(tokens in/out, time spent waiting for a backend slot). When it ends, the
+trace is written as a JSON profile with a hot-path summary and/or sent to an
+OTLP/HTTP collector. Outside a trace every hook is a no-op.
+
+The current span lives in a context variable; work handed to thread pools or
+the HTTP engine's event loop keeps its parent through `bind()` / `bind_coro()`,
+as do other variables registered with `carry()`.
+"""
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .env import OTLP_ENDPOINT, PROFILE_DIR, TRACE_MAX_SPANS
+
+_current = ContextVar("seoscan_span", default=None)
+_carried = [_current]
+
+# OTLP SpanKind: INTERNAL for tools and audits, CLIENT for outgoing requests
+OTLP_KINDS = {"http": 3, "llm": 3}
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "kind", "name", "start_ns", "end_ns", "attrs", "error")
+
+    def __init__(self, trace, kind: str, name: str, parent_id: str = None, attrs: dict = None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attrs = attrs or {}
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        d = {
+            "id": self.span_id, "parent": self.parent_id, "kind": self.kind, "name": self.name,
+            "start_ms": round((self.start_ns - self.trace.root.start_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attrs:
+            d["attrs"] = self.attrs
+        if self.error:
+            d["error"] = self.error
+        return d
+
+
+class Trace:
+    """Spans of one audit. At most `max_spans` are kept; the rest are only counted."""
+
+    def __init__(self, name: str, attrs: dict = None, max_spans: int = TRACE_MAX_SPANS):
+        self.trace_id = os.urandom(16).hex()
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self.profile_path = None
+        self._lock = threading.Lock()
+        self.root = Span(self, "audit", name, attrs=attrs)
+        self.spans.append(self.root)
+
+    def add(self, span: Span) -> bool:
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped += 1
+                return False
+            self.spans.append(span)
+            return True
+
+    def summary(self, top: int = 10) -> dict:
+        """
+        Totals per span kind and the hottest paths (root > tool > request, with
+        HTTP/LLM spans grouped by host/model), ranked by self time, i.e. time
+        not covered by child spans.
+        """
+        spans = list(self.spans)
+        by_id = {s.span_id: s for s in spans}
+        child_ms = {}
+        for s in spans:
+            if s.parent_id:
+                child_ms[s.parent_id] = child_ms.get(s.parent_id, 0.0) + s.duration_ms
+        paths = {}
+
+        def path(s):
+            if s.span_id not in paths:
+                parent = by_id.get(s.parent_id)
+                paths[s.span_id] = f"{path(parent)} > {s.name}" if parent else s.name
+            return paths[s.span_id]
+
+        kinds, hot = {}, {}
+        for s in spans:
+            ms = s.duration_ms
+            k = kinds.setdefault(s.kind, {"count": 0, "total_ms": 0.0, "errors": 0})
+            k["count"] += 1
+            k["total_ms"] += ms
+            k["errors"] += s.error is not None
+            h = hot.setdefault(path(s), {"path": path(s), "kind": s.kind, "count": 0, "total_ms": 0.0,
+                                         "self_ms": 0.0, "max_ms": 0.0})
+            h["count"] += 1
+            h["total_ms"] += ms
+            h["self_ms"] += max(0.0, ms - child_ms.get(s.span_id, 0.0))
+            h["max_ms"] = max(h["max_ms"], ms)
+        for row in [*kinds.values(), *hot.values()]:
+            for field in ("total_ms", "self_ms", "max_ms"):
+                if field in row:
+                    row[field] = round(row[field], 1)
+        ranked = sorted(hot.values(), key=lambda h: h["self_ms"], reverse=True)
+        llm = [s.attrs for s in spans if s.kind == "llm"]
+        http = [s.attrs for s in spans if s.kind == "http"]
+        return {
+            "duration_ms": round(self.root.duration_ms, 1),
+            "spans": len(spans), "dropped": self.dropped,
+            "by_kind": kinds,
+            "http_bytes": sum(a.get("bytes") or 0 for a in http),
+            "llm_tokens_in": sum(a.get("tokens_in") or 0 for a in llm),
+            "llm_tokens_out": sum(a.get("tokens_out") or 0 for a in llm),
+            "hot_paths": ranked[:top],
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "attrs": self.root.attrs,
+            "started_at": self.root.start_ns / 1e9,
+            "summary": self.summary(),
+            "spans": [s.to_dict() for s in list(self.spans)],
+        }
+
+    def save(self, directory: str) -> str:
+        """Write the JSON profile into `directory` and return its path."""
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^\w.-]+", "_", self.root.name)[:60].strip("_") or "audit"
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{self.trace_id[:8]}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, default=str)
+        return path
+
+    def to_otlp(self, service: str = "seoscan") -> dict:
+        """OTLP/HTTP JSON payload (hex ids, nanosecond timestamps as strings)."""
+        def value(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        def attributes(d):
+            return [{"key": k, "value": value(v)} for k, v in d.items() if v is not None]
+
+        spans = []
+        for s in list(self.spans):
+            item = {
+                "traceId": self.trace_id, "spanId": s.span_id, "name": s.name,
+                "kind": OTLP_KINDS.get(s.kind, 1),
+                "startTimeUnixNano": str(s.start_ns), "endTimeUnixNano": str(s.end_ns or time.time_ns()),
+                "attributes": attributes({"seoscan.kind": s.kind, **s.attrs}),
+            }
+            if s.parent_id:
+                item["parentSpanId"] = s.parent_id
+            if s.error:
+                item["status"] = {"code": 2, "message": s.error}
+            spans.append(item)
+        return {"resourceSpans": [{
+            "resource": {"attributes": attributes({"service.name": service})},
+            "scopeSpans": [{"scope": {"name": "seoscan_agent"}, "spans": spans}],
+        }]}
+
+    def export(self, endpoint: str, timeout: float = 5) -> bool:
+        """POST the trace to an OTLP/HTTP collector; failures are reported, never raised."""
+        import requests
+
+        url = endpoint.rstrip("/")
+        if not url.endswith("/v1/traces"):
+            url += "/v1/traces"
+        try:
+            resp = requests.post(url, json=self.to_otlp(), timeout=timeout)
+            resp.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"[WARN] OTLP export to {url} failed: {e}", file=sys.stderr)
+            return False
+
+
+def current():
+    """The active span, or None when no audit is being traced."""
+    return _current.get()
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs):
+    """Child span of the active one; yields None (and records nothing) outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    s = Span(parent.trace, kind, name, parent.span_id, attrs)
+    if not parent.trace.add(s):
+        yield None
+        return
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+
+
+@contextmanager
+def audit_trace(name: str, enabled: bool = None, profile_dir: str = None, otlp_endpoint: str = None, **attrs):
+    """
+    Trace everything run inside the block. Yields the Trace (None when
+    disabled). Inside an active trace this only opens an "audit" span. When
+    the outermost block exits the profile is saved to `profile_dir` and sent
+    to `otlp_endpoint` (both default to the SEOSCAN_ settings); the saved
+    path is left in `trace.profile_path`.
+    """
+    parent = _current.get()
+    if parent is not None:
+        with span("audit", name, **attrs):
+            yield parent.trace
+        return
+    profile_dir = PROFILE_DIR if profile_dir is None else profile_dir
+    otlp_endpoint = OTLP_ENDPOINT if otlp_endpoint is None else otlp_endpoint
+    if not (enabled if enabled is not None else profile_dir or otlp_endpoint):
+        yield None
+        return
+    trace = Trace(name, attrs)
+    token = _current.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _current.reset(token)
+        if profile_dir:
+            try:
+                trace.profile_path = trace.save(profile_dir)
+            except OSError as e:
+                print(f"[WARN] Could not write profile: {e}", file=sys.stderr)
+        if otlp_endpoint:
+            trace.export(otlp_endpoint)
+
+
+def traced_tool(fn, name: str = None):
+    """Wrap a tool so each call is a "tool" span; signature and docstring are kept for tool schemas."""
+    label = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return fn(*args, **kwargs)
+        with span("tool", label) as s:
+            result = fn(*args, **kwargs)
+            if s is not None and isinstance(result, dict) and result.get("error"):
+                s.set(error_result=str(result["error"])[:200])
+            return result
+
+    return wrapper
+
+
+def carry(var: ContextVar):
+    """Also hand `var` (e.g. the audit's page cache) to the threads and tasks started through bind()."""
+    if var not in _carried:
+        _carried.append(var)
+
+
+def _captured() -> list:
+    return [(var, value) for var in _carried if (value := var.get()) is not None]
+
+
+def bind(fn):
+    """Run `fn` (e.g. in a pool thread) under the span (and carried variables) active where bind() was called."""
+    values = _captured()
+    if not values:
+        return fn
+
+    @functools.wraps(fn)
+    def bound(*args, **kwargs):
+        tokens = [(var, var.set(value)) for var, value in values]
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+
+    return bound
+
+
+def bind_coro(coro):
+    """Same as bind() for a coroutine that will run on another thread's event loop."""
+    values = _captured()
+    if not values:
+        return coro
+
+    async def bound():
+        for var, value in values:
+            var.set(value)  # tasks run in a copied context, so this does not leak
+        return await coro
+
+    return bound()
+
+
+def format_summary(summary: dict, top: int = 8) -> str:
+    """Plain-text hot-path table for terminals and logs."""
+    dropped = f" ({summary['dropped']} dropped)" if summary["dropped"] else ""
+    lines = [
+        f"{summary['duration_ms'] / 1000:.2f}s, {summary['spans']} spans{dropped}, "
+        f"{summary['http_bytes'] / 1024:.0f} KiB over HTTP, "
+        f"LLM tokens {summary['llm_tokens_in']} in / {summary['llm_tokens_out']} out",
+        "  " + "  ".join(
+            f"{kind}: {v['count']}x {v['total_ms'] / 1000:.2f}s" + (f" ({v['errors']} errors)" if v["errors"] else "")
+            for kind, v in summary["by_kind"].items()
+        ),
+        f"  {'self s':>8} {'total s':>8} {'calls':>6}  path",
+    ]
+    for h in summary["hot_paths"][:top]:
+        lines.append(f"  {h['self_ms'] / 1000:>8.2f} {h['total_ms'] / 1000:>8.2f} {h['count']:>6}  {h['path']}")
+    return "\n".join(lines)
@@ -1,7 +1,7 @@
-import requests
 from urllib.parse import urlparse
 
 from .env import SERPAPI_KEY
+from .serp import search
 
 
 def normalize_url(domain: str) -> str:
@@ -12,19 +12,10 @@ def normalize_url(domain: str) -> str:
 
 def serpapi_google_search(query, top_n=5, api_key=None):
     """Search Google using SerpAPI and return up to top_n unique result URLs."""
-
-    params = {
-        "engine": "google",
-        "q": query,
-        "api_key": SERPAPI_KEY,
-        "num": top_n
-    }
-    url = "https://serpapi.com/search.json"
-    r = requests.get(url, params=params, timeout=20)
-    results = r.json()
+    results = search(query, num=top_n, api_key=api_key or SERPAPI_KEY)
     urls = []
     seen = set()
-    for res in results.get("organic_results", []):
+    for res in results:
         link = res.get("link")
         netloc = urlparse(link).netloc.replace("www.", "") if link else ""
         if not link or not netloc or netloc in seen:
@@ -0,0 +1,36 @@
+from seoscan_agent.keywords import KeywordIndex
+
+SITE = [
+    "Boutique hotels in Lisbon. Our boutique hotels offer rooftop pools.",
+    "Boutique hotels with rooftop pools and spa",
+    "Lisbon boutique hotels guide",
+]
+BACKGROUND = ["Hotels in Lisbon and Porto", "Cheap hotels Lisbon"]
+
+
+def index() -> KeywordIndex:
+    idx = KeywordIndex()
+    for text in SITE:
+        idx.add(text, target=True)
+    for text in BACKGROUND:
+        idx.add(text, target=False)
+    return idx
+
+
+def test_words_only_seen_inside_a_better_phrase_are_left_out():
+    top = [term for term, *_ in index().top(6)]
+    assert top[0] == "boutique hotels"
+    assert "boutique" not in top and "hotels" not in top
+
+
+def test_background_documents_lower_common_terms():
+    scores = {term: score for term, score, *_ in index().top(10, max_words=1)}
+    # same count on the site, but "hotels" is on every competitor page too
+    assert scores["boutique"] > scores["hotels"]
+
+
+def test_phrase_count_and_k_limits():
+    top = index().top(3, min_phrase_count=2)
+    assert len(top) == 3
+    assert all(count >= 2 for term, _, count, _ in top if " " in term)
+    assert all(" " not in term for term, *_ in index().top(20, max_words=1))
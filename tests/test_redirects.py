@@ -0,0 +1,42 @@
+from seoscan_agent.redirects import Hop, RedirectChain
+
+
+def chain(*hops, **state) -> RedirectChain:
+    c = RedirectChain(hops[0].url)
+    c.hops = list(hops)
+    for name, value in state.items():
+        setattr(c, name, value)
+    return c
+
+
+def test_clean_https_redirect_has_no_flags():
+    c = chain(Hop("http://ex.com/", 301, "https://ex.com/"), Hop("https://ex.com/", 200, hsts="max-age=31536000"))
+    assert c.flags() == []
+    assert c.final_url == "https://ex.com/" and c.final_status == 200
+
+
+def test_temporary_long_chain_without_hsts():
+    c = chain(
+        Hop("http://ex.com/", 302, "https://ex.com/"),
+        Hop("https://ex.com/", 302, "/home"),
+        Hop("https://ex.com/home", 302, "https://www.ex.com/home"),
+        Hop("https://www.ex.com/home", 200),
+    )
+    assert c.flags(long_chain=3) == ["long_chain", "temporary_only", "no_hsts"]
+
+
+def test_mixed_statuses_and_downgrade():
+    c = chain(
+        Hop("https://ex.com/", 301, "http://ex.com/a"),
+        Hop("http://ex.com/a", 302, "http://ex.com/b"),
+        Hop("http://ex.com/b", 200),
+    )
+    assert c.flags() == ["mixed_301_302", "https_downgrade"]
+
+
+def test_loop_and_broken_target():
+    loop = chain(Hop("http://ex.com/", 301, "http://ex.com/"), loop=True)
+    assert loop.flags() == ["loop"]
+    assert loop.final_status is None
+    broken = chain(Hop("http://ex.com/", 301, "http://ex.com/gone"), Hop("http://ex.com/gone", 404))
+    assert "broken" in broken.flags()
@@ -0,0 +1,100 @@
+import asyncio
+
+from seoscan_agent import robots
+from seoscan_agent.robots import RobotsCache, RobotsRules
+
+ROBOTS = """
+User-agent: S
+Disallow: /
+
+User-agent: SEOSCANBOT
+Disallow: /private
+Allow: /private/open
+Crawl-delay: 2
+
+User-agent: *
+Disallow: /
+"""
+
+
+def test_group_needs_exact_product_token():
+    rules = RobotsRules.parse(ROBOTS)
+    assert rules.is_allowed("https://ex.com/page", "SeoScanBot/1.0 (+https://ex.com)")
+    assert not rules.is_allowed("https://ex.com/private/x", "seoscanbot")
+    assert rules.crawl_delay("SeoScanBot") == 2
+    # no group of its own: falls back to *
+    assert not rules.is_allowed("https://ex.com/page", "OtherBot")
+
+
+def test_groups_for_the_same_agent_are_merged():
+    rules = RobotsRules.parse("User-agent: a\nDisallow: /x\n\nUser-agent: b\nUser-agent: a\nDisallow: /y\n")
+    assert not rules.is_allowed("https://ex.com/x", "a")
+    assert not rules.is_allowed("https://ex.com/y", "a")
+    assert rules.is_allowed("https://ex.com/x", "b")
+
+
+def test_wildcards_and_end_anchor():
+    rules = RobotsRules.parse("User-agent: *\nDisallow: /*.pdf$\nDisallow: /tmp*/cache\n")
+    assert not rules.is_allowed("https://ex.com/files/a.pdf")
+    assert rules.is_allowed("https://ex.com/files/a.pdf?download=1")
+    assert not rules.is_allowed("https://ex.com/tmp-1/cache/page")
+    assert rules.is_allowed("https://ex.com/cache")
+
+
+def test_longest_match_wins_and_allow_wins_ties():
+    rules = RobotsRules.parse("User-agent: *\nDisallow: /shop\nAllow: /shop/sale\nDisallow: /page\nAllow: /page\n")
+    assert not rules.is_allowed("https://ex.com/shop/item")
+    assert rules.is_allowed("https://ex.com/shop/sale/item")
+    assert rules.decide("https://ex.com/page") == (True, "Allow: /page")
+
+
+def test_percent_encoding_is_normalized():
+    rules = RobotsRules.parse("User-agent: *\nDisallow: /~foo\nDisallow: /caf%c3%a9\n")
+    assert not rules.is_allowed("https://ex.com/%7Efoo/bar")
+    assert not rules.is_allowed("https://ex.com/café")
+    assert rules.is_allowed("https://ex.com/%2Ffoo")
+
+
+class _Response:
+    def __init__(self, status, text=""):
+        self.status_code = status
+        self.text = text
+
+
+class _Engine:
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    async def fetch(self, url, timeout=None):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return _Response(status, "User-agent: *\nDisallow: /private\n")
+
+    get = fetch
+
+
+def _lookup(cache, monkeypatch, engine):
+    monkeypatch.setattr(robots, "engine", engine)
+    return asyncio.run(cache.get_async("https://ex.com/page"))
+
+
+def test_missing_robots_allows_everything(monkeypatch):
+    rules = _lookup(RobotsCache(), monkeypatch, _Engine(404))
+    assert rules.allow_all and rules.is_allowed("https://ex.com/private")
+
+
+def test_server_error_disallows_until_retry(monkeypatch):
+    cache = RobotsCache(ttl=3600, retry_after=60)
+    engine = _Engine(503, TimeoutError("timed out"), 200)
+    assert not _lookup(cache, monkeypatch, engine).is_allowed("https://ex.com/page")
+    # still blocked while the failure is fresh
+    assert _lookup(cache, monkeypatch, engine).status == 503 and engine.calls == 1
+    cache._rules["https://ex.com"].fetched_at -= 61
+    assert _lookup(cache, monkeypatch, engine).disallow_all and engine.calls == 2
+    cache._rules["https://ex.com"].fetched_at -= 61
+    rules = _lookup(cache, monkeypatch, engine)
+    assert rules.status == 200 and rules.is_allowed("https://ex.com/page")
+    assert not rules.is_allowed("https://ex.com/private")
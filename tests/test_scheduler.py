@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from seoscan_agent.scheduler import Cron
+
+
+def next_run(expr: str, after: datetime) -> datetime:
+    return datetime.fromtimestamp(Cron(expr).next_after(after.timestamp()))
+
+
+def test_weekday_range_skips_the_weekend():
+    # 2024-03-01 is a Friday
+    assert next_run("30 9 * * 1-5", datetime(2024, 3, 1, 10, 0)) == datetime(2024, 3, 4, 9, 30)
+
+
+def test_steps_and_strictly_after():
+    assert next_run("*/15 * * * *", datetime(2024, 3, 1, 10, 7)) == datetime(2024, 3, 1, 10, 15)
+    assert next_run("*/15 * * * *", datetime(2024, 3, 1, 10, 15)) == datetime(2024, 3, 1, 10, 30)
+
+
+def test_sunday_is_0_or_7():
+    assert next_run("0 12 * * 7", datetime(2024, 3, 1)) == next_run("0 12 * * 0", datetime(2024, 3, 1))
+    assert next_run("0 12 * * 7", datetime(2024, 3, 1)) == datetime(2024, 3, 3, 12, 0)
+
+
+def test_restricted_day_fields_match_either_day():
+    # day 15 or any Sunday, whichever comes first
+    assert next_run("0 0 15 * 0", datetime(2024, 3, 1)) == datetime(2024, 3, 3)
+    assert next_run("0 0 15 * 0", datetime(2024, 3, 10, 1)) == datetime(2024, 3, 15)
+
+
+def test_month_rollover():
+    assert next_run("0 6 1 1 *", datetime(2024, 3, 1)) == datetime(2025, 1, 1, 6, 0)
+
+
+@pytest.mark.parametrize("expr", ["61 * * * *", "* * * *", "0 0 30 2 *", "*/0 * * * *"])
+def test_bad_expressions_fail_early(expr):
+    with pytest.raises(ValueError):
+        Cron(expr)
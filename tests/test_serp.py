@@ -0,0 +1,39 @@
+import threading
+
+import pytest
+
+from seoscan_agent.serp import BACKENDS, SerpScheduler
+from seoscan_agent.store import SqliteCache
+
+
+def test_backend_errors_reach_owner_and_waiters_and_are_not_cached(monkeypatch, tmp_path):
+    release = threading.Event()
+    calls = []
+
+    def failing(query, num, api_key=None):
+        calls.append(query)
+        release.wait(5)
+        raise RuntimeError("401 Unauthorized")
+
+    monkeypatch.setitem(BACKENDS, "failing", failing)
+    serp = SerpScheduler(backend="failing", cache=SqliteCache(str(tmp_path / "serp.sqlite"), ttl=60), quota=100, period=1)
+    errors = []
+
+    def run():
+        try:
+            serp.search("Hotel Booking")
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while not serp._inflight or serp.hits < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+    assert errors == ["401 Unauthorized"] * 3 and len(calls) == 1
+    with pytest.raises(RuntimeError):
+        serp.search("hotel booking")
+    assert len(calls) == 2
@@ -0,0 +1,23 @@
+from seoscan_agent.service import FairQueue, Job
+
+
+def test_clients_take_turns():
+    q = FairQueue()
+    jobs = [Job(f"{client}{i}.com", client) for client, n in (("a", 3), ("b", 1), ("c", 2)) for i in range(n)]
+    for job in jobs:
+        q.put(job)
+    order = [q.get(timeout=0).domain for _ in range(len(jobs))]
+    assert order == ["a0.com", "b0.com", "c0.com", "a1.com", "c1.com", "a2.com"]
+    assert len(q) == 0 and q.get(timeout=0) is None
+
+
+def test_remove_queued_job():
+    q = FairQueue()
+    a0, a1, b0 = Job("a0.com", "a"), Job("a1.com", "a"), Job("b0.com", "b")
+    for job in (a0, a1, b0):
+        q.put(job)
+    assert q.remove(a0)
+    assert not q.remove(a0)
+    assert q.depth() == {"a": 1, "b": 1}
+    assert [q.get(timeout=0), q.get(timeout=0)] == [a1, b0]
+    assert q.depth() == {}
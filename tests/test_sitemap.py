@@ -0,0 +1,68 @@
+import threading
+
+from seoscan_agent.sitemap import parse_sitemap_chunks
+
+IMAGE_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://ex.com/page</loc>
+    <lastmod>2024-01-02</lastmod>
+    <image:image><image:loc>https://ex.com/img.png</image:loc></image:image>
+  </url>
+  <url>
+    <image:image><image:loc>https://ex.com/other.png</image:loc></image:image>
+    <loc>https://ex.com/second</loc>
+  </url>
+</urlset>
+"""
+
+
+def parse(xml: bytes, chunk: int = 7):
+    urls, children = [], []
+    is_index = parse_sitemap_chunks((xml[i:i + chunk] for i in range(0, len(xml), chunk)),
+                                    lambda loc, lastmod: urls.append((loc, lastmod)), children.append)
+    return is_index, urls, children
+
+
+def test_image_loc_does_not_replace_page_loc():
+    is_index, urls, children = parse(IMAGE_SITEMAP)
+    assert not is_index
+    assert urls == [("https://ex.com/page", "2024-01-02"), ("https://ex.com/second", None)]
+    assert children == []
+
+
+def test_sitemap_index_children():
+    xml = b"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <sitemap><loc>https://ex.com/a.xml</loc><lastmod>2024-01-01</lastmod></sitemap>
+      <sitemap><loc>https://ex.com/b.xml.gz</loc></sitemap>
+    </sitemapindex>"""
+    is_index, urls, children = parse(xml)
+    assert is_index
+    assert urls == []
+    assert children == ["https://ex.com/a.xml", "https://ex.com/b.xml.gz"]
+
+
+def test_stopping_early_aborts_running_downloads(monkeypatch):
+    from seoscan_agent import sitemap
+
+    xml = b"<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>" + b"".join(
+        b"<url><loc>https://ex.com/%d</loc></url>" % i for i in range(5000)
+    ) + b"</urlset>"
+    closed = threading.Event()
+    sent = []
+
+    def fake_chunks(url, timeout, chunk_size=256):
+        try:
+            for i in range(0, len(xml), chunk_size):
+                sent.append(i)
+                yield xml[i:i + chunk_size]
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(sitemap, "_iter_chunks", fake_chunks)
+    entries = sitemap.iter_sitemaps(["https://ex.com/sitemap.xml"], buffer=10)
+    assert [next(entries).loc for _ in range(3)] == ["https://ex.com/0", "https://ex.com/1", "https://ex.com/2"]
+    entries.close()
+    assert closed.wait(5)
+    assert len(sent) < len(xml) // 256